@@ -0,0 +1,929 @@
+"""Lightweight pure-Python/NumPy stand-in for the parts of bpy the addon uses.
+
+Good enough to run the operators on synthetic scenes outside Blender, so the
+benchmarks can run in CI. It models the data layout (datablocks, node trees,
+links, pixel buffers, mesh arrays with foreach_get/foreach_set), not Blender's
+behaviour: there is no depsgraph, no undo and timers never fire.
+
+    import fake_bpy
+    fake_bpy.install()   # makes `import bpy` return this module
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+
+# Properties
+
+class _Deferred:
+    """What bpy.props.* returns: resolved to a value per instance on first access"""
+
+    def __init__(self, kind, kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+
+    def make_default(self):
+        kw = self.kwargs
+        if self.kind == "PointerProperty":
+            return kw["type"]()
+        if self.kind == "CollectionProperty":
+            return _PropertyCollection(kw["type"])
+        if self.kind == "EnumProperty" and "default" not in kw:
+            return kw["items"][0][0]
+        return kw.get("default", {
+            "BoolProperty": False, "IntProperty": 0, "FloatProperty": 0.0, "StringProperty": "",
+        }.get(self.kind))
+
+    def __get__(self, obj, owner):
+        # Assigned to a class after creation (e.g. Scene.scan_settings), so look up our own name
+        if obj is None:
+            return self
+        for klass in owner.__mro__:
+            for name, value in vars(klass).items():
+                if value is self:
+                    obj.__dict__[name] = self.make_default()
+                    return obj.__dict__[name]
+        raise AttributeError(self.kind)
+
+
+def _prop(kind):
+    def factory(**kwargs):
+        return _Deferred(kind, kwargs)
+    factory.__name__ = kind
+    return factory
+
+
+props = SimpleNamespace(**{
+    kind: _prop(kind) for kind in (
+        "BoolProperty", "IntProperty", "FloatProperty", "StringProperty",
+        "EnumProperty", "PointerProperty", "CollectionProperty",
+    )
+})
+
+
+def _init_annotated(obj):
+    for klass in reversed(type(obj).__mro__):
+        for name, value in vars(klass).get("__annotations__", {}).items():
+            if isinstance(value, _Deferred):
+                setattr(obj, name, value.make_default())
+
+
+class _PropertyCollection(list):
+    def __init__(self, item_type):
+        super().__init__()
+        self.item_type = item_type
+
+    def add(self):
+        item = self.item_type()
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+
+# Registerable classes
+
+class bpy_struct:
+    pass
+
+
+class PropertyGroup(bpy_struct):
+    def __init__(self):
+        self.name = ""
+        _init_annotated(self)
+
+
+class Operator(bpy_struct):
+    def __init__(self):
+        self.layout = None
+        self.reports = []
+        _init_annotated(self)
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+        print(f"{next(iter(level)).capitalize()}: {message}")
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class Panel(bpy_struct):
+    pass
+
+
+_registered = {}
+
+
+def _register_class(cls):
+    _registered[cls.__name__] = cls
+
+
+def _unregister_class(cls):
+    _registered.pop(cls.__name__, None)
+
+
+utils = SimpleNamespace(register_class=_register_class, unregister_class=_unregister_class)
+
+
+# Datablocks
+
+class ID(bpy_struct):
+    is_embedded_data = False
+    id_type = 'ID'
+
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.use_fake_user = False
+        self.library = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+    def user_remap(self, new_id):
+        data._user_remap(self, new_id)
+
+
+class _IDCollection:
+    def __init__(self, factory):
+        self._factory = factory
+        self._items = {}
+
+    def _unique_name(self, name):
+        if name not in self._items:
+            return name
+        counter = 1
+        while f"{name}.{counter:03d}" in self._items:
+            counter += 1
+        return f"{name}.{counter:03d}"
+
+    def new(self, name, *args, **kwargs):
+        item = self._factory(self._unique_name(name), *args, **kwargs)
+        self._items[item.name] = item
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self._items.pop(item.name, None)
+
+    def batch_remove(self, ids):
+        for item in list(ids):
+            self.remove(item)
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def keys(self):
+        return list(self._items)
+
+    def foreach_get(self, attr, out):
+        out[:] = np.ravel([getattr(item, attr) for item in self._items.values()])
+
+    def clear(self):
+        self._items.clear()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Images
+
+class _Pixels:
+    """img.pixels: a flat float32 RGBA buffer"""
+
+    def __init__(self, image):
+        self._image = image
+
+    def __len__(self):
+        return self._image._buffer.size
+
+    def foreach_get(self, out):
+        out[:] = self._image._buffer
+
+    def foreach_set(self, values):
+        self._image._buffer[:] = values
+        self._image.is_dirty = True
+
+
+class PackedFile:
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+
+class Image(ID):
+    id_type = 'IMAGE'
+
+    def __init__(self, name, width, height, alpha=False, float_buffer=False, **kwargs):
+        super().__init__(name)
+        self.size = [width, height]
+        self.channels = 4
+        self.is_float = float_buffer
+        self.use_half_precision = True
+        self.depth = 128 if float_buffer else 32
+        self.source = 'GENERATED'
+        self.filepath = ""
+        self.filepath_raw = ""
+        self.file_format = 'PNG'
+        self.packed_file = None
+        self.is_dirty = False
+        self.alpha_mode = 'STRAIGHT'
+        self.colorspace_settings = SimpleNamespace(name="sRGB", is_data=False)
+        self._buffer = np.zeros(width * height * 4, dtype=np.float32)
+        self.pixels = _Pixels(self)
+
+    @property
+    def has_data(self):
+        return self._buffer.size > 0
+
+    # Changing a generated image's size regenerates a blank buffer
+    @property
+    def generated_width(self):
+        return self.size[0]
+
+    @generated_width.setter
+    def generated_width(self, width):
+        self._generate(width, self.size[1])
+
+    @property
+    def generated_height(self):
+        return self.size[1]
+
+    @generated_height.setter
+    def generated_height(self, height):
+        self._generate(self.size[0], height)
+
+    def _generate(self, width, height):
+        self.size = [width, height]
+        self._buffer = np.zeros(width * height * 4, dtype=np.float32)
+
+    def scale(self, width, height):
+        # Nearest neighbour is enough for a stand-in
+        old_w, old_h = self.size
+        image = self._buffer.reshape(old_h, old_w, 4)
+        rows = np.arange(height) * old_h // height
+        cols = np.arange(width) * old_w // width
+        self._buffer = np.ascontiguousarray(image[rows][:, cols]).ravel()
+        self.size = [width, height]
+        self.is_dirty = True
+
+    def update(self):
+        pass
+
+    def save(self, filepath=None, quality=None):
+        filepath = filepath or self.filepath_raw or self.filepath
+        if not filepath:
+            raise RuntimeError(f"Image '{self.name}' does not have a file path")
+        data = (np.clip(self._buffer, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        with open(path.abspath(filepath), "wb") as f:
+            f.write(data.tobytes())
+        self.filepath = filepath
+        self.is_dirty = False
+
+    def pack(self):
+        self.packed_file = PackedFile(np.clip(self._buffer * 255.0, 0, 255).astype(np.uint8).tobytes())
+
+    def unpack(self, method='USE_LOCAL'):
+        self.packed_file = None
+
+    def reload(self):
+        self.is_dirty = False
+
+    def user_clear(self):
+        self.users = 0
+
+
+# Node trees
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, identifier, is_output, type='RGBA'):
+        self.node = node
+        self.name = name
+        self.identifier = identifier
+        self.is_output = is_output
+        self.type = type
+        self.links = []
+        self.default_value = 0.0
+        self.enabled = True
+        self.hide = False
+
+    @property
+    def is_linked(self):
+        return bool(self.links)
+
+
+class NodeLink(bpy_struct):
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_muted = False
+        self.is_valid = True
+
+
+class _Sockets(list):
+    def __init__(self, node, is_output):
+        super().__init__()
+        self.node = node
+        self.is_output = is_output
+
+    def new(self, type, name, identifier=None):
+        socket = NodeSocket(self.node, name, identifier or name, self.is_output)
+        self.append(socket)
+        return socket
+
+    def get(self, name, default=None):
+        for socket in self:
+            if socket.name == name:
+                return socket
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            socket = self.get(key)
+            if socket is None:
+                raise KeyError(key)
+            return socket
+        return super().__getitem__(key)
+
+
+# bl_idname -> (type, default name, input names, output names)
+NODE_TYPES = {
+    'ShaderNodeTexImage': ('TEX_IMAGE', "Image Texture", ["Vector"], ["Color", "Alpha"]),
+    'ShaderNodeNormalMap': ('NORMAL_MAP', "Normal Map", ["Strength", "Color"], ["Normal"]),
+    'ShaderNodeBsdfPrincipled': (
+        'BSDF_PRINCIPLED', "Principled BSDF", ["Base Color", "Metallic", "Roughness", "Alpha", "Normal"], ["BSDF"]
+    ),
+    'ShaderNodeOutputMaterial': ('OUTPUT_MATERIAL', "Material Output", ["Surface", "Volume", "Displacement"], []),
+    'NodeReroute': ('REROUTE', "Reroute", ["Input"], ["Output"]),
+    'ShaderNodeValue': ('VALUE', "Value", [], ["Value"]),
+    'ShaderNodeMath': ('MATH', "Math", ["Value", "Value_001"], ["Value"]),
+    'ShaderNodeSeparateColor': ('SEPARATE_COLOR', "Separate Color", ["Color"], ["Red", "Green", "Blue"]),
+    'ShaderNodeCombineColor': ('COMBINE_COLOR', "Combine Color", ["Red", "Green", "Blue"], ["Color"]),
+    'ShaderNodeUVMap': ('UVMAP', "UV Map", [], ["UV"]),
+    'ShaderNodeGroup': ('GROUP', "Group", [], []),
+    'NodeGroupInput': ('GROUP_INPUT', "Group Input", [], []),
+    'NodeGroupOutput': ('GROUP_OUTPUT', "Group Output", [], []),
+}
+
+
+class Node(bpy_struct):
+    def __init__(self, tree, bl_idname, name):
+        self.id_data = tree
+        self.bl_idname = bl_idname
+        self.name = name
+        self.label = ""
+        self.type, _, input_names, output_names = NODE_TYPES[bl_idname]
+        self.inputs = _Sockets(self, False)
+        self.outputs = _Sockets(self, True)
+        for input_name in input_names:
+            self.inputs.new('NodeSocketColor', input_name)
+        for output_name in output_names:
+            self.outputs.new('NodeSocketColor', output_name)
+        self.mute = False
+        self.image = None
+        self.uv_map = ""
+        self.location = (0.0, 0.0)
+        self.is_active_output = self.type in {'GROUP_OUTPUT', 'OUTPUT_MATERIAL'}
+        self._node_tree = None
+
+    @property
+    def internal_links(self):
+        if not self.inputs or not self.outputs:
+            return []
+        return [NodeLink(self.inputs[0], self.outputs[0])]
+
+    @property
+    def node_tree(self):
+        return self._node_tree
+
+    @node_tree.setter
+    def node_tree(self, tree):
+        self._node_tree = tree
+        if self.type == 'GROUP':
+            self.inputs = _Sockets(self, False)
+            self.outputs = _Sockets(self, True)
+            if tree is not None:
+                for item in tree.interface.items_tree:
+                    sockets = self.inputs if item.in_out == 'INPUT' else self.outputs
+                    sockets.new(item.socket_type, item.name, item.identifier)
+
+
+class _Nodes:
+    def __init__(self, tree):
+        self.tree = tree
+        self._nodes = {}
+
+    def new(self, type):
+        base = NODE_TYPES[type][1]
+        name = base
+        counter = 1
+        while name in self._nodes:
+            name = f"{base}.{counter:03d}"
+            counter += 1
+        node = Node(self.tree, type, name)
+        self._nodes[name] = node
+        if node.type == 'GROUP_INPUT':
+            for item in self.tree.interface.items_tree:
+                if item.in_out == 'INPUT':
+                    node.outputs.new(item.socket_type, item.name, item.identifier)
+        elif node.type == 'GROUP_OUTPUT':
+            for item in self.tree.interface.items_tree:
+                if item.in_out == 'OUTPUT':
+                    node.inputs.new(item.socket_type, item.name, item.identifier)
+        return node
+
+    def remove(self, node):
+        for socket in list(node.inputs) + list(node.outputs):
+            for link in list(socket.links):
+                self.tree.links.remove(link)
+        del self._nodes[node.name]
+
+    def get(self, name, default=None):
+        return self._nodes.get(name, default)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self._nodes.values())[key]
+        return self._nodes[key]
+
+    def __iter__(self):
+        return iter(list(self._nodes.values()))
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+class _Links:
+    def __init__(self):
+        self._links = []
+
+    def new(self, from_socket, to_socket):
+        # An input takes a single link
+        for link in list(to_socket.links):
+            self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        from_socket.links.append(link)
+        to_socket.links.append(link)
+        self._links.append(link)
+        return link
+
+    def remove(self, link):
+        self._links.remove(link)
+        link.from_socket.links.remove(link)
+        link.to_socket.links.remove(link)
+
+    def __iter__(self):
+        return iter(list(self._links))
+
+    def __len__(self):
+        return len(self._links)
+
+
+class _InterfaceSocket:
+    def __init__(self, name, in_out, socket_type, identifier):
+        self.name = name
+        self.in_out = in_out
+        self.socket_type = socket_type
+        self.identifier = identifier
+        self.item_type = 'SOCKET'
+
+
+class _Interface:
+    def __init__(self):
+        self.items_tree = []
+
+    def new_socket(self, name, in_out='INPUT', socket_type='NodeSocketFloat'):
+        item = _InterfaceSocket(name, in_out, socket_type, f"Socket_{len(self.items_tree)}")
+        self.items_tree.append(item)
+        return item
+
+
+class NodeTree(ID):
+    id_type = 'NODETREE'
+
+    def __init__(self, name, type='ShaderNodeTree', embedded=False):
+        super().__init__(name)
+        self.bl_idname = type
+        self.is_embedded_data = embedded
+        self.interface = _Interface()
+        self.nodes = _Nodes(self)
+        self.links = _Links()
+
+
+class ShaderNodeTree(NodeTree):
+    pass
+
+
+class Material(ID):
+    id_type = 'MATERIAL'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.node_tree = None
+        self._use_nodes = False
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self._use_nodes = value
+        if value and self.node_tree is None:
+            # Same default tree Blender creates
+            self.node_tree = ShaderNodeTree("Shader Nodetree", embedded=True)
+            bsdf = self.node_tree.nodes.new('ShaderNodeBsdfPrincipled')
+            output = self.node_tree.nodes.new('ShaderNodeOutputMaterial')
+            self.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+
+
+# Meshes and objects
+
+class _Attributes:
+    """A mesh element array (vertices, loops, polygons, uv data) with foreach access"""
+
+    def __init__(self, mesh, fields):
+        self.mesh = mesh
+        self.fields = fields  # attribute -> (components, dtype)
+        self.data = {name: np.zeros((0, n), dtype) for name, (n, dtype) in fields.items()}
+
+    def add(self, count):
+        for name, (n, dtype) in self.fields.items():
+            self.data[name] = np.concatenate([self.data[name], np.zeros((count, n), dtype)])
+
+    def foreach_get(self, attr, out):
+        if attr == "normal" and self is self.mesh.polygons:
+            out[:] = self.mesh._polygon_normals().ravel()
+        else:
+            out[:] = self.data[attr].ravel()
+
+    def foreach_set(self, attr, values):
+        self.data[attr][:] = np.asarray(values).reshape(self.data[attr].shape)
+
+    def __len__(self):
+        return len(next(iter(self.data.values())))
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class MeshUVLoopLayer(bpy_struct):
+    def __init__(self, mesh, name):
+        self.name = name
+        self.data = _Attributes(mesh, {"uv": (2, np.float32)})
+        self.data.add(len(mesh.loops))
+
+
+class _UVLayers(list):
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+        self.active_index = 0
+
+    def new(self, name="UVMap", do_init=True):
+        layer = MeshUVLoopLayer(self.mesh, name)
+        layer.active_render = not self
+        if do_init and self:
+            layer.data.foreach_set("uv", self.active.data.data["uv"])
+        self.append(layer)
+        return layer
+
+    @property
+    def active(self):
+        return self[self.active_index] if self else None
+
+    def get(self, name, default=None):
+        return next((layer for layer in self if layer.name == name), default)
+
+    def remove(self, layer):
+        list.remove(self, layer)
+        if layer.active_render and self:
+            self[0].active_render = True
+        self.active_index = min(self.active_index, max(len(self) - 1, 0))
+
+
+class Mesh(ID):
+    id_type = 'MESH'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertices = _Attributes(self, {"co": (3, np.float32)})
+        self.loops = _Attributes(self, {"vertex_index": (1, np.int32)})
+        self.polygons = _Attributes(self, {
+            "loop_start": (1, np.int32), "loop_total": (1, np.int32), "material_index": (1, np.int32),
+        })
+        self.uv_layers = _UVLayers(self)
+        self.materials = []
+
+    def _polygon_normals(self):
+        # Newell's method over every polygon at once
+        co = self.vertices.data["co"]
+        loop_verts = self.loops.data["vertex_index"].ravel()
+        starts = self.polygons.data["loop_start"].ravel()
+        totals = self.polygons.data["loop_total"].ravel()
+        face = np.repeat(np.arange(len(starts)), totals)
+        offset = np.arange(len(face)) - np.repeat(starts, totals)
+        nxt = np.repeat(starts, totals) + (offset + 1) % np.repeat(totals, totals)
+        cur_co = co[loop_verts[np.repeat(starts, totals) + offset]]
+        nxt_co = co[loop_verts[nxt]]
+        cross = np.cross(cur_co, nxt_co)
+        normals = np.column_stack([np.bincount(face, cross[:, k], len(starts)) for k in range(3)])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        lengths[lengths == 0.0] = 1.0
+        return (normals / lengths).astype(np.float32)
+
+    def update(self, calc_edges=False):
+        for layer in self.uv_layers:
+            missing = len(self.loops) - len(layer.data)
+            if missing > 0:
+                layer.data.add(missing)
+
+    def validate(self, verbose=False):
+        return False
+
+
+class Object(ID):
+    id_type = 'OBJECT'
+
+    def __init__(self, name, object_data):
+        super().__init__(name)
+        self.data = object_data
+        self.type = 'MESH' if isinstance(object_data, Mesh) else 'EMPTY'
+        self.users_collection = []
+
+    @property
+    def material_slots(self):
+        materials = getattr(self.data, "materials", [])
+        return [SimpleNamespace(material=mat, link='DATA') for mat in materials]
+
+
+class Collection(ID):
+    id_type = 'COLLECTION'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = _ObjectLinks()
+        self.children = []
+        self.all_objects = self.objects
+
+    @property
+    def children_recursive(self):
+        found = []
+        for child in self.children:
+            found.append(child)
+            found.extend(child.children_recursive)
+        return found
+
+
+class _ObjectLinks(list):
+    def link(self, obj):
+        self.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+
+
+class Scene(ID):
+    id_type = 'SCENE'
+
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+
+    @property
+    def objects(self):
+        return list(self.collection.objects)
+
+
+class WindowManager(ID):
+    id_type = 'WINDOWMANAGER'
+
+    def __init__(self, name="WinMan"):
+        super().__init__(name)
+        self.windows = []
+
+    def fileselect_add(self, operator):
+        pass
+
+    def invoke_props_dialog(self, operator, width=300):
+        return {'RUNNING_MODAL'}
+
+
+types = SimpleNamespace(
+    bpy_struct=bpy_struct, ID=ID, Operator=Operator, PropertyGroup=PropertyGroup, UIList=UIList,
+    Panel=Panel, Image=Image, Material=Material, NodeTree=NodeTree, ShaderNodeTree=ShaderNodeTree,
+    Node=Node, NodeSocket=NodeSocket, Mesh=Mesh, Object=Object, Collection=Collection, Scene=Scene,
+    WindowManager=WindowManager,
+)
+
+
+# bpy.data, bpy.context
+
+class _BlendData:
+    def __init__(self):
+        self.filepath = ""
+        # Generated scenes are never saved
+        self.is_dirty = True
+        self.images = _IDCollection(Image)
+        self.materials = _IDCollection(Material)
+        self.node_groups = _IDCollection(NodeTree)
+        self.meshes = _IDCollection(Mesh)
+        self.objects = _IDCollection(Object)
+        self.collections = _IDCollection(Collection)
+        self.scenes = _IDCollection(Scene)
+        self.window_managers = _IDCollection(WindowManager)
+        self.workspaces = _IDCollection(ID)
+        self.screens = _IDCollection(ID)
+        self.libraries = _IDCollection(ID)
+
+    def _collection_of(self, id_data):
+        for collection in (self.images, self.materials, self.node_groups, self.meshes, self.objects,
+                           self.collections, self.scenes, self.window_managers):
+            if collection.get(id_data.name) is id_data:
+                return collection
+        return None
+
+    def batch_remove(self, ids):
+        for id_data in list(ids):
+            collection = self._collection_of(id_data)
+            if collection is not None:
+                collection.remove(id_data)
+
+    def _user_remap(self, old, new):
+        """Point every reference modelled in user_map() from old to new"""
+        trees = [mat.node_tree for mat in self.materials if mat.node_tree] + list(self.node_groups)
+        for tree in trees:
+            for node in tree.nodes:
+                if node.image is old:
+                    node.image = new
+                if node.node_tree is old:
+                    node.node_tree = new
+        for mesh in self.meshes:
+            mesh.materials[:] = [new if mat is old else mat for mat in mesh.materials]
+        for obj in self.objects:
+            if obj.data is old:
+                obj.data = new
+
+    def user_map(self, subset=None, key_types=None, value_types=None):
+        """Datablock -> set of datablocks using it, for the datablocks modelled here"""
+        users = {}
+        for collection in (self.images, self.materials, self.node_groups, self.meshes, self.objects,
+                           self.scenes, self.window_managers):
+            for item in collection:
+                users[item] = set()
+        for scene in self.scenes:
+            for obj in scene.collection.objects:
+                users.setdefault(obj, set()).add(scene)
+        trees = [(mat, mat.node_tree) for mat in self.materials if mat.node_tree]
+        trees += [(group, group) for group in self.node_groups]
+        for owner, tree in trees:
+            for node in tree.nodes:
+                if node.image is not None:
+                    users.setdefault(node.image, set()).add(owner)
+                if node.node_tree is not None:
+                    users.setdefault(node.node_tree, set()).add(owner)
+        for mesh in self.meshes:
+            for mat in mesh.materials:
+                if mat is not None:
+                    users.setdefault(mat, set()).add(mesh)
+        for obj in self.objects:
+            if obj.data is not None:
+                users.setdefault(obj.data, set()).add(obj)
+        if subset is not None:
+            subset = set(subset)
+            users = {key: value for key, value in users.items() if key in subset}
+        return users
+
+
+data = _BlendData()
+context = SimpleNamespace(scene=None, window_manager=None, view_layer=None)
+
+
+def reset():
+    """Start over with empty data, like loading the factory startup file"""
+    data.__init__()
+    context.scene = data.scenes.new("Scene")
+    context.window_manager = data.window_managers.new("WinMan")
+    _timers.clear()
+    return data
+
+
+# bpy.app
+
+def _persistent(func):
+    func._bpy_persistent = True
+    return func
+
+
+_timers = {}
+
+
+def _register_timer(function, first_interval=0.0, persistent=False):
+    _timers[function] = first_interval
+
+
+app = SimpleNamespace(
+    version=(4, 2, 0),
+    version_string="4.2.0 (stand-in)",
+    binary_path="",
+    background=True,
+    handlers=SimpleNamespace(
+        persistent=_persistent,
+        depsgraph_update_post=[], load_post=[], save_pre=[], save_post=[], undo_post=[], redo_post=[],
+    ),
+    timers=SimpleNamespace(
+        register=_register_timer,
+        unregister=lambda function: _timers.pop(function, None),
+        is_registered=lambda function: function in _timers,
+    ),
+)
+
+
+# bpy.path
+
+def _abspath(filepath, start=None, library=None):
+    if filepath.startswith("//"):
+        base = start or os.path.dirname(data.filepath) or os.getcwd()
+        return os.path.join(base, filepath[2:])
+    return filepath
+
+
+path = SimpleNamespace(
+    abspath=_abspath,
+    basename=lambda filepath: os.path.basename(filepath[2:] if filepath.startswith("//") else filepath),
+    clean_name=lambda name, replace="_": "".join(c if c.isalnum() or c in "-_." else replace for c in name),
+)
+
+
+# bpy.ops: registered operators by bl_idname, plus a stand-in FBX exporter
+
+def _export_fbx(filepath="", **kwargs):
+    with open(filepath, "w", encoding="utf-8") as f:
+        for obj in data.objects:
+            f.write(f"{obj.type} {obj.name}\n")
+    return {'FINISHED'}
+
+
+_builtin_ops = {"export_scene.fbx": _export_fbx}
+
+
+class _OpsModule:
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        idname = f"{self._module}.{name}"
+
+        def call(*args, **kwargs):
+            if idname in _builtin_ops:
+                return _builtin_ops[idname](**kwargs)
+            for cls in _registered.values():
+                if getattr(cls, "bl_idname", None) == idname:
+                    op = cls()
+                    for key, value in kwargs.items():
+                        setattr(op, key, value)
+                    if args and args[0] == 'INVOKE_DEFAULT' and hasattr(op, "invoke"):
+                        return op.invoke(context, None)
+                    return op.execute(context)
+            raise AttributeError(f"Calling operator \"bpy.ops.{idname}\" error, could not be found")
+
+        return call
+
+
+class _Ops:
+    def __getattr__(self, module):
+        return _OpsModule(module)
+
+
+ops = _Ops()
+
+
+def install():
+    """Register this module as `bpy` (and its submodules) in sys.modules"""
+    module = sys.modules[__name__]
+    sys.modules["bpy"] = module
+    sys.modules["bpy.app"] = app
+    sys.modules["bpy.app.handlers"] = app.handlers
+    sys.modules["bpy.props"] = props
+    sys.modules["bpy.types"] = types
+    sys.modules["bpy.utils"] = utils
+    sys.modules["bpy.path"] = path
+    reset()
+    return module
@@ -0,0 +1,196 @@
+"""Time every operator on synthetic scenes and keep a history of the results.
+
+In CI, or anywhere without Blender (or with --fake-bpy), the stand-in in
+fake_bpy is used:
+
+    python benchmarks/run.py --materials 200 --nodes 30 --images 40 --polygons 5000
+
+Inside Blender the real bpy is used:
+
+    blender -b --factory-startup --python benchmarks/run.py -- --materials 200
+
+Every run is appended to a history file in the user's cache folder
+(--history to use another one, --no-record to skip it). With --check the run
+exits with status 1 if an operator got slower than --tolerance times its
+best time in the last --window runs with the same backend and scene size.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+try:
+    if "--fake-bpy" in sys.argv:
+        raise ImportError
+    import bpy
+    BACKEND = f"blender {bpy.app.version_string}"
+except ImportError:
+    import fake_bpy
+    bpy = fake_bpy.install()
+    BACKEND = "fake_bpy"
+
+import normal_scanner
+from scenes import generate_scene
+
+# (name, operator, keyword arguments); each one runs on a freshly generated scene
+BENCHMARKS = [
+    ("scan", "object.scan_normal_maps", {}),
+    ("scan_warm", "object.scan_normal_maps", {}),
+    ("remove_normal_maps", "object.remove_normal_maps", {}),
+    ("fix_uv_coordinates", "object.fix_uv_coordinates", {}),
+    ("fix_image_dimensions", "object.fix_image_dimensions", {}),
+    ("texture_memory_report", "object.texture_memory_report", {}),
+    ("asset_cost_report", "object.asset_cost_report", {}),
+    ("fit_texture_budget", "object.fit_texture_budget", {}),
+    ("remove_unused_textures", "object.remove_unused_textures", {}),
+    ("remove_unused_materials", "object.remove_unused_materials", {}),
+    ("remove_orphan_data", "object.remove_orphan_data", {}),
+    ("merge_duplicate_images", "object.merge_duplicate_images", {}),
+    ("export_fbx_with_textures", "object.export_fbx_with_textures", {"filepath": "{tmp}/bench.fbx"}),
+    ("export_fbx_normal_mips", "object.export_fbx_with_textures",
+     {"filepath": "{tmp}/bench_mips.fbx", "normal_mips": "TOKSVIG"}),
+]
+
+
+def operator(idname):
+    module, name = idname.split(".")
+    return getattr(getattr(bpy.ops, module), name)
+
+
+def run_benchmark(name, idname, kwargs, scene, repeat, tmp):
+    """Best wall time in seconds over `repeat` runs, each on a new scene"""
+    kwargs = {key: value.format(tmp=tmp) if isinstance(value, str) else value for key, value in kwargs.items()}
+    best = None
+    for _ in range(repeat):
+        generate_scene(bpy, **scene)
+        normal_scanner.invalidate_material_index()
+        if name == "scan_warm":
+            normal_scanner.get_material_index()
+        # Operators print their reports; keep that out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            operator(idname)(**kwargs)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def default_history_path():
+    """history.jsonl in the user's cache folder, so runs don't write into the source tree"""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not cache:
+        cache = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "normal_scanner", "benchmark_history.jsonl")
+
+
+def load_history(path):
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+    except OSError:
+        pass
+    return records
+
+
+def regressions(record, history, window, tolerance):
+    """(name, seconds, best earlier seconds) for every operator slower than tolerance x its recent best"""
+    earlier = [
+        r for r in history
+        if r["backend"] == record["backend"] and r["scene"] == record["scene"]
+    ][-window:]
+    found = []
+    for name, seconds in record["results"].items():
+        previous = [r["results"][name] for r in earlier if name in r["results"]]
+        if previous and seconds > min(previous) * tolerance:
+            found.append((name, seconds, min(previous)))
+    return found
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="benchmarks/run.py", description="Normal Map Scanner benchmarks")
+    parser.add_argument("--materials", type=int, default=50)
+    parser.add_argument("--nodes", type=int, default=20, help="Nodes per material tree")
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--polygons", type=int, default=1000, help="Faces per mesh")
+    parser.add_argument("--image-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operator; the best one counts")
+    parser.add_argument("--only", nargs="+", default=[], help="Benchmark names to run")
+    parser.add_argument("--history", default=default_history_path())
+    parser.add_argument("--no-record", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on a regression")
+    parser.add_argument("--window", type=int, default=5, help="Earlier runs to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown factor")
+    parser.add_argument("--fake-bpy", action="store_true", help="Use the stand-in even where bpy can be imported")
+    args = parser.parse_args(argv)
+
+    scene = {
+        "materials": args.materials, "nodes": args.nodes, "images": args.images,
+        "polygons": args.polygons, "image_size": args.image_size,
+    }
+    normal_scanner.register()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, idname, kwargs in BENCHMARKS:
+                if args.only and name not in args.only:
+                    continue
+                results[name] = run_benchmark(name, idname, kwargs, scene, max(1, args.repeat), tmp)
+                print(f"{name:<28} {results[name] * 1000:10.1f} ms")
+    finally:
+        normal_scanner.unregister()
+
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "backend": BACKEND,
+        "python": platform.python_version(),
+        "scene": scene,
+        "results": results,
+    }
+    history = load_history(args.history)
+    slower = regressions(record, history, args.window, args.tolerance)
+    for name, seconds, best in slower:
+        print(f"REGRESSION {name}: {seconds * 1000:.1f} ms, best of last {args.window} runs {best * 1000:.1f} ms")
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+    return 1 if args.check and slower else 0
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    status = main(argv)
+    if BACKEND != "fake_bpy":
+        # The standalone bpy module can crash during interpreter shutdown once a
+        # property with an update callback was registered, which would replace
+        # the exit status; skip the teardown
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+    sys.exit(status)
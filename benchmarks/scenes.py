@@ -0,0 +1,125 @@
+"""Synthetic scenes for the benchmarks.
+
+Only uses API calls that exist in both Blender and the stand-in in
+fake_bpy, so the same scene can be generated on either.
+"""
+
+import numpy as np
+
+
+def clear_data(bpy):
+    """Remove every datablock a generated scene creates"""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.node_groups, bpy.data.images):
+        for item in list(collection):
+            collection.remove(item)
+
+
+def _new_group_socket(tree, name, in_out):
+    if hasattr(tree, "interface"):
+        return tree.interface.new_socket(name, in_out=in_out, socket_type='NodeSocketColor')
+    # Blender before 4.0
+    sockets = tree.inputs if in_out == 'INPUT' else tree.outputs
+    return sockets.new('NodeSocketColor', name)
+
+
+def _normal_group(bpy):
+    """Node group wrapping a Normal Map node, like the ones shared across imported materials"""
+    tree = bpy.data.node_groups.new("Bench Normal Group", 'ShaderNodeTree')
+    _new_group_socket(tree, "Color", 'INPUT')
+    _new_group_socket(tree, "Normal", 'OUTPUT')
+    group_in = tree.nodes.new('NodeGroupInput')
+    group_out = tree.nodes.new('NodeGroupOutput')
+    normal_map = tree.nodes.new('ShaderNodeNormalMap')
+    tree.links.new(group_in.outputs[0], normal_map.inputs["Color"])
+    tree.links.new(normal_map.outputs["Normal"], group_out.inputs[0])
+    return tree
+
+
+def _grid(bpy, name, polygons):
+    """Quad grid with about `polygons` faces, filled through foreach_set"""
+    side = max(1, int(round(polygons ** 0.5)))
+    xs, ys = np.meshgrid(np.arange(side + 1, dtype=np.float32), np.arange(side + 1, dtype=np.float32))
+    coords = np.column_stack([xs.ravel(), ys.ravel(), np.sin(xs.ravel() * 0.3) * 0.5]).astype(np.float32)
+    corner = (np.arange(side)[:, None] * (side + 1) + np.arange(side)[None, :]).ravel()
+    quads = np.column_stack([corner, corner + 1, corner + side + 2, corner + side + 1]).astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set("vertex_index", quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(len(quads), 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def generate_scene(bpy, materials=50, nodes=20, images=20, polygons=1000, image_size=256, seed=0):
+    """Fill the current file with a synthetic scene.
+
+    materials: materials, each on its own mesh object; one in five is left unassigned
+    nodes: nodes per material tree, padded with reroute chains and value nodes
+    images: images shared round-robin by the materials; every other material
+            uses its image as a normal map, half of those through a node group,
+            and one image in ten is not used at all
+    polygons: faces per mesh, without UVs so the UV fix has work to do
+    image_size: images are image_size x (image_size - image_size // 4), so they need resizing
+    """
+    rng = np.random.default_rng(seed)
+    clear_data(bpy)
+
+    height = max(1, image_size - image_size // 4)
+    all_images = []
+    for i in range(max(images, 1)):
+        img = bpy.data.images.new(f"Bench Texture {i:04d}", image_size, height, alpha=True)
+        pixels = rng.random(image_size * height * 4, dtype=np.float32)
+        if i % 2 == 0:
+            # Normal-map-like content: bluish, around (0.5, 0.5, 1)
+            pixels.reshape(-1, 4)[:, :2] = 0.5 + (pixels.reshape(-1, 4)[:, :2] - 0.5) * 0.2
+            pixels.reshape(-1, 4)[:, 2] = 1.0
+        img.pixels.foreach_set(pixels)
+        all_images.append(img)
+    used_images = [img for i, img in enumerate(all_images) if i % 10 != 9] or all_images
+
+    group = _normal_group(bpy)
+    scene_objects = bpy.context.scene.collection.objects
+    for m in range(materials):
+        mat = bpy.data.materials.new(f"Bench Material {m:04d}")
+        mat.use_nodes = True
+        tree = mat.node_tree
+        bsdf = tree.nodes.get("Principled BSDF")
+        tex = tree.nodes.new('ShaderNodeTexImage')
+        tex.image = used_images[m % len(used_images)]
+
+        # Chain of reroutes between the texture and what it feeds, so lookups walk links
+        source = tex.outputs["Color"]
+        for _ in range(max(0, (nodes - 4) // 2)):
+            reroute = tree.nodes.new('NodeReroute')
+            tree.links.new(source, reroute.inputs[0])
+            source = reroute.outputs[0]
+
+        if m % 2 == 0:
+            if m % 4 == 0:
+                normal = tree.nodes.new('ShaderNodeNormalMap')
+                tree.links.new(source, normal.inputs["Color"])
+                tree.links.new(normal.outputs["Normal"], bsdf.inputs["Normal"])
+            else:
+                group_node = tree.nodes.new('ShaderNodeGroup')
+                group_node.node_tree = group
+                tree.links.new(source, group_node.inputs[0])
+                tree.links.new(group_node.outputs[0], bsdf.inputs["Normal"])
+        else:
+            tree.links.new(source, bsdf.inputs["Base Color"])
+
+        while len(tree.nodes) < nodes:
+            tree.nodes.new('ShaderNodeValue')
+
+        if m % 5 == 4:
+            continue
+        mesh = _grid(bpy, f"Bench Mesh {m:04d}", polygons)
+        mesh.materials.append(mat)
+        obj = bpy.data.objects.new(f"Bench Object {m:04d}", mesh)
+        scene_objects.link(obj)
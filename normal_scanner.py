@@ -9,6 +9,2659 @@ bl_info = {
 }
 
 import bpy
+from bpy.app.handlers import persistent
+
+# Profiling of operator runs
+class ProfileRun:
+    """Timing spans and counters recorded during one operator run"""
+
+    def __init__(self, idname, label):
+        import time
+
+        self.idname = idname
+        self.label = label
+        self.started = time.time()
+        self.origin = time.perf_counter()
+        self.seconds = 0.0
+        self.spans = []     # (name, start offset in seconds, duration in seconds, depth)
+        self.counters = {}  # name -> total
+
+    def as_dict(self):
+        return {
+            "operator": self.idname,
+            "label": self.label,
+            "started": self.started,
+            "seconds": self.seconds,
+            "spans": [
+                {"name": name, "start": start, "seconds": seconds, "depth": depth}
+                for name, start, seconds, depth in self.spans
+            ],
+            "counters": dict(self.counters),
+        }
+
+
+class Profiler:
+    """Records timing spans and counters for the most recent operator runs.
+
+    Phases are sequential spans: starting one ends the one before. Spans can
+    also be nested with span(). Outside an operator run every call is a
+    no-op, so helpers shared with the UI and the handlers can be instrumented
+    as well. Only used from the main thread.
+    """
+
+    def __init__(self, keep=20):
+        from collections import deque
+
+        self.runs = deque(maxlen=keep)
+        self.current = None
+        self._phase = None  # (name, start)
+        self._depth = 0
+
+    def begin(self, idname, label):
+        self.current = ProfileRun(idname, label)
+        self._phase = None
+        self._depth = 0
+
+    def end(self):
+        import time
+
+        run = self.current
+        if run is None:
+            return None
+        self.phase(None)
+        run.seconds = time.perf_counter() - run.origin
+        self.current = None
+        self.runs.append(run)
+        return run
+
+    def phase(self, name):
+        import time
+
+        if self.current is None:
+            return
+        now = time.perf_counter() - self.current.origin
+        if self._phase is not None:
+            phase_name, start = self._phase
+            self.current.spans.append((phase_name, start, now - start, 1))
+        self._phase = (name, now) if name else None
+
+    def span(self, name):
+        """Context manager timing a block inside the current phase"""
+        from contextlib import contextmanager
+        import time
+
+        @contextmanager
+        def timed():
+            run = self.current
+            if run is None:
+                yield
+                return
+            self._depth += 1
+            start = time.perf_counter() - run.origin
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                run.spans.append((name, start, time.perf_counter() - run.origin - start, self._depth + 2))
+
+        return timed()
+
+    def suspend(self):
+        """Detach the current run, e.g. between the ticks of a modal operator; see resume()"""
+        state = (self.current, self._phase, self._depth)
+        self.current = None
+        return state
+
+    def resume(self, state):
+        self.current, self._phase, self._depth = state
+
+    def count(self, name, n=1):
+        if self.current is not None:
+            self.current.counters[name] = self.current.counters.get(name, 0) + n
+
+    def clear(self):
+        self.runs.clear()
+
+    def to_json(self):
+        return {"version": 1, "runs": [run.as_dict() for run in self.runs]}
+
+    def to_chrome_trace(self):
+        """Trace Event Format, for chrome://tracing or ui.perfetto.dev"""
+        events = []
+        for run in self.runs:
+            origin_us = run.started * 1e6
+            events.append({
+                "name": run.label, "cat": "operator", "ph": "X", "pid": 1, "tid": 1,
+                "ts": origin_us, "dur": run.seconds * 1e6, "args": {"operator": run.idname},
+            })
+            for name, start, seconds, depth in run.spans:
+                events.append({
+                    "name": name, "cat": "phase" if depth == 1 else "span", "ph": "X", "pid": 1, "tid": 1,
+                    "ts": origin_us + start * 1e6, "dur": seconds * 1e6,
+                })
+            if run.counters:
+                events.append({
+                    "name": run.label, "cat": "counters", "ph": "C", "pid": 1,
+                    "ts": origin_us + run.seconds * 1e6, "args": dict(run.counters),
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+profiler = Profiler()
+
+
+def profiled(execute):
+    """Decorator recording an operator's execute() as a profile run"""
+    import functools
+
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        if profiler.current is not None:
+            # Called from another operator: time it as a span of the outer run
+            with profiler.span(self.bl_label):
+                return execute(self, context)
+        profiler.begin(self.bl_idname, self.bl_label)
+        try:
+            return execute(self, context)
+        finally:
+            profiler.end()
+
+    return wrapper
+
+
+# Box projection used by SCAN_OT_fix_uv_coordinates
+def add_box_uv(mesh, normalize=False, texel_density=1.0):
+    """Add simple box projection UV coordinates to a mesh"""
+    import numpy as np
+
+    # Skip empty meshes
+    if len(mesh.polygons) == 0 or len(mesh.vertices) == 0:
+        return False
+
+    poly_count = len(mesh.polygons)
+    loop_count = len(mesh.loops)
+
+    # Read everything we need in bulk
+    normals = np.empty(poly_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", normals)
+    loop_starts = np.empty(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_verts = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+
+    # Dominant axis per face; argmax keeps the first axis on ties,
+    # same as list.index(max(...))
+    max_axis = np.argmax(np.abs(normals.reshape(-1, 3)), axis=1)
+
+    # Project based on dominant axis:
+    # X dominant - project on YZ, Y dominant - on XZ, Z dominant - on XY
+    u_axis = np.where(max_axis == 0, 1, 0)
+    v_axis = np.where(max_axis == 2, 1, 2)
+
+    # Map every loop to the face it belongs to
+    face_of_loop = np.empty(loop_count, dtype=np.int64)
+    face_of_loop[np.repeat(loop_starts, loop_totals) + (
+        np.arange(loop_totals.sum()) - np.repeat(np.cumsum(loop_totals) - loop_totals, loop_totals)
+    )] = np.repeat(np.arange(poly_count), loop_totals)
+
+    loop_co = coords[loop_verts]
+    rows = np.arange(loop_count)
+    uvs = np.empty((loop_count, 2), dtype=np.float32)
+    uvs[:, 0] = loop_co[rows, u_axis[face_of_loop]]
+    uvs[:, 1] = loop_co[rows, v_axis[face_of_loop]]
+
+    if normalize:
+        # Uniform fit into 0-1 so texels stay square
+        uv_min = uvs.min(axis=0)
+        extent = float((uvs.max(axis=0) - uv_min).max())
+        uvs -= uv_min
+        if extent > 0.0:
+            uvs /= extent
+
+    if texel_density != 1.0:
+        uvs *= texel_density
+
+    # Create UV layer if it doesn't exist
+    if not mesh.uv_layers:
+        mesh.uv_layers.new(name="UVMap")
+
+    mesh.uv_layers.active.data.foreach_set("uv", uvs.ravel())
+    return True
+
+
+# Node types that hand texture data straight through to their outputs
+PASSTHROUGH_NODE_TYPES = {
+    'REROUTE',
+    'SEPRGB', 'COMBRGB',
+    'SEPHSV', 'COMBHSV',
+    'SEPXYZ', 'COMBXYZ',
+    'SEPARATE_COLOR', 'COMBINE_COLOR',
+}
+
+
+class GroupSummary:
+    """What a node group tree resolves to, computed once per tree"""
+
+    def __init__(self):
+        self.outputs = {}           # output identifier -> (image names, group input identifiers)
+        self.normal_images = set()  # images feeding NORMAL_MAP nodes inside the group
+        self.normal_inputs = set()  # group inputs feeding NORMAL_MAP nodes inside the group
+        self.nested = set()         # names of every group used inside this one, at any depth
+
+
+class NodeGraphResolver:
+    """Follows links upstream through reroutes, separate/combine nodes and node groups.
+
+    Each node group tree is resolved once into a GroupSummary and reused for
+    every instance of the group, in every material.
+    """
+
+    def __init__(self):
+        self.groups = {}  # node group name -> GroupSummary
+        self._resolving = set()
+
+    def clear(self):
+        self.groups.clear()
+
+    def forget(self, group_names):
+        """Drop cached summaries for the given groups and every group containing them"""
+        for name, summary in list(self.groups.items()):
+            if name in group_names or summary.nested & group_names:
+                del self.groups[name]
+
+    def trace_input(self, socket):
+        """Return (image names, group input identifiers) feeding an input socket"""
+        images = set()
+        group_inputs = set()
+        self._trace_input(socket, images, group_inputs, set())
+        return images, group_inputs
+
+    def _trace_input(self, socket, images, group_inputs, visited):
+        for link in socket.links:
+            if link.is_muted or not link.is_valid:
+                continue
+            self._trace_output(link.from_node, link.from_socket, images, group_inputs, visited)
+
+    def _trace_output(self, node, socket, images, group_inputs, visited):
+        key = (node.name, socket.identifier)
+        if key in visited:
+            return
+        visited.add(key)
+
+        if node.mute:
+            # Muted nodes pass their internal links through
+            for link in node.internal_links:
+                if link.to_socket.identifier == socket.identifier:
+                    self._trace_input(link.from_socket, images, group_inputs, visited)
+            return
+
+        if node.type == 'TEX_IMAGE':
+            if node.image:
+                images.add(node.image.name)
+        elif node.type in PASSTHROUGH_NODE_TYPES:
+            for input in node.inputs:
+                self._trace_input(input, images, group_inputs, visited)
+        elif node.type == 'GROUP_INPUT':
+            group_inputs.add(socket.identifier)
+        elif node.type == 'GROUP' and node.node_tree:
+            group_images, passthrough = self.group_summary(node.node_tree).outputs.get(
+                socket.identifier, ((), ())
+            )
+            images.update(group_images)
+            for input in node.inputs:
+                if input.identifier in passthrough:
+                    self._trace_input(input, images, group_inputs, visited)
+
+    def group_summary(self, tree):
+        summary = self.groups.get(tree.name)
+        if summary is not None:
+            return summary
+        if tree.name in self._resolving:
+            # Recursive groups are invalid in Blender, but never loop on them
+            return GroupSummary()
+
+        self._resolving.add(tree.name)
+        try:
+            summary = GroupSummary()
+            profiler.count("nodes visited", len(tree.nodes))
+            for node in tree.nodes:
+                if node.type == 'GROUP_OUTPUT' and node.is_active_output:
+                    for input in node.inputs:
+                        summary.outputs[input.identifier] = self.trace_input(input)
+                else:
+                    if node.type == 'GROUP' and node.node_tree:
+                        summary.nested.add(node.node_tree.name)
+                        summary.nested |= self.group_summary(node.node_tree).nested
+                    for input_name, images, group_inputs in self.normal_sources(node):
+                        summary.normal_images |= images
+                        summary.normal_inputs |= group_inputs
+        finally:
+            self._resolving.discard(tree.name)
+
+        self.groups[tree.name] = summary
+        return summary
+
+    def normal_sources(self, node):
+        """Yield (input name, image names, group input identifiers) for every normal map fed through node.
+
+        Images that stay inside a node group are reported with an input name of None.
+        """
+        if node.type == 'NORMAL_MAP':
+            for input in node.inputs:
+                if input.is_linked:
+                    yield (input.name,) + self.trace_input(input)
+        elif node.type == 'GROUP' and node.node_tree:
+            inner = self.group_summary(node.node_tree)
+            if inner.normal_images:
+                yield None, inner.normal_images, set()
+            for input in node.inputs:
+                if input.identifier in inner.normal_inputs and input.is_linked:
+                    yield (input.name,) + self.trace_input(input)
+
+
+# Shared index of material node graphs
+class MaterialEntry:
+    """Everything the operators need to know about one material's node tree"""
+
+    def __init__(self, use_nodes=False, has_tree=False):
+        self.use_nodes = use_nodes
+        self.has_tree = has_tree
+        self.image_nodes = []   # (node name, image name)
+        self.normal_nodes = []  # names of NORMAL_MAP nodes
+        self.normal_edges = []  # (image name, NORMAL_MAP or group node name, input name)
+        self.groups = set()     # node groups used by the material, at any depth
+
+    @property
+    def normal_images(self):
+        return {edge[0] for edge in self.normal_edges}
+
+    def as_dict(self):
+        return {
+            "use_nodes": self.use_nodes,
+            "has_tree": self.has_tree,
+            "image_nodes": self.image_nodes,
+            "normal_nodes": self.normal_nodes,
+            "normal_edges": self.normal_edges,
+            "groups": sorted(self.groups),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        entry = cls(use_nodes=data["use_nodes"], has_tree=data["has_tree"])
+        entry.image_nodes = [tuple(item) for item in data["image_nodes"]]
+        entry.normal_nodes = list(data["normal_nodes"])
+        entry.normal_edges = [tuple(item) for item in data["normal_edges"]]
+        entry.groups = set(data["groups"])
+        return entry
+
+
+def material_shape(data):
+    """Node and link counts of a material's or node group's tree; cheap to compare on every lookup"""
+    tree = data if isinstance(data, bpy.types.NodeTree) else data.node_tree
+    shape = (len(tree.nodes), len(tree.links)) if tree is not None else None
+    return shape if tree is data else (data.use_nodes, shape)
+
+
+class MaterialIndex:
+    """Material -> image nodes, material -> normal-map edges and image -> materials.
+
+    Built in one traversal of bpy.data.materials. Entries only hold names so
+    the index never keeps pointers to datablocks that undo may have freed.
+
+    Edits are normally reported by the depsgraph handler. Materials and
+    groups no evaluated object uses, and edits made by scripts between
+    operators, aren't; needs_refresh() catches those by comparing each
+    entry's node and link counts and image node images (material_shape()).
+    Scripts whose edits keep all of those the same, like relinking a socket,
+    must call invalidate_material_index().
+    """
+
+    def __init__(self):
+        self.materials = {}     # material name -> MaterialEntry
+        self.image_users = {}   # image name -> set of material names
+        self.group_users = {}   # node group name -> set of material names
+        self.resolver = NodeGraphResolver()
+        self.fingerprints = {}  # material name -> material_fingerprint(), where it was computed
+        self.shapes = {}        # material or ("GROUP", group name) -> material_shape() when indexed
+        self.signature = None
+        # Filled by the depsgraph handler in live mode
+        self.dirty_materials = set()
+        self.dirty_groups = set()
+        self.stale = False
+        self._normal_maps = None
+
+    @staticmethod
+    def data_signature():
+        """Cheap check for datablocks being added or removed"""
+        return (len(bpy.data.materials), len(bpy.data.images), len(bpy.data.node_groups))
+
+    def build(self, persisted=None):
+        """Index every material.
+
+        persisted maps material names to (fingerprint, MaterialEntry) from a
+        saved scan index; those entries are taken over as they are when the
+        material's fingerprint still matches.
+        """
+        self.materials.clear()
+        self.image_users.clear()
+        self.group_users.clear()
+        self.fingerprints.clear()
+        self.shapes.clear()
+        self.resolver.clear()
+        group_fingerprints = {}
+        for mat in bpy.data.materials:
+            saved = persisted.get(mat.name) if persisted else None
+            if saved is not None:
+                fingerprint = material_fingerprint(mat, group_fingerprints)
+                self.fingerprints[mat.name] = fingerprint
+                if fingerprint == saved[0]:
+                    self.add_entry(mat.name, saved[1])
+                    self.shapes[mat.name] = material_shape(mat)
+                    profiler.count("materials reused")
+                    continue
+            self.add_material(mat)
+        self._mark_clean()
+
+    def _mark_clean(self):
+        self.dirty_materials.clear()
+        self.dirty_groups.clear()
+        self.stale = False
+        self.signature = self.data_signature()
+
+    def needs_refresh(self):
+        self._mark_unreported_edits()
+        if self.stale or self.dirty_materials or self.dirty_groups:
+            return True
+        if self.signature != self.data_signature():
+            return True
+        # Renames don't show up in the depsgraph, so compare names
+        return bool(
+            set(self.image_users).difference(bpy.data.images.keys())
+            or set(self.group_users).difference(bpy.data.node_groups.keys())
+        )
+
+    def _mark_unreported_edits(self):
+        """Mark materials and groups whose shape changed without a depsgraph update as dirty"""
+        for mat in bpy.data.materials:
+            entry = self.materials.get(mat.name)
+            if entry is None or self.shapes.get(mat.name) != material_shape(mat):
+                self.dirty_materials.add(mat.name)
+                continue
+            nodes = mat.node_tree.nodes if entry.image_nodes else ()
+            for node_name, image_name in entry.image_nodes:
+                image = getattr(nodes.get(node_name), "image", None)
+                if image is None or image.name != image_name:
+                    self.dirty_materials.add(mat.name)
+                    break
+        for group_name in self.group_users:
+            group = bpy.data.node_groups.get(group_name)
+            if group is not None and self.shapes.get(("GROUP", group_name)) != material_shape(group):
+                self.dirty_groups.add(group_name)
+
+    def refresh(self):
+        """Re-index only the materials that changed since the last build or refresh.
+
+        Besides the names collected by the depsgraph handler, materials whose
+        images or node groups were renamed or removed are picked up here with
+        name lookups only; no node tree is walked unless it needs re-indexing.
+        Returns the number of materials that were re-indexed.
+        """
+        current = {mat.name: mat for mat in bpy.data.materials}
+        dirty = {name for name in self.dirty_materials if name in current}
+
+        for name in list(self.materials):
+            if name not in current:
+                self.remove_material(name)
+        dirty.update(name for name in current if name not in self.materials)
+
+        stale_images = set(self.image_users).difference(bpy.data.images.keys())
+        for image_name in stale_images:
+            dirty.update(self.image_users[image_name])
+
+        groups = self.dirty_groups | set(self.group_users).difference(bpy.data.node_groups.keys())
+        if groups:
+            self.resolver.forget(groups)
+            for group_name in groups:
+                dirty.update(name for name in self.group_users.get(group_name, ()) if name in current)
+
+        for name in dirty:
+            self.update_material(current[name])
+        self._mark_clean()
+        return len(dirty)
+
+    def add_entry(self, name, entry):
+        """Add an entry that was indexed before (see build())"""
+        self.materials[name] = entry
+        self._normal_maps = None
+        for node_name, image_name in entry.image_nodes:
+            self.image_users.setdefault(image_name, set()).add(name)
+        self._add_group_users(name, entry)
+
+    def _add_group_users(self, name, entry):
+        for group_name in entry.groups:
+            self.group_users.setdefault(group_name, set()).add(name)
+            group = bpy.data.node_groups.get(group_name)
+            if group is not None:
+                self.shapes["GROUP", group_name] = material_shape(group)
+
+    def add_material(self, mat):
+        entry = MaterialEntry(use_nodes=mat.use_nodes, has_tree=mat.node_tree is not None)
+        self.materials[mat.name] = entry
+        self.shapes[mat.name] = material_shape(mat)
+        self._normal_maps = None
+        if not entry.has_tree:
+            return entry
+
+        profiler.count("materials indexed")
+        profiler.count("nodes visited", len(mat.node_tree.nodes))
+        for node in mat.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                entry.image_nodes.append((node.name, node.image.name))
+                self.image_users.setdefault(node.image.name, set()).add(mat.name)
+            else:
+                if node.type == 'NORMAL_MAP':
+                    entry.normal_nodes.append(node.name)
+                elif node.type == 'GROUP' and node.node_tree:
+                    entry.groups.add(node.node_tree.name)
+                    entry.groups |= self.resolver.group_summary(node.node_tree).nested
+                # Follow links upstream through reroutes and node groups
+                for input_name, images, group_inputs in self.resolver.normal_sources(node):
+                    for image_name in images:
+                        entry.normal_edges.append((image_name, node.name, input_name))
+
+        self._add_group_users(mat.name, entry)
+        return entry
+
+    def remove_material(self, name):
+        entry = self.materials.pop(name, None)
+        self.fingerprints.pop(name, None)
+        self.shapes.pop(name, None)
+        if entry is None:
+            return
+        self._normal_maps = None
+        for node_name, image_name in entry.image_nodes:
+            users = self.image_users.get(image_name)
+            if users is not None:
+                users.discard(name)
+                if not users:
+                    del self.image_users[image_name]
+        for group_name in entry.groups:
+            users = self.group_users.get(group_name)
+            if users is not None:
+                users.discard(name)
+                if not users:
+                    del self.group_users[group_name]
+                    self.shapes.pop(("GROUP", group_name), None)
+
+    def update_material(self, mat):
+        """Re-index a single material after an operator changed it"""
+        self.remove_material(mat.name)
+        self.add_material(mat)
+
+    def normal_maps(self):
+        """Return (normal map names, [(material name, sorted texture names)])"""
+        if self._normal_maps is None:
+            normal_maps = set()
+            material_usage = []
+            for mat_name, entry in self.materials.items():
+                mat_normals = entry.normal_images
+                if mat_normals:
+                    normal_maps |= mat_normals
+                    material_usage.append((mat_name, sorted(mat_normals)))
+            self._normal_maps = (normal_maps, material_usage)
+        normal_maps, material_usage = self._normal_maps
+        return set(normal_maps), list(material_usage)
+
+    def used_images(self, require_use_nodes=True):
+        """Names of images referenced by a TEX_IMAGE node in any material"""
+        used = set()
+        for entry in self.materials.values():
+            if require_use_nodes and not entry.use_nodes:
+                continue
+            used.update(image_name for node_name, image_name in entry.image_nodes)
+        return used
+
+    def has_texture(self, mat):
+        """Check if a material uses any texture nodes"""
+        if not mat:
+            return False
+        entry = self.materials.get(mat.name)
+        return bool(entry and entry.use_nodes and entry.image_nodes)
+
+
+_material_index = None
+_persisted_entries = None  # set by load_scan_index(); used by the next build
+
+
+def get_material_index():
+    """Return the shared index, bringing it up to date if the data changed"""
+    global _material_index, _persisted_entries
+    if _material_index is None:
+        _material_index = MaterialIndex()
+    if _material_index.signature is None:
+        # Entries from a saved scan index only describe the file as it was opened
+        _material_index.build(_persisted_entries)
+        _persisted_entries = None
+    elif _material_index.needs_refresh():
+        _material_index.refresh()
+    return _material_index
+
+
+def cached_material_index():
+    """Return the shared index as it is, without building or refreshing it (for UI drawing)"""
+    if _material_index is None or _material_index.signature is None:
+        return None
+    return _material_index
+
+
+def invalidate_material_index():
+    if _material_index is not None:
+        _material_index.signature = None
+
+
+# Set while a ChunkedOperator works through its items. The operators keep
+# the index up to date themselves, so the depsgraph updates between their
+# ticks must not drop it and make the next tick rebuild it.
+_chunked_run_active = False
+
+
+def _live_mode_enabled(scene):
+    settings = getattr(scene, "scan_settings", None)
+    return bool(settings and settings.live_mode)
+
+
+@persistent
+def _invalidate_on_depsgraph_update(scene, depsgraph):
+    index = cached_material_index()
+    if index is None or _chunked_run_active:
+        return
+
+    live = _live_mode_enabled(scene)
+    changed = False
+    for update in depsgraph.updates:
+        id_data = update.id
+        if isinstance(id_data, bpy.types.Material):
+            index.dirty_materials.add(id_data.name)
+        elif isinstance(id_data, bpy.types.NodeTree):
+            # Embedded material trees are reported together with their material
+            if not id_data.is_embedded_data:
+                index.dirty_groups.add(id_data.name)
+        elif isinstance(id_data, bpy.types.Image):
+            index.stale = True
+        else:
+            continue
+        changed = True
+
+    if not changed:
+        return
+    if not live:
+        invalidate_material_index()
+    elif not bpy.app.timers.is_registered(_refresh_live_results):
+        # Batch bursts of edits (e.g. dragging a slider) into one refresh
+        bpy.app.timers.register(_refresh_live_results, first_interval=0.25)
+
+
+def _refresh_live_results():
+    """Timer callback: re-index dirty materials, or build the index if it was dropped, and redraw the panel"""
+    index = cached_material_index()
+    if index is not None and not index.needs_refresh():
+        return None
+    get_material_index()
+    for window in getattr(bpy.context.window_manager, "windows", ()):
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+
+@persistent
+def _invalidate_on_load(*args):
+    invalidate_material_index()
+    # Without an index the depsgraph handler ignores edits, so live mode builds a new one
+    if _live_mode_enabled(bpy.context.scene) and not bpy.app.timers.is_registered(_refresh_live_results):
+        bpy.app.timers.register(_refresh_live_results, first_interval=0.25)
+
+
+# Scan index saved next to the .blend file, so reopening an unchanged file
+# shows the last scan right away and a new scan only re-indexes materials
+# that changed. Entries are keyed by fingerprints of the node trees; pixel
+# results by image_fingerprint().
+
+SCAN_INDEX_SUFFIX = ".normal_scan.json"
+SCAN_INDEX_VERSION = 2
+
+_last_scan_report = None  # report of the last scan, kept to re-save with the file
+
+
+def node_tree_fingerprint(tree, group_fingerprints):
+    """Hash of what the index reads from a node tree: nodes, their images and groups, and links.
+
+    Nested groups contribute their own fingerprint, memoized in group_fingerprints.
+    """
+    parts = []
+    for node in tree.nodes:
+        image = getattr(node, "image", None)
+        group = node.node_tree if node.type == 'GROUP' else None
+        parts.append((node.name, node.bl_idname, node.mute, image.name if image else ""))
+        if group is not None:
+            if group.name not in group_fingerprints:
+                group_fingerprints[group.name] = node_tree_fingerprint(group, group_fingerprints)
+            parts.append((group.name, group_fingerprints[group.name], [socket.name for socket in node.inputs]))
+    for link in tree.links:
+        parts.append((
+            link.from_node.name, link.from_socket.identifier,
+            link.to_node.name, link.to_socket.identifier, link.is_muted,
+        ))
+    return content_hash(repr(parts))
+
+
+def material_fingerprint(mat, group_fingerprints):
+    tree = mat.node_tree
+    return content_hash(repr((mat.use_nodes, node_tree_fingerprint(tree, group_fingerprints) if tree else None)))
+
+
+def scan_index_path():
+    """Sidecar file of the open .blend file, or None while it has never been saved"""
+    return bpy.data.filepath + SCAN_INDEX_SUFFIX if bpy.data.filepath else None
+
+
+def _blend_file_stamp():
+    import os
+
+    stat = os.stat(bpy.data.filepath)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_scan_index(report, matches_file):
+    """Save the index, the cached pixel results and a scan report next to the .blend file.
+
+    report is a dict with "normal_maps", "material_usage", "likely_normal_maps"
+    and "duplicate_images". It is only shown again on load when it was made
+    from what is in the .blend file on disk (matches_file), and that file
+    hasn't changed since, going by its size and modification time.
+    """
+    import json
+    import os
+
+    path = scan_index_path()
+    index = cached_material_index()
+    if path is None or index is None:
+        return False
+
+    group_fingerprints = {}
+    materials = {}
+    for name, entry in index.materials.items():
+        mat = bpy.data.materials.get(name)
+        if mat is None:
+            continue
+        fingerprint = index.fingerprints.get(name)
+        if fingerprint is None:
+            fingerprint = index.fingerprints[name] = material_fingerprint(mat, group_fingerprints)
+        materials[name] = [fingerprint, entry.as_dict()]
+
+    record = {
+        "version": SCAN_INDEX_VERSION,
+        "blend": _blend_file_stamp() if matches_file else None,
+        "materials": materials,
+        "confidence": [[key, score] for key, score in _confidence_cache.items()],
+        "duplicates": [[key, value] for key, value in _duplicate_cache.items()],
+        "report": report,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return True
+
+
+def _as_tuple(value):
+    """JSON lists back to the (nested) tuples used as cache keys"""
+    return tuple(_as_tuple(item) for item in value) if isinstance(value, list) else value
+
+
+def load_scan_index():
+    """Read the sidecar of the file that was just opened; returns its report if the file is unchanged, else None"""
+    import json
+
+    global _persisted_entries, _last_scan_report
+    _persisted_entries = None
+    _last_scan_report = None
+    path = scan_index_path()
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("version") != SCAN_INDEX_VERSION:
+        return None
+
+    _persisted_entries = {
+        name: (fingerprint, MaterialEntry.from_dict(entry))
+        for name, (fingerprint, entry) in record["materials"].items()
+    }
+    for key, score in record["confidence"]:
+        _confidence_cache.setdefault(_as_tuple(key), score)
+    for key, value in record["duplicates"]:
+        _duplicate_cache.setdefault(_as_tuple(key), _as_tuple(value))
+    if record["blend"] is None or record["blend"] != _blend_file_stamp():
+        return None
+    _last_scan_report = record["report"]
+    return _last_scan_report
+
+
+def show_scan_report(wm, report):
+    fill_scan_results(
+        wm, report["normal_maps"], [(mat_name, textures) for mat_name, textures in report["material_usage"]],
+        [(name, confidence, users) for name, confidence, users in report["likely_normal_maps"]],
+        report["duplicate_images"],
+    )
+
+
+@persistent
+def _load_scan_index_on_load(*args):
+    settings = getattr(bpy.context.scene, "scan_settings", None)
+    if settings is None or not settings.save_scan_index:
+        return
+    report = load_scan_index()
+    if report is not None:
+        show_scan_report(bpy.context.window_manager, report)
+
+
+@persistent
+def _write_scan_index_on_save(filepath="", *args):
+    # Re-save the last report with the new file, if nothing changed since the scan.
+    # Copies (Save Copy, the export snapshot) leave bpy.data.filepath as it was,
+    # and the index belongs to the open file, not the copy.
+    if filepath != bpy.data.filepath:
+        return
+    settings = getattr(bpy.context.scene, "scan_settings", None)
+    index = cached_material_index()
+    if settings is None or not settings.save_scan_index or _last_scan_report is None:
+        return
+    if index is None or index.needs_refresh():
+        return
+    try:
+        write_scan_index(_last_scan_report, matches_file=True)
+    except OSError as e:
+        print(f"Could not save the scan index: {e}")
+
+
+_index_handlers = [
+    (bpy.app.handlers.depsgraph_update_post, _invalidate_on_depsgraph_update),
+    (bpy.app.handlers.load_post, _invalidate_on_load),
+    (bpy.app.handlers.load_post, _load_scan_index_on_load),
+    (bpy.app.handlers.save_post, _write_scan_index_on_save),
+    (bpy.app.handlers.undo_post, _invalidate_on_load),
+    (bpy.app.handlers.redo_post, _invalidate_on_load),
+]
+
+
+# Image pixel helpers
+
+# Blender's default PNG compression (15%) maps to zlib level 1
+PNG_COMPRESS_LEVEL = 1
+
+
+def image_pixels(img):
+    """Snapshot an image's pixels as a flat float32 array in one bulk read"""
+    import numpy as np
+
+    pixels = np.empty(len(img.pixels), dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    return pixels
+
+
+def png_channels(img):
+    """Channels Blender would write this image's PNG with, or None if we can't encode it ourselves"""
+    if img.is_float:
+        return None
+    return {8: 1, 24: 3, 32: 4}.get(img.depth)
+
+
+def pixel_bands(pixels, width, height, src_channels, band_rows):
+    """Yield top-down bands of a bottom-up float snapshot as views, without copying it"""
+    image = pixels.reshape(height, width, src_channels)
+    for top in range(0, height, band_rows):
+        bottom = min(top + band_rows, height)
+        yield image[height - bottom:height - top][::-1]
+
+
+def band_to_bytes(band, channels):
+    """Convert float pixels to uint8, like Blender's float -> byte conversion"""
+    import numpy as np
+
+    return np.clip(band[:, :, :channels] * 255.0 + 0.5, 0.0, 255.0).astype(np.uint8)
+
+
+def iter_png(bands, width, height, channels, compress_level=PNG_COMPRESS_LEVEL):
+    """Yield the pieces of an 8-bit PNG built from top-down uint8 bands of shape (rows, width, channels).
+
+    Every band is filtered and compressed as it comes in and becomes its own
+    IDAT chunk, so memory use depends on the band size, not the image size.
+    """
+    import struct
+    import zlib
+    import numpy as np
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    yield b"\x89PNG\r\n\x1a\n"
+    yield chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+
+    compressor = zlib.compressobj(compress_level)
+    previous = np.zeros(width * channels, dtype=np.uint8)
+    for band in bands:
+        # 'Up' filter on every row; uint8 arithmetic wraps modulo 256 as PNG expects
+        flat = band.reshape(len(band), width * channels)
+        filtered = np.empty((len(flat), width * channels + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(flat[0], previous, out=filtered[0, 1:])
+        np.subtract(flat[1:], flat[:-1], out=filtered[1:, 1:])
+        previous = flat[-1].copy()
+        data = compressor.compress(filtered.tobytes())
+        if data:
+            yield chunk(b"IDAT", data)
+    yield chunk(b"IDAT", compressor.flush())
+    yield chunk(b"IEND", b"")
+
+
+def encode_png(rows, compress_level=PNG_COMPRESS_LEVEL):
+    """Encode top-down uint8 rows of shape (height, width, channels) as an 8-bit PNG"""
+    height, width, channels = rows.shape
+    return b"".join(iter_png([rows], width, height, channels, compress_level))
+
+
+def normal_rg_bytes(band, channels=2):
+    """Renormalize a band of tangent-space normals and keep X and Y as two uint8 channels.
+
+    Z is clamped to the front hemisphere before normalizing, so readers can
+    rebuild it as sqrt(1 - x^2 - y^2).
+    """
+    import numpy as np
+
+    vectors = band[:, :, :3] * 2.0 - 1.0
+    np.maximum(vectors[:, :, 2], 0.0, out=vectors[:, :, 2])
+    lengths = np.sqrt(np.einsum('ijk,ijk->ij', vectors, vectors))[:, :, None]
+    flat = lengths[:, :, 0] == 0.0
+    vectors /= np.where(lengths == 0.0, 1.0, lengths)
+    vectors[flat] = (0.0, 0.0, 1.0)
+    return np.clip(vectors[:, :, :2] * 127.5 + 128.0, 0.0, 255.0).astype(np.uint8)
+
+
+def write_png(filepath, pixels, width, height, src_channels, channels, band_rows=256, encode=band_to_bytes):
+    """Encode a pixel snapshot band by band and stream it to disk (safe to run on a worker thread).
+
+    encode turns a float band into uint8 channels. Returns the content hash
+    of the written file.
+    """
+    import hashlib
+
+    bands = (encode(band, channels) for band in pixel_bands(pixels, width, height, src_channels, band_rows))
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, "wb") as f:
+        for data in iter_png(bands, width, height, channels):
+            f.write(data)
+            h.update(data)
+    return h.hexdigest()
+
+
+class PixelBudget:
+    """Keeps the pixel buffers held by worker jobs under a memory budget.
+
+    bpy can only hand out an image's pixels as one float32 snapshot, so a
+    job costs its snapshot (plus its output, if any) while it is in flight.
+    Jobs are admitted while they fit; the work inside a job runs on bands
+    of rows sized from a slice of the budget. Images whose snapshot alone
+    would exceed the budget have to go through Blender's own in-place code
+    instead. Only used from the main thread.
+    """
+
+    def __init__(self, budget_mb, workers):
+        self.budget = int(budget_mb) * 1024 * 1024
+        self.workers = workers
+        # A quarter of the budget is kept for the per-band working memory of the workers
+        self.band_bytes = max(self.budget // (4 * workers), 1 << 20)
+        self.available = self.budget - self.band_bytes * workers
+        self.in_use = 0
+
+    @staticmethod
+    def snapshot_bytes(img, width=None, height=None):
+        width = img.size[0] if width is None else width
+        height = img.size[1] if height is None else height
+        return width * height * img.channels * 4
+
+    def fits_alone(self, cost):
+        return cost <= self.available
+
+    def fits(self, cost):
+        return self.in_use + cost <= self.available
+
+    def reserve(self, cost):
+        self.in_use += cost
+
+    def release(self, cost):
+        self.in_use -= cost
+
+    def band_rows(self, row_bytes):
+        """Rows per band so a band's working set stays within the per-worker slice"""
+        return max(1, int(self.band_bytes // max(row_bytes, 1)))
+
+
+def point_image_at_file(img, filepath, file_format, holds_pixels=True):
+    """Make an image reference a file we wrote for it, as img.save() would have left it.
+
+    A clean generated image becomes a FILE image that reads its pixels from
+    the file. Images with unsaved edits only get filepath_raw: switching
+    the source or assigning img.filepath reloads the image and throws away
+    the pixels in memory, which the export must not do. holds_pixels=False
+    is for files that don't hold the image's pixels (two-channel copies,
+    restoring the original path); those only set the path as well.
+    """
+    img.filepath_raw = filepath
+    img.file_format = file_format
+    if holds_pixels and not img.is_dirty and img.source == 'GENERATED':
+        img.source = 'FILE'
+
+
+def nearest_power_of_2(n):
+    """Find the nearest power of 2 to n"""
+    if n <= 0:
+        return 1
+    # Find lower and upper power of 2
+    lower = 1
+    while lower * 2 <= n:
+        lower *= 2
+    upper = lower * 2
+    # Return the closer one
+    if n - lower < upper - n:
+        return lower
+    return upper
+
+
+def is_power_of_2(n):
+    """Check if n is a power of 2"""
+    return n > 0 and (n & (n - 1)) == 0
+
+
+def power_of_2_size(width, height):
+    """Size an image gets from SCAN_OT_fix_image_dimensions: each side to its nearest power of 2"""
+    return (
+        width if is_power_of_2(width) else nearest_power_of_2(width),
+        height if is_power_of_2(height) else nearest_power_of_2(height),
+    )
+
+
+def image_memory_bytes(img, width, height):
+    """Memory of an image buffer at the given size"""
+    return width * height * img.channels * (4 if img.is_float else 1)
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+# GPU texture memory estimates
+
+def gpu_texture_bytes(img, width=None, height=None, mipmaps=True):
+    """Estimated GPU memory of an image, at its power-of-2 export size unless a size is given.
+
+    Byte images are uploaded with 8 bits per channel, float images with 16
+    (half precision) or 32. Three channels are padded to four since GPUs
+    have no three-channel formats, and a full mip chain adds a third.
+    """
+    if width is None or height is None:
+        width, height = power_of_2_size(img.size[0], img.size[1])
+    channels = 4 if img.channels == 3 else img.channels
+    if img.is_float:
+        bytes_per_channel = 2 if getattr(img, "use_half_precision", True) else 4
+    else:
+        bytes_per_channel = 1
+    size = width * height * channels * bytes_per_channel
+    return size * 4 // 3 if mipmaps else size
+
+
+def scene_texture_usage(scene, index):
+    """Images used by the objects of a scene: (material name -> image names, object name -> image names)"""
+    material_images = {}
+    object_images = {}
+    for obj in scene.objects:
+        names = set()
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat is None:
+                continue
+            if mat.name not in material_images:
+                entry = index.materials.get(mat.name)
+                material_images[mat.name] = {
+                    image_name for node_name, image_name in entry.image_nodes
+                } if entry and entry.use_nodes else set()
+            names |= material_images[mat.name]
+        if names:
+            object_images[obj.name] = names
+    return material_images, object_images
+
+
+def plan_texture_budget(images, normal_maps, target_bytes, min_size):
+    """Halve textures until their estimated GPU memory fits target_bytes.
+
+    Normal maps go first, then everything else; within each group the
+    biggest texture is halved next. No side is taken below min_size.
+    Returns ({image name: (width, height)}, estimated bytes after).
+    """
+    import heapq
+
+    sizes = {img.name: power_of_2_size(img.size[0], img.size[1]) for img in images}
+    heap = []
+    total = 0
+    for img in images:
+        cost = gpu_texture_bytes(img, *sizes[img.name])
+        total += cost
+        heap.append((img.name not in normal_maps, -cost, img.name, img))
+    heapq.heapify(heap)
+
+    while total > target_bytes and heap:
+        tier, neg_cost, name, img = heapq.heappop(heap)
+        width, height = sizes[name]
+        if min(width, height) // 2 < min_size:
+            continue
+        sizes[name] = (width // 2, height // 2)
+        cost = gpu_texture_bytes(img, *sizes[name])
+        total -= -neg_cost - cost
+        heapq.heappush(heap, (tier, -cost, name, img))
+    return sizes, total
+
+
+# Asset costs of a scene's objects, materials and collections. Triangles are
+# counted once per mesh, image sizes come from foreach_get over
+# bpy.data.images, and the sums over collections are taken with NumPy, so
+# a scene with 100k objects is done in seconds.
+
+ASSET_COST_KINDS = [
+    ('OBJECT', "Objects", "Mesh objects of the scene"),
+    ('MATERIAL', "Materials", "Materials on the scene's mesh objects"),
+    ('COLLECTION', "Collections", "Collections of the scene, including the objects of their children"),
+]
+
+# Report columns: (identifier, name, description) and the SCAN_PG_asset_cost property
+ASSET_COST_COLUMNS = [
+    ('TRIANGLES', "Triangles", "Triangles after triangulation: loops - 2 x polygons"),
+    ('TEXTURE_MEMORY', "Texture Memory", "Estimated GPU memory of the textures used, each image counted once"),
+    ('MISSING_UVS', "Missing UVs", "Mesh objects with textured materials but no UV map"),
+    ('NORMAL_COVERAGE', "Normal Coverage", "Share of the triangles whose material has a normal map"),
+]
+ASSET_COST_PROPERTIES = {
+    'TRIANGLES': "triangles",
+    'TEXTURE_MEMORY': "texture_bytes",
+    'MISSING_UVS': "missing_uvs",
+    'NORMAL_COVERAGE': "normal_coverage",
+}
+
+
+def image_gpu_bytes(images):
+    """gpu_texture_bytes() of every image in a bpy.data.images collection, in its order, read in bulk"""
+    import numpy as np
+
+    count = len(images)
+    sizes = np.empty(count * 2, dtype=np.int32)
+    channels = np.empty(count, dtype=np.int32)
+    is_float = np.empty(count, dtype=bool)
+    half = np.empty(count, dtype=bool)
+    images.foreach_get("size", sizes)
+    images.foreach_get("channels", channels)
+    images.foreach_get("is_float", is_float)
+    images.foreach_get("use_half_precision", half)
+
+    # nearest_power_of_2() of both sides
+    sizes = sizes.reshape(-1, 2).astype(np.int64)
+    sides = np.maximum(sizes, 1)
+    lower = np.left_shift(1, np.floor(np.log2(sides)).astype(np.int64))
+    sides = np.where(sides - lower < lower * 2 - sides, lower, lower * 2)
+
+    channels = np.where(channels == 3, 4, channels)
+    bytes_per_channel = np.where(is_float, np.where(half, 2, 4), 1)
+    total = sides[:, 0] * sides[:, 1] * channels * bytes_per_channel * 4 // 3
+    # Images without pixels (missing files, empty generated ones) take nothing
+    return np.where((sizes == 0).any(axis=1), 0, total)
+
+
+def mesh_slot_triangles(mesh, slot_count):
+    """Triangles of a mesh per material slot; only meshes with several slots are read per polygon"""
+    import numpy as np
+
+    polygons = len(mesh.polygons)
+    if slot_count <= 1:
+        return np.array([len(mesh.loops) - 2 * polygons], dtype=np.int64)
+    material_index = np.empty(polygons, dtype=np.int32)
+    loop_total = np.empty(polygons, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    # Indices past the last slot are drawn with the last slot's material
+    slot = np.minimum(material_index, slot_count - 1)
+    return np.bincount(slot, weights=loop_total - 2, minlength=slot_count).astype(np.int64)
+
+
+class AssetCostTable:
+    """Rows of one ASSET_COST_KINDS kind: names and an array per ASSET_COST_COLUMNS column"""
+
+    def __init__(self, names, triangles, texture_bytes, missing_uvs, normal_triangles):
+        import numpy as np
+
+        self.names = names
+        self.columns = {
+            'TRIANGLES': triangles,
+            'TEXTURE_MEMORY': texture_bytes,
+            'MISSING_UVS': missing_uvs,
+            'NORMAL_COVERAGE': np.divide(
+                normal_triangles, triangles, out=np.zeros(len(names)), where=triangles > 0
+            ),
+        }
+
+    def top(self, limit):
+        """Indices of the rows among the `limit` largest of any column"""
+        import numpy as np
+
+        rows = set()
+        for values in self.columns.values():
+            if len(values) > limit:
+                rows.update(np.argpartition(-values, limit - 1)[:limit].tolist())
+            else:
+                rows.update(range(len(values)))
+        return sorted(rows)
+
+
+def scene_asset_costs(scene, index):
+    """AssetCostTable per ASSET_COST_KINDS kind for the mesh objects of a scene, and the scene totals.
+
+    Objects are costed with every instance counted, materials with the
+    triangles assigned to them, and collections with all their objects,
+    including those of child collections. Texture memory counts each image
+    once per row, the totals once for the whole scene.
+    """
+    import numpy as np
+
+    image_row = {name: i for i, name in enumerate(bpy.data.images.keys())}
+    image_bytes = image_gpu_bytes(bpy.data.images)
+
+    # Material name -> (row, image rows, has a normal map); filled as materials turn up
+    materials = {}
+    # Tuple of the material names of an object -> row; objects with the same
+    # materials use the same images, so unions are taken once per combination
+    combinations = {}
+    combination_images = []
+    mesh_costs = {}
+
+    names = []
+    triangles = []
+    normal_triangles = []
+    missing_uvs = []
+    combination = []
+    # (object row, material row, triangles) for every material an object uses
+    uses = []
+    for obj in scene.objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.data
+        slot_materials = [slot.material for slot in obj.material_slots]
+        key = (mesh, len(slot_materials))
+        if key not in mesh_costs:
+            slot_triangles = mesh_slot_triangles(mesh, len(slot_materials))
+            mesh_costs[key] = slot_triangles.tolist(), int(slot_triangles.sum()), len(mesh.uv_layers) > 0
+        slot_triangles, mesh_triangles, has_uv = mesh_costs[key]
+
+        row = len(names)
+        used = {}
+        normal = 0
+        textured = False
+        for mat, count in zip(slot_materials, slot_triangles):
+            if mat is None:
+                continue
+            info = materials.get(mat.name)
+            if info is None:
+                entry = index.materials.get(mat.name)
+                if entry and entry.use_nodes:
+                    image_rows = frozenset(
+                        image_row[image_name] for node_name, image_name in entry.image_nodes
+                        if image_name in image_row
+                    )
+                    info = (len(materials), image_rows, bool(entry.normal_edges))
+                else:
+                    info = (len(materials), frozenset(), False)
+                materials[mat.name] = info
+            used[info[0]] = used.get(info[0], 0) + count
+            textured = textured or bool(info[1])
+            if info[2]:
+                normal += count
+
+        materials_key = tuple(mat.name for mat in slot_materials if mat is not None)
+        if materials_key not in combinations:
+            combinations[materials_key] = len(combination_images)
+            combination_images.append(frozenset().union(*(materials[name][1] for name in materials_key)))
+        names.append(obj.name)
+        triangles.append(mesh_triangles)
+        normal_triangles.append(normal)
+        missing_uvs.append(textured and not has_uv)
+        combination.append(combinations[materials_key])
+        uses.extend((row, material_row, count) for material_row, count in used.items())
+
+    def images_bytes(image_rows):
+        return int(image_bytes[list(image_rows)].sum()) if image_rows else 0
+
+    triangles = np.array(triangles, dtype=np.int64)
+    normal_triangles = np.array(normal_triangles, dtype=np.int64)
+    missing_uvs = np.array(missing_uvs, dtype=np.int64)
+    combination = np.array(combination, dtype=np.int64)
+    combination_bytes = np.array([images_bytes(rows) for rows in combination_images], dtype=np.int64)
+    tables = {
+        'OBJECT': AssetCostTable(names, triangles, combination_bytes[combination], missing_uvs, normal_triangles),
+    }
+
+    material_names = list(materials)
+    uses = np.array(uses, dtype=np.int64).reshape(-1, 3)
+    material_triangles = np.bincount(uses[:, 1], weights=uses[:, 2], minlength=len(materials)).astype(np.int64)
+    has_normal = np.array([materials[name][2] for name in material_names], dtype=bool)
+    tables['MATERIAL'] = AssetCostTable(
+        material_names, material_triangles,
+        np.array([images_bytes(materials[name][1]) for name in material_names], dtype=np.int64),
+        np.bincount(uses[:, 1], weights=missing_uvs[uses[:, 0]], minlength=len(materials)).astype(np.int64),
+        np.where(has_normal, material_triangles, 0),
+    )
+
+    object_row = {name: row for row, name in enumerate(names)}
+    collection_names = []
+    collection_columns = []
+    for collection in scene.collection.children_recursive:
+        rows = np.fromiter(
+            (object_row[obj.name] for obj in collection.all_objects if obj.name in object_row), dtype=np.int64
+        )
+        image_rows = frozenset().union(*(combination_images[c] for c in np.unique(combination[rows]).tolist()))
+        collection_names.append(collection.name)
+        collection_columns.append((
+            triangles[rows].sum(), images_bytes(image_rows), missing_uvs[rows].sum(), normal_triangles[rows].sum(),
+        ))
+    columns = np.array(collection_columns, dtype=np.int64).reshape(-1, 4)
+    tables['COLLECTION'] = AssetCostTable(collection_names, *columns.T)
+
+    totals = {
+        'objects': len(names),
+        'triangles': int(triangles.sum()),
+        'texture_bytes': images_bytes(frozenset().union(*combination_images)),
+        'missing_uvs': int(missing_uvs.sum()),
+        'normal_coverage': float(normal_triangles.sum() / triangles.sum()) if triangles.sum() > 0 else 0.0,
+    }
+    return tables, totals
+
+
+# Resampling filters: (identifier, name, description) and kernel support in pixels
+RESAMPLE_FILTERS = [
+    ('BOX', "Box", "Average of the covered pixels; fast but soft"),
+    ('BILINEAR', "Bilinear", "Triangle filter"),
+    ('LANCZOS', "Lanczos", "Lanczos-3 windowed sinc; sharpest"),
+]
+RESAMPLE_SUPPORT = {'BOX': 0.5, 'BILINEAR': 1.0, 'LANCZOS': 3.0}
+
+
+def _resample_kernel(filter_name, x):
+    import numpy as np
+
+    x = np.abs(x)
+    if filter_name == 'BOX':
+        return (x <= 0.5).astype(np.float64)
+    if filter_name == 'BILINEAR':
+        return np.maximum(0.0, 1.0 - x)
+    return np.where(x < 3.0, np.sinc(x) * np.sinc(x / 3.0), 0.0)
+
+
+def resample_weights(src_size, dst_size, filter_name):
+    """Source indices and normalized weights, shape (dst_size, taps), for one axis.
+
+    The kernel is widened by the scale factor when shrinking, so every source
+    pixel contributes; edges are clamped.
+    """
+    import numpy as np
+
+    scale = src_size / dst_size
+    stretch = max(scale, 1.0)
+    support = RESAMPLE_SUPPORT[filter_name] * stretch
+    centers = (np.arange(dst_size) + 0.5) * scale
+    taps = int(np.ceil(support * 2.0)) + 1
+    indices = np.floor(centers - support).astype(np.int64)[:, None] + np.arange(taps)[None, :]
+    weights = _resample_kernel(filter_name, (indices + 0.5 - centers[:, None]) / stretch)
+    sums = weights.sum(axis=1, keepdims=True)
+    sums[sums == 0.0] = 1.0
+    weights /= sums
+    return np.clip(indices, 0, src_size - 1), weights.astype(np.float32)
+
+
+def resample_axis(pixels, indices, weights, axis):
+    """Resample an array of shape (height, width, channels) along one axis"""
+    import numpy as np
+
+    shape = [1, 1, 1]
+    shape[axis] = -1
+    out = None
+    for k in range(indices.shape[1]):
+        tap_weights = weights[:, k]
+        if not tap_weights.any():
+            continue
+        term = np.take(pixels, indices[:, k], axis=axis)
+        term *= tap_weights.reshape(shape)
+        if out is None:
+            out = term
+        else:
+            out += term
+    return out
+
+
+def resize_pixels(pixels, width, height, channels, new_width, new_height, filter_name, clamp=True, band_rows=256):
+    """Resize a flat float32 pixel snapshot (safe to run on a worker thread).
+
+    Output rows are produced in bands: each band resamples horizontally only
+    the source rows its vertical taps reach, so the working memory depends on
+    band_rows, not on the image height.
+    """
+    import numpy as np
+
+    image = pixels.reshape(height, width, channels)
+    x_indices, x_weights = resample_weights(width, new_width, filter_name)
+    y_indices, y_weights = resample_weights(height, new_height, filter_name)
+    out = np.empty((new_height, new_width, channels), dtype=np.float32)
+    for top in range(0, new_height, band_rows):
+        bottom = min(top + band_rows, new_height)
+        rows = y_indices[top:bottom]
+        first = int(rows.min())
+        source = resample_axis(image[first:int(rows.max()) + 1], x_indices, x_weights, axis=1)
+        out[top:bottom] = resample_axis(source, rows - first, y_weights[top:bottom], axis=0)
+    if clamp:
+        # Lanczos rings past the byte range
+        np.clip(out, 0.0, 1.0, out=out)
+    return out.ravel()
+
+
+def resize_band_row_bytes(width, height, new_width, new_height, channels):
+    """Working memory per output row of resize_pixels: source rows per output row, times two buffers"""
+    return new_width * channels * 4 * (max(1.0, height / new_height) + 1) * 2
+
+
+def resize_image_buffer(img, width, height):
+    """Give an image a buffer of a new size whose pixels are about to be overwritten.
+
+    There is no API for that, and img.scale() resamples the whole source on
+    the main thread (about 3 s for an 8K image). A generated image gets a
+    blank buffer from its generated size instead. Any other image is first
+    scaled to 1x1, which is about ten times cheaper, and then scaled up, so it
+    stays linked to its file or packed data.
+    """
+    if img.source == 'GENERATED' and not img.packed_file:
+        img.generated_width = width
+        img.generated_height = height
+    else:
+        img.scale(1, 1)
+        img.scale(width, height)
+
+
+def resize_images(planned, filter_name, budget_mb, normal_maps=()):
+    """Resize images to new sizes with the banded resampler on a thread pool.
+
+    planned holds (image, width, height, new width, new height). Pixels are
+    snapshotted on this thread, resampled on the pool within the pixel
+    memory budget and written back on this thread. Images named in
+    normal_maps are resampled as vectors (resize_normal_pixels()). Returns a
+    description of every resize that was done.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    images_fixed = []
+    workers = os.cpu_count() or 1
+    budget = PixelBudget(budget_mb, workers)
+    in_flight = {}
+    
+    def finish(future):
+        img, width, height, new_width, new_height, cost = in_flight.pop(future)
+        budget.release(cost)
+        try:
+            pixels = future.result()
+            with profiler.span("buffer resize"):
+                resize_image_buffer(img, new_width, new_height)
+            img.pixels.foreach_set(pixels)
+            img.update()
+            profiler.count("pixels touched", width * height + new_width * new_height)
+            kind = " (normal map)" if img.name in normal_maps else ""
+            images_fixed.append(f"{img.name}: {width}x{height} -> {new_width}x{new_height}{kind}")
+        except Exception as e:
+            print(f"Failed to resize {img.name}: {e}")
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for img, width, height, new_width, new_height in planned:
+            cost = (PixelBudget.snapshot_bytes(img, width, height)
+                    + PixelBudget.snapshot_bytes(img, new_width, new_height))
+            if not budget.fits_alone(cost):
+                # Too big for a snapshot within the budget: Blender scales its own buffer in place
+                try:
+                    img.scale(new_width, new_height)
+                    profiler.count("pixels touched", width * height + new_width * new_height)
+                    images_fixed.append(f"{img.name}: {width}x{height} -> {new_width}x{new_height} (over memory budget, Blender resampling)")
+                except Exception as e:
+                    print(f"Failed to resize {img.name}: {e}")
+                continue
+            
+            # Wait until the snapshot fits next to the ones in flight
+            while in_flight and (len(in_flight) >= workers or not budget.fits(cost)):
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+            try:
+                band_rows = budget.band_rows(resize_band_row_bytes(width, height, new_width, new_height, img.channels))
+                if img.name in normal_maps and img.channels >= 3:
+                    future = pool.submit(
+                        resize_normal_pixels, image_pixels(img), width, height, img.channels,
+                        new_width, new_height, filter_name, band_rows
+                    )
+                else:
+                    future = pool.submit(
+                        resize_pixels, image_pixels(img), width, height, img.channels,
+                        new_width, new_height, filter_name, not img.is_float, band_rows
+                    )
+                budget.reserve(cost)
+                in_flight[future] = (img, width, height, new_width, new_height, cost)
+            except Exception as e:
+                print(f"Failed to resize {img.name}: {e}")
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(future)
+    
+    return images_fixed
+
+
+# Normal maps are resampled as vectors: decoded from 0..1 to -1..1, filtered,
+# renormalized and encoded again, so lower resolutions keep unit-length
+# normals instead of the shortened ones color filtering leaves.
+
+def normalize_normals(vectors):
+    """Scale (..., 3) vectors to unit length in place; zero vectors become +Z. Returns the old lengths."""
+    import numpy as np
+
+    lengths = np.sqrt(np.einsum('...k,...k->...', vectors, vectors))
+    flat = lengths == 0.0
+    vectors /= np.where(flat, 1.0, lengths)[..., None]
+    vectors[flat] = (0.0, 0.0, 1.0)
+    return lengths
+
+
+def renormalize_normal_pixels(pixels, channels):
+    """Renormalize the 0..1-encoded normals of a flat pixel snapshot in place, and clamp it to 0..1"""
+    import numpy as np
+
+    image = pixels.reshape(-1, channels)
+    vectors = image[:, :3] * 2.0 - 1.0
+    normalize_normals(vectors)
+    image[:, :3] = vectors * 0.5 + 0.5
+    np.clip(pixels, 0.0, 1.0, out=pixels)
+    return pixels
+
+
+def resize_normal_pixels(pixels, width, height, channels, new_width, new_height, filter_name, band_rows=256):
+    """resize_pixels() for a normal map: the vectors are resampled, then renormalized.
+
+    Decoding is linear and the filter weights sum to one, so resampling the
+    encoded values equals resampling the decoded vectors.
+    """
+    out = resize_pixels(pixels, width, height, channels, new_width, new_height, filter_name, False, band_rows)
+    return renormalize_normal_pixels(out, channels)
+
+
+def detected_normal_maps(index, detect_by_content, content_threshold, pixel_budget_mb):
+    """Names of the images used as normal maps, plus the ones that look like one when pixel checks are on.
+
+    Only images whose score can be cached are checked; generated images and
+    unsaved edits would be read back in full on every export.
+    """
+    normal_maps = set(index.normal_maps()[0])
+    if detect_by_content:
+        candidates = [
+            img for img in bpy.data.images
+            if img.name not in normal_maps and img.name not in ["Render Result", "Viewer Node"]
+        ]
+        scores = classify_images(candidates, PixelBudget(pixel_budget_mb, 1), skip_uncached=True)
+        normal_maps.update(name for name, confidence in scores.items() if confidence >= content_threshold)
+    return normal_maps
+
+
+def mip_sizes(width, height):
+    """Sizes of mip levels 1.. down to 1x1; odd sides round up"""
+    sizes = []
+    while width > 1 or height > 1:
+        width, height = (width + 1) // 2, (height + 1) // 2
+        sizes.append((width, height))
+    return sizes
+
+
+def normal_mip_chain(pixels, width, height, channels, toksvig=False):
+    """Mip levels 1.. of a normal map as [(width, height, flat float32 pixels)], down to 1x1.
+
+    Each level averages 2x2 texels of the unnormalized level above (an odd
+    last row or column is repeated), so it is the mean of its footprint at
+    full resolution; the vectors are renormalized for output only. Other
+    channels are averaged as they are. With toksvig the output has four
+    channels and alpha holds the length of the averaged normal, the Toksvig
+    factor: 1 where the normals agree, lower where they spread out. A reader
+    can widen the roughness with it, e.g. alpha^2 + (1 - a) / a.
+    """
+    import numpy as np
+
+    image = pixels.reshape(height, width, channels)
+    level = np.empty((height, width, channels), dtype=np.float32)
+    level[..., :3] = image[..., :3] * 2.0 - 1.0
+    level[..., 3:] = image[..., 3:]
+    normalize_normals(level[..., :3])
+
+    chain = []
+    for new_width, new_height in mip_sizes(width, height):
+        if height % 2 and height > 1:
+            level = np.concatenate([level, level[-1:]], axis=0)
+        if width % 2 and width > 1:
+            level = np.concatenate([level, level[:, -1:]], axis=1)
+        rows = 2 if height > 1 else 1
+        columns = 2 if width > 1 else 1
+        level = level.reshape(new_height, rows, new_width, columns, channels).mean(axis=(1, 3))
+        width, height = new_width, new_height
+
+        vectors = level[..., :3].copy()
+        lengths = normalize_normals(vectors)
+        out = np.empty((height, width, 4 if toksvig else channels), dtype=np.float32)
+        out[..., :3] = vectors * 0.5 + 0.5
+        if toksvig:
+            out[..., 3] = np.minimum(lengths, 1.0)
+        else:
+            out[..., 3:] = level[..., 3:]
+        chain.append((width, height, out.ravel()))
+    return chain
+
+
+def write_normal_mip_chain(paths, pixels, width, height, channels, out_channels, toksvig=False):
+    """Build a normal map's mip chain and write level i to paths[i - 1] (safe to run on a worker thread).
+
+    Returns the content hashes of the written files.
+    """
+    hashes = []
+    for path, (level_width, level_height, level) in zip(paths, normal_mip_chain(pixels, width, height, channels, toksvig)):
+        hashes.append(write_png(path, level, level_width, level_height, 4 if toksvig else channels, out_channels))
+    return hashes
+
+
+# Normal map atlases for the FBX export
+
+def pack_shelves(sizes, max_size, padding):
+    """Place (width, height) rectangles on shelves inside max_size squares.
+
+    Rectangles are placed tallest first, each with `padding` pixels around
+    it; a new square is started when one is full. Returns (placements,
+    atlas sizes): one (atlas index, x, y) per rectangle in input order, and
+    per atlas the smallest power-of-2 (width, height) holding what was
+    placed. Rectangles that can't fit an empty square get None.
+    """
+    placements = [None] * len(sizes)
+    atlases = []  # per atlas: {"shelves": [[y, height, next x]], "top": y of the next shelf, "extent": [w, h]}
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    for i in order:
+        width, height = sizes[i][0] + 2 * padding, sizes[i][1] + 2 * padding
+        if width > max_size or height > max_size:
+            continue
+        for atlas_index, atlas in enumerate(atlases + [None]):
+            if atlas is None:
+                atlas = {"shelves": [], "top": 0, "extent": [0, 0]}
+                atlases.append(atlas)
+            shelf = next((s for s in atlas["shelves"] if height <= s[1] and s[2] + width <= max_size), None)
+            if shelf is None and atlas["top"] + height <= max_size:
+                shelf = [atlas["top"], height, 0]
+                atlas["shelves"].append(shelf)
+                atlas["top"] += height
+            if shelf is not None:
+                placements[i] = (atlas_index, shelf[2] + padding, shelf[0] + padding)
+                shelf[2] += width
+                atlas["extent"][0] = max(atlas["extent"][0], shelf[2])
+                atlas["extent"][1] = max(atlas["extent"][1], shelf[0] + height)
+                break
+
+    atlas_sizes = [tuple(1 << (max(n, 1) - 1).bit_length() for n in atlas["extent"]) for atlas in atlases]
+    return placements, atlas_sizes
+
+
+class NormalMapAtlas:
+    """Packs the scene's normal maps into power-of-2 atlases for the length of an export.
+
+    apply() builds the atlases, adds a UV map holding every affected mesh's
+    UVs remapped into the atlas regions, and points the materials' image
+    nodes at the atlases through a UV Map node. revert() puts everything
+    back. Materials that can't be remapped safely are left alone and listed
+    in `skipped` with the reason.
+
+    The FBX exporter doesn't write which UV map a texture uses, so importers
+    sample the atlas with the first one. The export lists the atlas UV map
+    and every material's region in NORMAL_ATLAS_SIDECAR instead.
+    """
+
+    UV_NAME = "NormalAtlasUV"
+    FLAT_NORMAL = (0.5, 0.5, 1.0, 1.0)
+
+    def __init__(self, max_size=2048, padding=8):
+        self.max_size = max_size
+        self.padding = padding
+        self.atlas_images = []  # image names
+        self.nodes = []         # (material name, image node name, original image name, UV Map node name)
+        self.meshes = []        # names of meshes that got the atlas UV map
+        self.skipped = []       # (material or image name, reason)
+        self.regions = {}       # material name -> (atlas image name, original image name, u, v, u scale, v scale)
+        self.packed = 0
+
+    @staticmethod
+    def _render_uv_layer(mesh):
+        return next((layer for layer in mesh.uv_layers if layer.active_render), mesh.uv_layers.active)
+
+    @staticmethod
+    def _loop_material_indices(mesh):
+        import numpy as np
+
+        count = len(mesh.polygons)
+        material_indices = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        loop_starts = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        loop_totals = np.empty(count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        order = np.argsort(loop_starts, kind="stable")
+        return np.repeat(material_indices[order], loop_totals[order])
+
+    @classmethod
+    def _mesh_uvs(cls, mesh):
+        import numpy as np
+
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        cls._render_uv_layer(mesh).data.foreach_get("uv", uvs)
+        return uvs.reshape(-1, 2)
+
+    def collect(self, index):
+        """{material name: (image node name, image name)} for the materials that can be remapped"""
+        candidates = {}
+        for mat_name, entry in index.materials.items():
+            if not entry.use_nodes or not entry.normal_edges:
+                continue
+            # One image, straight into one Normal Map node of the material itself
+            image_name, node_name, input_name = entry.normal_edges[0]
+            if len(entry.normal_edges) != 1 or node_name not in entry.normal_nodes:
+                self.skipped.append((mat_name, "not a single directly wired normal map"))
+                continue
+            image_nodes = [node_name for node_name, name in entry.image_nodes if name == image_name]
+            mat = bpy.data.materials.get(mat_name)
+            node = mat.node_tree.nodes.get(image_nodes[0]) if mat and len(image_nodes) == 1 else None
+            if node is None or node.inputs["Vector"].is_linked:
+                self.skipped.append((mat_name, "normal map image node has custom texture coordinates"))
+                continue
+            img = bpy.data.images.get(image_name)
+            if img is None or img.is_float or not img.has_data or img.channels < 3:
+                self.skipped.append((image_name, "not an 8-bit RGB(A) image"))
+                continue
+            if max(img.size) + 2 * self.padding > self.max_size:
+                self.skipped.append((image_name, "larger than the atlas"))
+                continue
+            candidates[mat_name] = (node.name, image_name)
+
+        # The UVs are remapped per mesh, so materials linked to objects instead are left out
+        for obj in bpy.data.objects:
+            for slot in obj.material_slots:
+                if slot.link == 'OBJECT' and slot.material and candidates.pop(slot.material.name, None):
+                    self.skipped.append((slot.material.name, f"linked to object {obj.name}"))
+
+        # Every mesh using a candidate needs UVs inside 0-1 (no tiling) and room for one more UV map
+        for mesh in bpy.data.meshes:
+            slots = [i for i, mat in enumerate(mesh.materials) if mat and mat.name in candidates]
+            if not slots:
+                continue
+            problem = None
+            if not mesh.uv_layers:
+                problem = "used by a mesh without UVs"
+            elif len(mesh.uv_layers) >= 8:
+                problem = "used by a mesh with no free UV map"
+            if problem is None:
+                uvs = self._mesh_uvs(mesh)
+                loop_slots = self._loop_material_indices(mesh)
+                for slot in slots:
+                    selected = uvs[loop_slots == slot]
+                    if selected.size and (selected.min() < -1e-4 or selected.max() > 1.0 + 1e-4):
+                        self.skipped.append((mesh.materials[slot].name, f"tiled UVs on {mesh.name}"))
+                        candidates.pop(mesh.materials[slot].name, None)
+                continue
+            for slot in slots:
+                if candidates.pop(mesh.materials[slot].name, None):
+                    self.skipped.append((mesh.materials[slot].name, f"{problem} ({mesh.name})"))
+        return candidates
+
+    def apply(self, index):
+        import numpy as np
+
+        candidates = self.collect(index)
+        image_names = sorted({image_name for node_name, image_name in candidates.values()})
+        if not image_names:
+            return
+        images = [bpy.data.images[name] for name in image_names]
+        placements, atlas_sizes = pack_shelves([tuple(img.size) for img in images], self.max_size, self.padding)
+
+        # Build the atlases with edge-extended padding, so filtering and mips don't bleed
+        buffers = [np.empty((h, w, 4), dtype=np.float32) for w, h in atlas_sizes]
+        for buffer in buffers:
+            buffer[:] = self.FLAT_NORMAL
+        regions = {}  # image name -> (atlas image name, u offset, v offset, u scale, v scale)
+        atlas_names = []
+        for i, (width, height) in enumerate(atlas_sizes):
+            atlas = bpy.data.images.new(f"NormalAtlas_{i}", width, height, alpha=False)
+            atlas.colorspace_settings.name = 'Non-Color'
+            atlas_names.append(atlas.name)
+        for img, placement in zip(images, placements):
+            atlas_index, x, y = placement
+            width, height = img.size
+            pixels = image_pixels(img).reshape(height, width, img.channels)
+            pad = self.padding
+            padded = np.pad(pixels, ((pad, pad), (pad, pad), (0, 0)), mode='edge')
+            buffers[atlas_index][y - pad:y + height + pad, x - pad:x + width + pad, :img.channels] = padded
+            atlas_width, atlas_height = atlas_sizes[atlas_index]
+            regions[img.name] = (
+                atlas_names[atlas_index], x / atlas_width, y / atlas_height,
+                width / atlas_width, height / atlas_height,
+            )
+            profiler.count("pixels touched", width * height)
+        for name, buffer in zip(atlas_names, buffers):
+            bpy.data.images[name].pixels.foreach_set(buffer.ravel())
+        self.atlas_images = atlas_names
+
+        # Extra UV map with each material's faces moved into its image's region
+        for mesh in bpy.data.meshes:
+            slot_regions = {
+                i: regions[candidates[mat.name][1]]
+                for i, mat in enumerate(mesh.materials) if mat and mat.name in candidates
+            }
+            if not slot_regions:
+                continue
+            uvs = self._mesh_uvs(mesh)
+            loop_slots = self._loop_material_indices(mesh)
+            for slot, (atlas_name, u, v, u_scale, v_scale) in slot_regions.items():
+                selected = loop_slots == slot
+                uvs[selected] = uvs[selected] * (u_scale, v_scale) + (u, v)
+            layer = mesh.uv_layers.new(name=self.UV_NAME, do_init=False)
+            layer.data.foreach_set("uv", uvs.ravel())
+            self.meshes.append(mesh.name)
+
+        for mat_name, (node_name, image_name) in candidates.items():
+            mat = bpy.data.materials[mat_name]
+            tree = mat.node_tree
+            node = tree.nodes[node_name]
+            uv_node = tree.nodes.new('ShaderNodeUVMap')
+            uv_node.uv_map = self.UV_NAME
+            uv_node.location = (node.location[0] - 200, node.location[1])
+            tree.links.new(uv_node.outputs["UV"], node.inputs["Vector"])
+            node.image = bpy.data.images[regions[image_name][0]]
+            self.nodes.append((mat_name, node_name, image_name, uv_node.name))
+            atlas_name, u, v, u_scale, v_scale = regions[image_name]
+            self.regions[mat_name] = (atlas_name, image_name, u, v, u_scale, v_scale)
+            index.update_material(mat)
+        self.packed = len(image_names)
+
+    def revert(self, index):
+        for mat_name, node_name, image_name, uv_node_name in self.nodes:
+            mat = bpy.data.materials.get(mat_name)
+            if mat is None or mat.node_tree is None:
+                continue
+            node = mat.node_tree.nodes.get(node_name)
+            if node is not None:
+                node.image = bpy.data.images.get(image_name)
+            uv_node = mat.node_tree.nodes.get(uv_node_name)
+            if uv_node is not None:
+                mat.node_tree.nodes.remove(uv_node)
+            index.update_material(mat)
+        for mesh_name in self.meshes:
+            mesh = bpy.data.meshes.get(mesh_name)
+            layer = mesh.uv_layers.get(self.UV_NAME) if mesh else None
+            if layer is not None:
+                mesh.uv_layers.remove(layer)
+        for name in self.atlas_images:
+            atlas = bpy.data.images.get(name)
+            if atlas is not None:
+                bpy.data.images.remove(atlas)
+        self.nodes.clear()
+        self.meshes.clear()
+        self.atlas_images.clear()
+        self.regions.clear()
+
+
+# Content-addressed record of the textures written by the FBX export
+
+def content_hash(*parts):
+    """Hex digest over bytes-like parts (bytes, strings or numpy arrays)"""
+    import hashlib
+
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode() if isinstance(part, str) else part)
+    return h.hexdigest()
+
+
+def file_hash(filepath):
+    import hashlib
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class TextureManifest:
+    """Maps exported texture files to the content they were written from.
+
+    Stored as texture_manifest.json inside the textures folder. Files are
+    recorded together with their size and mtime, so a file that was touched
+    by anything else is never reused.
+    """
+
+    FILENAME = "texture_manifest.json"
+
+    def __init__(self, textures_dir):
+        import json
+        import os
+
+        self.textures_dir = textures_dir
+        self.path = os.path.join(textures_dir, self.FILENAME)
+        self.files = {}    # file name -> {"image", "hashes", "size", "mtime_ns"}
+        self.sources = {}  # absolute source path -> {"hash", "size", "mtime_ns"}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.sources = data.get("sources", {})
+        except (OSError, ValueError):
+            pass
+        self.used = set()
+
+    def save(self):
+        import json
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.files, "sources": self.sources}, f, indent=1, sort_keys=True)
+
+    def _stat(self, filepath):
+        import os
+
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _intact(self, name):
+        import os
+
+        entry = self.files.get(name)
+        stat = self._stat(os.path.join(self.textures_dir, name))
+        return bool(entry and stat and stat["size"] == entry["size"] and stat["mtime_ns"] == entry["mtime_ns"])
+
+    def source_hash(self, filepath):
+        """Hash of a source file, only re-read when its size or mtime changed"""
+        stat = self._stat(filepath)
+        if stat is None:
+            return None
+        known = self.sources.get(filepath)
+        if known and known["size"] == stat["size"] and known["mtime_ns"] == stat["mtime_ns"]:
+            return known["hash"]
+        digest = file_hash(filepath)
+        self.sources[filepath] = dict(stat, hash=digest)
+        return digest
+
+    def owner(self, filepath):
+        """Name of the image a file in the textures folder was written for"""
+        import os
+
+        entry = self.files.get(os.path.basename(filepath))
+        return entry["image"] if entry else None
+
+    def reusable(self, image_name, digest):
+        """Path of an unchanged file already written for this image and content"""
+        import os
+
+        for name, entry in self.files.items():
+            if entry["image"] == image_name and digest in entry["hashes"] and self._intact(name):
+                return os.path.join(self.textures_dir, name)
+        return None
+
+    def find(self, digest):
+        """Path of any intact file written from the same content"""
+        import os
+
+        for name, entry in self.files.items():
+            if digest in entry["hashes"] and self._intact(name):
+                return os.path.join(self.textures_dir, name)
+        return None
+
+    def record(self, image_name, filepath, digest, params, written_hash=None):
+        """Remember a file written for an image.
+
+        The export points the image at the written file, so the next export
+        sees that file as the image's source; its hash is accepted as well.
+        digest is None for content that couldn't be hashed: the file is only
+        recorded as the image's, so the next export writes over it.
+        """
+        import os
+
+        filepath = os.path.abspath(filepath)
+        stat = self._stat(filepath)
+        if stat is None:
+            return
+        if written_hash is None:
+            written_hash = self.source_hash(filepath)
+        else:
+            self.sources[filepath] = dict(stat, hash=written_hash)
+        name = os.path.basename(filepath)
+        hashes = [content_hash(params, written_hash)]
+        if digest is not None:
+            hashes.insert(0, digest)
+        self.files[name] = dict(stat, image=image_name, hashes=hashes)
+        self.used.add(name)
+
+    def keep(self, filepath):
+        import os
+
+        self.used.add(os.path.basename(filepath))
+
+    def prune(self, image_names):
+        """Delete files this manifest wrote that are no longer needed.
+
+        A file is stale when its image is not among image_names anymore, or
+        when its image got a different file in this export. Files of images
+        that were skipped this time are left alone.
+        """
+        import os
+
+        exported = {self.files[name]["image"] for name in self.used if name in self.files}
+        removed = []
+        for name, entry in list(self.files.items()):
+            if name in self.used:
+                continue
+            if entry["image"] in image_names and entry["image"] not in exported:
+                continue
+            if self._intact(name):
+                os.remove(os.path.join(self.textures_dir, name))
+                removed.append(name)
+            del self.files[name]
+        return removed
+
+
+# File signatures of the formats the export writes: (signature, extension, file_format)
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", ".png", 'PNG'),
+    (b"\xff\xd8\xff", ".jpg", 'JPEG'),
+    (b"BM", ".bmp", 'BMP'),
+]
+# Newer TGA files end with this footer; older ones have no signature at all
+TGA_FOOTER = b"TRUEVISION-XFILE.\x00"
+
+
+def packed_file_format(data):
+    """(extension, file_format) of packed image bytes the export can write as they are, else None"""
+    for signature, ext, file_format in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return ext, file_format
+    if data.endswith(TGA_FOOTER):
+        return ".tga", 'TARGA'
+    return None
+
+
+def image_content_hash(img, params, manifest, pixels=None, load_pixels=True, packed_data=None):
+    """Hash identifying what an exported texture would be written from.
+
+    Clean packed data and source files are hashed as they are; anything else
+    by its pixels. packed_data is the packed file's bytes, if they were read
+    already. Returns None if that would need pixels and load_pixels is False.
+    """
+    import os
+
+    if img.packed_file and not img.is_dirty:
+        return content_hash(params, "packed", packed_data or img.packed_file.data)
+    if img.source == 'FILE' and not img.is_dirty:
+        source_hash = manifest.source_hash(os.path.abspath(bpy.path.abspath(img.filepath)))
+        if source_hash:
+            return content_hash(params, source_hash)
+    if pixels is None:
+        if not load_pixels:
+            return None
+        pixels = image_pixels(img)
+    return content_hash(params, "pixels", pixels)
+
+
+# Pixel-content check for normal maps that aren't wired to a Normal Map node
+# (imported FBX files often leave them unlinked or plugged straight into a BSDF)
+
+CLASSIFIER_SAMPLES = 65536
+
+
+def normal_map_confidence(pixels, width, height, channels, samples=CLASSIFIER_SAMPLES):
+    """Score in [0, 1] of how much an image's pixels look like a tangent-space normal map.
+
+    Only a strided subsample of about `samples` pixels is looked at. Three
+    cues are combined: blue is the dominant channel, texels decode to
+    vectors of unit length once remapped to [-1, 1], and the mean colour is
+    close to the flat normal (0.5, 0.5, 1).
+    """
+    import numpy as np
+
+    if channels < 3 or width * height == 0:
+        return 0.0
+    stride = max(1, int((width * height / samples) ** 0.5))
+    rgb = pixels.reshape(height, width, channels)[::stride, ::stride, :3].reshape(-1, 3)
+    vectors = rgb * 2.0 - 1.0
+
+    blue_dominant = np.mean((rgb[:, 2] >= rgb[:, 0]) & (rgb[:, 2] >= rgb[:, 1]) & (vectors[:, 2] > 0.0))
+    lengths = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    # 8-bit quantisation and compression keep real normal maps within a few percent of unit length
+    unit_length = np.mean(np.abs(lengths - 1.0) < 0.1)
+    mean_offset = np.linalg.norm(rgb.mean(axis=0) - (0.5, 0.5, 1.0))
+    mean_score = max(0.0, 1.0 - mean_offset / 0.3)
+
+    return float(0.3 * blue_dominant + 0.4 * unit_length + 0.3 * mean_score)
+
+
+# Scores keyed by image fingerprint, so only new or changed images are read back
+_confidence_cache = {}
+
+
+def image_fingerprint(img):
+    """Cheap identity of an image's pixel content, or None if it can't be trusted (unsaved edits).
+
+    Unpacked files add their size and modification time, packed ones a hash
+    of their bytes (a repaint packed again can keep the same size), so the
+    key also holds across sessions (see write_scan_index()).
+    """
+    import os
+
+    if img.is_dirty or img.source not in {'FILE', 'TILED'}:
+        return None
+    file_stamp = ()
+    if img.packed_file:
+        file_stamp = ("packed", content_hash(img.packed_file.data))
+    else:
+        try:
+            stat = os.stat(bpy.path.abspath(img.filepath))
+            file_stamp = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+    return (img.name, img.filepath, tuple(img.size), img.channels, file_stamp)
+
+
+def classify_images(images, budget, skip_uncached=False):
+    """Normal map confidence per image name.
+
+    Reading pixels back from Blender is the expensive part: bpy only hands
+    out the whole float buffer, even for a strided sample. Scores are
+    cached by fingerprint and images whose snapshot would not fit in the
+    pixel budget are left out. Images without a fingerprint (generated, or
+    with unsaved edits) would be read again on every call; skip_uncached
+    leaves them out, for checks that run without being asked for.
+    """
+    scores = {}
+    for img in images:
+        width, height = img.size
+        if not width or not height:
+            continue
+        key = image_fingerprint(img)
+        if key is not None and key in _confidence_cache:
+            scores[img.name] = _confidence_cache[key]
+            continue
+        if key is None and skip_uncached:
+            continue
+        if not budget.fits_alone(budget.snapshot_bytes(img)):
+            print(f"Skipped pixel check for {img.name}: larger than the pixel memory budget")
+            continue
+        score = normal_map_confidence(image_pixels(img), width, height, img.channels)
+        profiler.count("pixels touched", width * height)
+        if key is not None:
+            _confidence_cache[key] = score
+        scores[img.name] = score
+    return scores
+
+
+# Orphan sweep over the reverse reference index (bpy.data.user_map)
+
+# bpy.data collections the sweep can remove from, by ID type
+ORPHAN_COLLECTIONS = {'MATERIAL': "materials", 'NODETREE': "node_groups", 'IMAGE': "images"}
+
+
+def find_orphans(collections):
+    """Datablocks of the given bpy.data collections that nothing live refers to.
+
+    Liveness is one mark pass along the references reported by
+    bpy.data.user_map(), starting from the scenes, the UI data, fake users
+    and linked data. A chain like unused mesh -> material -> node group ->
+    image is therefore found in a single pass, and references from worlds,
+    node groups, brushes or any object type all count. Datablocks of the
+    collections that are not swept are treated as live.
+    """
+    user_map = bpy.data.user_map()
+    uses = {}  # datablock -> datablocks it refers to
+    for used, users in user_map.items():
+        for user in users:
+            uses.setdefault(user, []).append(used)
+
+    candidates = set()
+    for name in collections:
+        for id_data in getattr(bpy.data, name):
+            if id_data.library or id_data.use_fake_user or id_data.name in ["Render Result", "Viewer Node"]:
+                continue
+            candidates.add(id_data)
+
+    roots = [id_data for id_data in user_map if id_data.use_fake_user or id_data.library]
+    for name in ("scenes", "window_managers", "workspaces", "screens"):
+        roots.extend(getattr(bpy.data, name))
+    for name in ORPHAN_COLLECTIONS.values():
+        if name not in collections:
+            roots.extend(getattr(bpy.data, name))
+
+    live = set()
+    stack = roots
+    while stack:
+        id_data = stack.pop()
+        if id_data in live:
+            continue
+        live.add(id_data)
+        stack.extend(uses.get(id_data, ()))
+
+    orphans = [id_data for id_data in candidates if id_data not in live]
+    orphans.sort(key=lambda id_data: (ORPHAN_COLLECTIONS[id_data.id_type], id_data.name))
+    return orphans
+
+
+def remove_datablocks(datablocks):
+    """Remove [(bpy.data collection name, datablock name)] in one batch; returns the number removed"""
+    found = [getattr(bpy.data, name).get(datablock_name) for name, datablock_name in datablocks]
+    found = [id_data for id_data in found if id_data is not None]
+    if found:
+        for id_data in found:
+            profiler.count(f"{ORPHAN_COLLECTIONS[id_data.id_type].replace('_', ' ')} removed")
+        bpy.data.batch_remove(found)
+        invalidate_material_index()
+    return len(found)
+
+
+def remove_orphans(collections, dry_run=False):
+    """Remove the orphans of the given collections in one batch.
+
+    Returns [(collection name, datablock name)] of what was (or, for a dry
+    run, would be) removed.
+    """
+    removed = [(ORPHAN_COLLECTIONS[id_data.id_type], id_data.name) for id_data in find_orphans(collections)]
+    if not dry_run:
+        remove_datablocks(removed)
+    return removed
+
+
+# Duplicate images, narrowed down by checks of increasing cost: metadata,
+# then a fingerprint of a small part of the content, then a full hash
+
+DUPLICATE_HEAD_BYTES = 65536
+DUPLICATE_SAMPLES = 4096
+
+# image_fingerprint() -> (fingerprint, full hash or None) for images sourced from bytes
+_duplicate_cache = {}
+
+
+def duplicate_key(img):
+    """Everything that must match before two images' content is compared at all"""
+    return (
+        tuple(img.size), img.channels, img.is_float,
+        img.colorspace_settings.name, img.alpha_mode,
+    )
+
+
+def image_source_bytes(img):
+    """('packed', bytes) or ('file', path) if the image's pixels come unchanged from those bytes, else None"""
+    import os
+
+    if img.is_dirty:
+        return None
+    if img.packed_file:
+        return ("packed", img.packed_file.data)
+    if img.source == 'FILE':
+        filepath = os.path.abspath(bpy.path.abspath(img.filepath))
+        if os.path.isfile(filepath):
+            return ("file", filepath)
+    return None
+
+
+def duplicate_fingerprint(img, budget):
+    """Cheap content fingerprint: the size and first bytes of the source, or a strided sample of the pixels.
+
+    Returns None if it would need a pixel snapshot that doesn't fit the budget.
+    """
+    import os
+
+    source = image_source_bytes(img)
+    if source is not None:
+        key = image_fingerprint(img)
+        if key in _duplicate_cache:
+            return _duplicate_cache[key][0]
+        kind, data = source
+        if kind == "packed":
+            fingerprint = ("bytes", len(data), content_hash(data[:DUPLICATE_HEAD_BYTES]))
+        else:
+            with open(data, "rb") as f:
+                fingerprint = ("bytes", os.path.getsize(data), content_hash(f.read(DUPLICATE_HEAD_BYTES)))
+        if key is not None:
+            _duplicate_cache[key] = (fingerprint, None)
+        return fingerprint
+
+    if not img.has_data or not budget.fits_alone(budget.snapshot_bytes(img)):
+        return None
+    pixels = image_pixels(img).reshape(-1, img.channels)
+    profiler.count("pixels touched", len(pixels))
+    stride = max(1, len(pixels) // DUPLICATE_SAMPLES)
+    return ("pixels", content_hash(pixels[::stride].copy()))
+
+
+def duplicate_full_hash(img, fingerprint):
+    """Hash of all the bytes or pixels the fingerprint was taken from"""
+    if fingerprint[0] == "bytes":
+        key = image_fingerprint(img)
+        cached = _duplicate_cache.get(key)
+        if cached is not None and cached[1] is not None:
+            return cached[1]
+        kind, data = image_source_bytes(img)
+        full_hash = file_hash(data) if kind == "file" else content_hash(data)
+        if key is not None:
+            _duplicate_cache[key] = (fingerprint, full_hash)
+        return full_hash
+    profiler.count("pixels touched", img.size[0] * img.size[1])
+    return content_hash(image_pixels(img))
+
+
+def duplicate_groups(images, budget):
+    """Split images with the same duplicate_key() into groups of identical content.
+
+    Images sourced from identical bytes (the same file, or equal packed
+    data) match without decoding anything; images without a trustworthy
+    source (generated, or with unsaved edits) match by their pixels.
+    Returns lists of image names with the canonical image first: names
+    without a .001-style suffix are preferred, then the shortest.
+    """
+    import re
+
+    by_fingerprint = {}
+    for img in images:
+        fingerprint = duplicate_fingerprint(img, budget)
+        if fingerprint is not None:
+            by_fingerprint.setdefault(fingerprint, []).append(img)
+
+    by_hash = {}
+    for fingerprint, members in by_fingerprint.items():
+        if len(members) < 2:
+            continue
+        for img in members:
+            by_hash.setdefault((fingerprint[0], duplicate_full_hash(img, fingerprint)), []).append(img.name)
+
+    groups = []
+    for names in by_hash.values():
+        if len(names) > 1:
+            names.sort(key=lambda name: (bool(re.search(r"\.\d{3}$", name)), len(name), name))
+            groups.append(names)
+    return groups
+
+
+def duplicate_candidates(images):
+    """Images grouped by duplicate_key(), as lists of names, keeping only keys shared by several images"""
+    by_key = {}
+    for img in images:
+        if img.library or img.source not in {'FILE', 'GENERATED'} or img.name in ["Render Result", "Viewer Node"]:
+            continue
+        by_key.setdefault(duplicate_key(img), []).append(img.name)
+    return [sorted(names) for names in by_key.values() if len(names) > 1]
+
+
+def find_duplicate_images(images, budget):
+    """Groups of images with identical content, canonical image first, sorted by canonical name"""
+    groups = []
+    for names in duplicate_candidates(images):
+        groups.extend(duplicate_groups([bpy.data.images[name] for name in names], budget))
+    groups.sort()
+    return groups
+
+
+# Settings stored on the scene
+def _update_live_mode(self, context):
+    if self.live_mode:
+        # Fill the cache right away so the panel has something to show
+        get_material_index()
+
+
+class SCAN_PG_settings(bpy.types.PropertyGroup):
+    live_mode: bpy.props.BoolProperty(
+        name="Live Scan",
+        description="Keep normal map scan results up to date while editing, re-scanning only changed materials",
+        default=False,
+        update=_update_live_mode
+    )
+    pixel_budget_mb: bpy.props.IntProperty(
+        name="Pixel Memory Budget (MB)",
+        description="Peak memory the addon may use for pixel buffers while resizing or exporting images",
+        default=2048,
+        min=64
+    )
+    detect_by_content: bpy.props.BoolProperty(
+        name="Check Pixel Content",
+        description="Also look at image pixels to find normal maps that aren't connected to a Normal Map node",
+        default=False
+    )
+    content_threshold: bpy.props.FloatProperty(
+        name="Confidence",
+        description="Minimum pixel-content score for an image to be listed as a likely normal map",
+        default=0.8,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    find_duplicates: bpy.props.BoolProperty(
+        name="Find Duplicate Images",
+        description="List images with identical content (like Normal.001 next to Normal) in the scan results. "
+                    "Generated and edited images are compared by their pixels on every scan",
+        default=False
+    )
+    save_scan_index: bpy.props.BoolProperty(
+        name="Save Scan Index",
+        description="Keep the scan results in a file next to the .blend file (" + SCAN_INDEX_SUFFIX + "), "
+                    "so reopening it shows them at once and a new scan only re-reads what changed",
+        default=True
+    )
+    texture_budget_mb: bpy.props.IntProperty(
+        name="Texture Budget (MB)",
+        description="GPU memory the scene's textures, with mipmaps, should fit in",
+        default=512,
+        min=1
+    )
+    asset_report_rows: bpy.props.IntProperty(
+        name="Rows",
+        description="Heaviest objects, materials and collections listed by the Asset Cost Report",
+        default=20,
+        min=1,
+        soft_max=200
+    )
+    show_profile: bpy.props.BoolProperty(
+        name="Show Profiling",
+        description="Show the phase timings and counters of the last operator runs",
+        default=False
+    )
+
+
+# Scan results, stored once per scan and listed with a UIList
+class SCAN_PG_result(bpy.types.PropertyGroup):
+    # "name" (inherited) holds the texture or material name
+    details: bpy.props.StringProperty()
+
+
+class SCAN_UL_results(bpy.types.UIList):
+    """Lists scan results; filtering and sorting by name use the built-in UIList options"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon=self.item_icon(data))
+        if item.details:
+            row.label(text=item.details)
+
+    def item_icon(self, data):
+        return 'MATERIAL_DATA' if self.list_id == "material_usage" else 'TEXTURE'
+
+
+def fill_scan_results(wm, normal_maps, material_usage, likely_normal_maps=(), duplicate_images=()):
+    """Store scan results on the window manager for the results dialog.
+
+    likely_normal_maps holds (image name, confidence, users) for images that
+    only look like normal maps by their pixels; duplicate_images holds lists
+    of image names with identical content, canonical image first.
+    """
+    users = {}
+    for mat_name, textures in material_usage:
+        for tex in textures:
+            users.setdefault(tex, []).append(mat_name)
+
+    wm.scan_normal_maps.clear()
+    for nm in sorted(normal_maps):
+        item = wm.scan_normal_maps.add()
+        item.name = nm
+        item.details = ", ".join(sorted(users.get(nm, ())))
+    wm.scan_normal_maps_index = 0
+
+    wm.scan_material_usage.clear()
+    for mat_name, textures in sorted(material_usage, key=lambda x: x[0]):
+        item = wm.scan_material_usage.add()
+        item.name = mat_name
+        item.details = "→ " + ", ".join(textures)
+    wm.scan_material_usage_index = 0
+
+    wm.scan_likely_normal_maps.clear()
+    for name, confidence, image_users in likely_normal_maps:
+        item = wm.scan_likely_normal_maps.add()
+        item.name = name
+        item.details = f"{confidence:.0%}"
+        if image_users:
+            item.details += " · " + ", ".join(image_users)
+    wm.scan_likely_normal_maps_index = 0
+
+    wm.scan_duplicate_images.clear()
+    for group in duplicate_images:
+        item = wm.scan_duplicate_images.add()
+        item.name = group[0]
+        item.details = "= " + ", ".join(group[1:])
+    wm.scan_duplicate_images_index = 0
+
+
+# Asset cost report rows, listed per kind and sorted by the picked column
+class SCAN_PG_asset_cost(bpy.types.PropertyGroup):
+    # "name" (inherited) holds the object, material or collection name
+    kind: bpy.props.EnumProperty(items=ASSET_COST_KINDS)
+    triangles: bpy.props.IntProperty()
+    texture_bytes: bpy.props.FloatProperty()
+    missing_uvs: bpy.props.IntProperty()
+    normal_coverage: bpy.props.FloatProperty(subtype='FACTOR')
+
+
+class SCAN_UL_asset_costs(bpy.types.UIList):
+    """Rows of the kind named by the list_id, the largest by the report's sort column first"""
+
+    icons = {'OBJECT': 'OBJECT_DATA', 'MATERIAL': 'MATERIAL_DATA', 'COLLECTION': 'OUTLINER_COLLECTION'}
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        split = layout.split(factor=0.4)
+        split.label(text=item.name, icon=self.icons[item.kind])
+        split.label(text=f"{item.triangles:,}")
+        split.label(text=format_bytes(item.texture_bytes))
+        split.label(text=f"{item.missing_uvs:,}" if item.missing_uvs else "-")
+        split.label(text=f"{item.normal_coverage:.0%}")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        attr = ASSET_COST_PROPERTIES[context.window_manager.scan_asset_cost_sort]
+        if self.filter_name:
+            matches = bpy.types.UI_UL_list.filter_items_by_name(
+                self.filter_name, self.bitflag_filter_item, items, "name"
+            )
+        else:
+            matches = [self.bitflag_filter_item] * len(items)
+        rows = [i for i, item in enumerate(items) if matches[i] and item.kind == self.list_id]
+        rows.sort(key=lambda i: getattr(items[i], attr), reverse=not self.use_filter_sort_reverse)
+        rows = rows[:context.scene.scan_settings.asset_report_rows]
+
+        flags = [0] * len(items)
+        for i in rows:
+            flags[i] = self.bitflag_filter_item
+        order = [0] * len(items)
+        shown = set(rows)
+        for position, i in enumerate(rows + [i for i in range(len(items)) if i not in shown]):
+            order[i] = position
+        return flags, order
+
+
+def fill_asset_costs(wm, tables, limit):
+    """Store the rows among the `limit` largest of any column, per kind, for the report dialog"""
+    wm.scan_asset_costs.clear()
+    for kind, table in tables.items():
+        columns = table.columns
+        for row in table.top(limit):
+            item = wm.scan_asset_costs.add()
+            item.name = table.names[row]
+            item.kind = kind
+            item.triangles = int(columns['TRIANGLES'][row])
+            item.texture_bytes = float(columns['TEXTURE_MEMORY'][row])
+            item.missing_uvs = int(columns['MISSING_UVS'][row])
+            item.normal_coverage = float(columns['NORMAL_COVERAGE'][row])
+    wm.scan_asset_costs_index = 0
+
+
+# Popup operator to display the asset cost report
+class SCAN_OT_asset_cost_popup(bpy.types.Operator):
+    bl_idname = "scan.asset_cost_popup"
+    bl_label = "Asset Cost Report"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=700)
+
+    def draw(self, context):
+        layout = self.layout
+        wm = context.window_manager
+        settings = context.scene.scan_settings
+        row = layout.row(align=True)
+        row.label(text="Sort by:")
+        row.prop(wm, "scan_asset_cost_sort", expand=True)
+        layout.prop(settings, "asset_report_rows")
+
+        col = layout.column(align=True)
+        for kind, name, description in ASSET_COST_KINDS:
+            col.separator()
+            col.label(text=f"{name}:")
+            col.template_list(
+                "SCAN_UL_asset_costs", kind,
+                wm, "scan_asset_costs", wm, "scan_asset_costs_index",
+                rows=min(settings.asset_report_rows, 8)
+            )
 
 # Popup operator to display scan results
 class SCAN_OT_normal_maps_popup(bpy.types.Operator):
@@ -16,452 +2669,1896 @@ class SCAN_OT_normal_maps_popup(bpy.types.Operator):
     bl_label = "Normal Map Scan Results"
     bl_options = {'INTERNAL'}
 
-    normal_maps: bpy.props.StringProperty()
-    material_usage: bpy.props.StringProperty()
+    def execute(self, context):
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=500)
+
+    def draw(self, context):
+        layout = self.layout
+        wm = context.window_manager
+        col = layout.column(align=True)
+        
+        # Show normal maps list
+        col.label(text=f"Normal Maps Found ({len(wm.scan_normal_maps)}):", icon='TEXTURE')
+        col.template_list(
+            "SCAN_UL_results", "normal_maps",
+            wm, "scan_normal_maps", wm, "scan_normal_maps_index",
+            rows=8
+        )
+        
+        # Show materials using normal maps
+        if wm.scan_material_usage:
+            col.separator()
+            col.label(text=f"Materials Using Normal Maps ({len(wm.scan_material_usage)}):", icon='MATERIAL')
+            col.template_list(
+                "SCAN_UL_results", "material_usage",
+                wm, "scan_material_usage", wm, "scan_material_usage_index",
+                rows=8
+            )
+
+        # Show images that look like normal maps but aren't wired as one
+        if wm.scan_likely_normal_maps:
+            col.separator()
+            col.label(text=f"Likely Normal Maps by Pixel Content ({len(wm.scan_likely_normal_maps)}):", icon='ERROR')
+            col.template_list(
+                "SCAN_UL_results", "likely_normal_maps",
+                wm, "scan_likely_normal_maps", wm, "scan_likely_normal_maps_index",
+                rows=5
+            )
+
+        # Show groups of images with identical content
+        if wm.scan_duplicate_images:
+            col.separator()
+            col.label(text=f"Duplicate Images ({len(wm.scan_duplicate_images)} group(s)):", icon='DUPLICATE')
+            col.template_list(
+                "SCAN_UL_results", "duplicate_images",
+                wm, "scan_duplicate_images", wm, "scan_duplicate_images_index",
+                rows=5
+            )
+
+# Operator to scan normal maps
+class SCAN_OT_normal_maps(bpy.types.Operator):
+    bl_idname = "object.scan_normal_maps"
+    bl_label = "Scan Normal Maps"
+    bl_description = "List all textures used as normal maps in the scene"
+
+    @profiled
+    def execute(self, context):
+        # Filling in the results marks the file as changed; the scan itself doesn't
+        unsaved_edits = bpy.data.is_dirty
+        profiler.phase("traverse")
+        index = get_material_index()
+        profiler.phase("collect")
+        normal_maps, material_usage = index.normal_maps()
+        likely_normal_maps = self.find_likely_normal_maps(context, index, normal_maps)
+        profiler.count("normal maps", len(normal_maps) + len(likely_normal_maps))
+        duplicate_images = []
+        if context.scene.scan_settings.find_duplicates:
+            profiler.phase("duplicates")
+            budget = PixelBudget(context.scene.scan_settings.pixel_budget_mb, 1)
+            duplicate_images = find_duplicate_images(bpy.data.images, budget)
+            profiler.count("duplicate images", sum(len(group) - 1 for group in duplicate_images))
+
+        # Report results
+        profiler.phase("report")
+        if normal_maps or likely_normal_maps or duplicate_images:
+            # Build report message with materials
+            message = f"Found {len(normal_maps)} normal map(s)"
+            if material_usage:
+                message += f" in {len(material_usage)} material(s)"
+            if likely_normal_maps:
+                message += f", {len(likely_normal_maps)} more by pixel content"
+            if duplicate_images:
+                message += f", {len(duplicate_images)} group(s) of duplicate images"
+            self.report({'INFO'}, message)
+            
+            print("\n--- Normal Maps in Scene ---")
+            for nm in sorted(normal_maps):
+                print(" -", nm)
+
+            if likely_normal_maps:
+                print("\n--- Likely Normal Maps (pixel content, not wired to a Normal Map node) ---")
+                for name, confidence, image_users in likely_normal_maps:
+                    used_by = f" used by {', '.join(image_users)}" if image_users else " (unused)"
+                    print(f" - {name}: {confidence:.0%}{used_by}")
+
+            if material_usage:
+                print("\n--- Materials Using Normal Maps ---")
+                for mat_name, textures in material_usage:
+                    print(f"{mat_name}:")
+                    for tex in textures:
+                        print(f"   - {tex}")
+
+            if duplicate_images:
+                print("\n--- Duplicate Images ---")
+                for group in duplicate_images:
+                    print(f"{group[0]}: {', '.join(group[1:])}")
+
+            # Show a popup so results are visible without checking the console
+            fill_scan_results(
+                context.window_manager, normal_maps, material_usage, likely_normal_maps, duplicate_images
+            )
+            self.save_report(context, normal_maps, material_usage, likely_normal_maps, duplicate_images, unsaved_edits)
+            
+            # Use a timer to show popup after operator finishes
+            def show_popup():
+                bpy.ops.scan.normal_maps_popup('INVOKE_DEFAULT')
+                return None  # Timer runs once
+            
+            bpy.app.timers.register(show_popup, first_interval=0.01)
+        else:
+            fill_scan_results(context.window_manager, (), ())
+            self.save_report(context, (), (), (), (), unsaved_edits)
+            self.report({'INFO'}, "No normal maps found in the scene")
+            print("No normal maps found in the scene")
+
+        return {'FINISHED'}
+
+    def save_report(self, context, normal_maps, material_usage, likely_normal_maps, duplicate_images, unsaved_edits):
+        global _last_scan_report
+        if not context.scene.scan_settings.save_scan_index:
+            return
+        profiler.phase("save index")
+        _last_scan_report = {
+            "normal_maps": sorted(normal_maps),
+            "material_usage": [[mat_name, textures] for mat_name, textures in material_usage],
+            "likely_normal_maps": [list(item) for item in likely_normal_maps],
+            "duplicate_images": duplicate_images,
+        }
+        try:
+            write_scan_index(_last_scan_report, matches_file=not unsaved_edits)
+        except OSError as e:
+            print(f"Could not save the scan index: {e}")
+
+    def find_likely_normal_maps(self, context, index, normal_maps):
+        """(image name, confidence, users) for unwired images whose pixels look like a normal map"""
+        settings = context.scene.scan_settings
+        if not settings.detect_by_content:
+            return []
+
+        candidates = [
+            img for img in bpy.data.images
+            if img.name not in normal_maps and img.name not in ["Render Result", "Viewer Node"]
+        ]
+        scores = classify_images(candidates, PixelBudget(settings.pixel_budget_mb, 1))
+        likely = [
+            (name, confidence, sorted(index.image_users.get(name, ())))
+            for name, confidence in scores.items()
+            if confidence >= settings.content_threshold
+        ]
+        likely.sort(key=lambda x: (-x[1], x[0]))
+        return likely
+
+
+# Time-sliced execution for operators that change many datablocks
+class ChunkedOperator:
+    """Mixin for operators that work through many materials, objects or datablocks.
+
+    Subclasses define chunk_items(context), returning the list of work;
+    process_chunk(context, items), handling a batch of it; and
+    finish_chunks(context), reporting and returning the operator result.
+    Started from the UI, the batches run from a timer for at most
+    chunk_seconds per tick, so the window keeps redrawing and shows the
+    progress in the status bar; Esc stops after the current batch. A stopped run still ends FINISHED, so
+    what it changed is a single undo step. execute() (scripts, redo, -b)
+    works through everything at once. Items should be names rather than
+    datablocks, which may be freed between ticks.
+    """
+
+    chunk_size = 16
+    chunk_seconds = 0.05
+    # Events still passed on while running, so the view can be navigated
+    PASS_EVENTS = {
+        'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+        'TRACKPADPAN', 'TRACKPADZOOM', 'WINDOW_DEACTIVATE', 'TIMER_REPORT',
+    }
+
+    @profiled
+    def execute(self, context):
+        global _chunked_run_active
+
+        self.cancelled = False
+        profiler.phase("traverse")
+        items = self.chunk_items(context)
+        profiler.phase("mutate")
+        _chunked_run_active = True
+        try:
+            for start in range(0, len(items), self.chunk_size):
+                self.process_chunk(context, items[start:start + self.chunk_size])
+        finally:
+            _chunked_run_active = False
+        profiler.phase("report")
+        return self.finish_chunks(context)
+
+    def invoke(self, context, event):
+        global _chunked_run_active
+
+        if bpy.app.background or context.window is None:
+            return self.execute(context)
+
+        self.cancelled = False
+        profiler.begin(self.bl_idname, self.bl_label)
+        profiler.phase("traverse")
+        self._items = self.chunk_items(context)
+        self._done = 0
+        profiler.phase("mutate")
+        self._profile = profiler.suspend()
+        _chunked_run_active = True
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, max(len(self._items), 1))
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        import time
+
+        global _chunked_run_active
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.cancelled = True
+        elif event.type != 'TIMER' or event.timer != self._timer:
+            # Keep edits from interleaving with the run
+            return {'PASS_THROUGH'} if event.type in self.PASS_EVENTS else {'RUNNING_MODAL'}
+
+        profiler.resume(self._profile)
+        try:
+            # At least one batch per tick, then more until the time slice is used up
+            deadline = time.perf_counter() + self.chunk_seconds
+            while not self.cancelled and self._done < len(self._items):
+                batch = self._items[self._done:self._done + self.chunk_size]
+                try:
+                    self.process_chunk(context, batch)
+                except Exception as e:
+                    self.report({'ERROR'}, f"{self.bl_label} failed: {e}")
+                    self.cancelled = True
+                self._done += len(batch)
+                if time.perf_counter() >= deadline:
+                    break
+            profiler.count("ticks")
+
+            if self.cancelled or self._done >= len(self._items):
+                _chunked_run_active = False
+                wm = context.window_manager
+                wm.event_timer_remove(self._timer)
+                wm.progress_end()
+                context.workspace.status_text_set(None)
+                profiler.phase("report")
+                if self.cancelled:
+                    self.report({'WARNING'}, f"Stopped after {self._done} of {len(self._items)} item(s)")
+                result = self.finish_chunks(context)
+                profiler.end()
+                return result
+        finally:
+            if profiler.current is not None:
+                self._profile = profiler.suspend()
+
+        context.window_manager.progress_update(self._done)
+        context.workspace.status_text_set(
+            f"{self.bl_label}: {self._done} of {len(self._items)} (Esc to stop)"
+        )
+        return {'RUNNING_MODAL'}
+
+# Operator to remove normal maps
+class SCAN_OT_remove_normal_maps(ChunkedOperator, bpy.types.Operator):
+    bl_idname = "object.remove_normal_maps"
+    bl_label = "Remove Normal Maps"
+    bl_description = "Remove normal map textures from all materials in the scene"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def chunk_items(self, context):
+        self.removed_maps = set()
+        self.removed_nodes = 0
+        self.removed_links = 0
+        # Taken once: process_chunk() keeps it up to date with update_material()
+        self.material_index = get_material_index()
+        # Only materials that actually contain normal map nodes
+        return [
+            mat_name for mat_name, entry in self.material_index.materials.items()
+            if entry.normal_nodes and entry.use_nodes and entry.has_tree
+        ]
+
+    def process_chunk(self, context, items):
+        index = self.material_index
+        for mat_name in items:
+            entry = index.materials.get(mat_name)
+            mat = bpy.data.materials.get(mat_name)
+            if entry is None or not mat or not mat.node_tree:
+                continue
+
+            node_tree = mat.node_tree
+            links_to_remove = []
+            nodes_to_remove = []
+
+            for node_name in entry.normal_nodes:
+                node = node_tree.nodes.get(node_name)
+                if node is None or node.type != 'NORMAL_MAP':
+                    continue
+
+                # Collect incoming links from image textures feeding this normal map
+                color_input = node.inputs.get('Color')
+                if color_input:
+                    self.removed_maps |= index.resolver.trace_input(color_input)[0]
+                    for link in list(color_input.links):
+                        links_to_remove.append(link)
+
+                # Collect outgoing links from the normal output
+                normal_output = node.outputs.get('Normal')
+                if normal_output:
+                    for link in list(normal_output.links):
+                        links_to_remove.append(link)
+
+                nodes_to_remove.append(node)
+
+            for link in links_to_remove:
+                node_tree.links.remove(link)
+                self.removed_links += 1
+
+            for node in nodes_to_remove:
+                node_tree.nodes.remove(node)
+                self.removed_nodes += 1
+
+            index.update_material(mat)
+
+    def finish_chunks(self, context):
+        profiler.count("nodes removed", self.removed_nodes)
+        profiler.count("links removed", self.removed_links)
+        if self.removed_nodes:
+            msg = f"Removed {self.removed_nodes} normal map node(s), {self.removed_links} link(s)"
+            if self.removed_maps:
+                msg += f"; textures: {', '.join(sorted(self.removed_maps))}"
+            self.report({'INFO'}, msg)
+            print("\n--- Removed Normal Maps ---")
+            print(msg)
+        else:
+            self.report({'INFO'}, "No normal maps to remove")
+            print("No normal maps to remove")
+
+        return {'FINISHED'}
+
+# Operator to fix UV coordinates for glTF export
+class SCAN_OT_fix_uv_coordinates(ChunkedOperator, bpy.types.Operator):
+    bl_idname = "object.fix_uv_coordinates"
+    bl_label = "Fix UV Coordinates for glTF"
+    bl_description = "Add UV coordinates to meshes that have textured materials but no UV mapping"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    normalize: bpy.props.BoolProperty(
+        name="Normalize to 0-1",
+        description="Fit the projected UVs into the 0-1 range, keeping their aspect ratio",
+        default=False
+    )
+    texel_density: bpy.props.FloatProperty(
+        name="Texel Density",
+        description="Scale applied to the projected UVs (UV units per unit after normalization)",
+        default=1.0,
+        min=0.0001,
+        soft_max=100.0
+    )
+
+    def chunk_items(self, context):
+        self.meshes_fixed = []
+        self.material_index = get_material_index()
+        return [obj.name for obj in bpy.data.objects if obj.type == 'MESH']
+
+    def process_chunk(self, context, items):
+        index = self.material_index
+        for obj_name in items:
+            obj = bpy.data.objects.get(obj_name)
+            if obj is None or obj.type != 'MESH':
+                continue
+            
+            mesh = obj.data
+            needs_uv = False
+            
+            # Check if mesh has UV coordinates
+            has_uv = len(mesh.uv_layers) > 0
+            
+            # Check if any material uses textures
+            if obj.data.materials:
+                for mat in obj.data.materials:
+                    if index.has_texture(mat):
+                        needs_uv = True
+                        break
+            
+            # If material has textures but mesh has no UV, add UV coordinates
+            if needs_uv and not has_uv:
+                try:
+                    if add_box_uv(mesh, normalize=self.normalize, texel_density=self.texel_density):
+                        self.meshes_fixed.append(obj.name)
+                        profiler.count("uv loops written", len(mesh.loops))
+                except Exception as e:
+                    print(f"Failed to add UV to {obj.name}: {e}")
+
+    def finish_chunks(self, context):
+        # Report results
+        fixed_count = len(self.meshes_fixed)
+        if fixed_count > 0:
+            self.report({'INFO'}, f"Fixed UV coordinates for {fixed_count} mesh(es)")
+            print(f"\n--- Fixed UV Coordinates ---")
+            print(f"Successfully added UV coordinates to {fixed_count} mesh(es):")
+            for name in self.meshes_fixed:
+                print(f"  - {name}")
+        else:
+            self.report({'INFO'}, "All meshes already have UV coordinates")
+            print("All meshes already have UV coordinates or don't need them")
+        
+        return {'FINISHED'}
+
+# Operator to fix image dimensions for glTF export
+class SCAN_OT_fix_image_dimensions(bpy.types.Operator):
+    bl_idname = "object.fix_image_dimensions"
+    bl_label = "Fix Image Dimensions for glTF"
+    bl_description = "Resize images to power-of-2 dimensions for glTF compatibility"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    resample_filter: bpy.props.EnumProperty(
+        name="Filter",
+        description="Resampling filter used to resize the images",
+        items=RESAMPLE_FILTERS,
+        default='LANCZOS'
+    )
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only list the planned resizes and their memory use, without changing any image",
+        default=False
+    )
+
+    @profiled
+    def execute(self, context):
+        planned = []
+        
+        # Check all images
+        profiler.phase("collect")
+        for img in bpy.data.images:
+            # Skip internal images
+            if img.name in ["Render Result", "Viewer Node"]:
+                continue
+            
+            width, height = img.size[0], img.size[1]
+            
+            # Skip if already valid (power of 2 or square)
+            if width == 0 or height == 0:
+                continue
+            
+            # Check if dimensions need fixing
+            new_width, new_height = power_of_2_size(width, height)
+            if (new_width, new_height) != (width, height):
+                planned.append((img, width, height, new_width, new_height))
+        
+        if self.dry_run:
+            self.report_plan(planned)
+            return {'FINISHED'}
+        
+        profiler.phase("mutate")
+        settings = context.scene.scan_settings
+        normal_maps = detected_normal_maps(
+            get_material_index(), settings.detect_by_content, settings.content_threshold, settings.pixel_budget_mb
+        )
+        images_fixed = resize_images(planned, self.resample_filter, settings.pixel_budget_mb, normal_maps)
+        
+        fixed_count = len(images_fixed)
+        profiler.count("images resized", fixed_count)
+        
+        # Report results
+        profiler.phase("report")
+        if fixed_count > 0:
+            self.report({'INFO'}, f"Fixed {fixed_count} image(s) dimensions")
+            print(f"\n--- Fixed Image Dimensions ---")
+            print(f"Resized {fixed_count} image(s) to power-of-2 dimensions:")
+            for info in images_fixed:
+                print(f"  - {info}")
+        else:
+            self.report({'INFO'}, "All images already have valid dimensions")
+            print("All images already have power-of-2 dimensions")
+        
+        return {'FINISHED'}
+
+    def report_plan(self, planned):
+        """Print every planned resize with its estimated memory before and after"""
+        if not planned:
+            self.report({'INFO'}, "All images already have valid dimensions")
+            print("All images already have power-of-2 dimensions")
+            return
+        
+        total_before = 0
+        total_after = 0
+        print(f"\n--- Planned Image Resizes (dry run, {self.resample_filter.lower()} filter) ---")
+        for img, width, height, new_width, new_height in planned:
+            before = image_memory_bytes(img, width, height)
+            after = image_memory_bytes(img, new_width, new_height)
+            total_before += before
+            total_after += after
+            print(f"  - {img.name}: {width}x{height} -> {new_width}x{new_height}, "
+                  f"{format_bytes(before)} -> {format_bytes(after)}")
+        msg = f"Would resize {len(planned)} image(s): {format_bytes(total_before)} -> {format_bytes(total_after)}"
+        print(msg)
+        self.report({'INFO'}, msg)
+
+# Operator to report the estimated GPU memory of the scene's textures
+class SCAN_OT_texture_memory_report(bpy.types.Operator):
+    bl_idname = "object.texture_memory_report"
+    bl_label = "Texture Memory Report"
+    bl_description = "Estimate the GPU memory of the textures used in the scene, per image, material and object"
+
+    @profiled
+    def execute(self, context):
+        profiler.phase("traverse")
+        index = get_material_index()
+        material_images, object_images = scene_texture_usage(context.scene, index)
+        normal_maps = index.normal_maps()[0]
+
+        profiler.phase("collect")
+        image_bytes = {}
+        for image_name in set().union(*material_images.values()):
+            img = bpy.data.images.get(image_name)
+            if img and img.size[0] and img.size[1]:
+                image_bytes[image_name] = gpu_texture_bytes(img)
+        total = sum(image_bytes.values())
+        budget = context.scene.scan_settings.texture_budget_mb * 1024 * 1024
+
+        profiler.phase("report")
+        print("\n--- Texture Memory (GPU estimate at power-of-2 size, with mipmaps) ---")
+        for image_name, size in sorted(image_bytes.items(), key=lambda x: -x[1]):
+            img = bpy.data.images[image_name]
+            width, height = power_of_2_size(img.size[0], img.size[1])
+            kind = " [normal map]" if image_name in normal_maps else ""
+            print(f"  - {image_name}: {width}x{height}, {format_bytes(size)}{kind}")
+        for title, usage in (("Materials", material_images), ("Objects", object_images)):
+            print(f"\n--- {title} ---")
+            rows = [(name, sum(image_bytes.get(n, 0) for n in names)) for name, names in usage.items()]
+            for name, size in sorted(rows, key=lambda x: -x[1]):
+                print(f"  - {name}: {format_bytes(size)}")
+
+        msg = f"Textures: {format_bytes(total)} of {format_bytes(budget)} budget in {len(image_bytes)} image(s)"
+        print(msg)
+        self.report({'WARNING'} if total > budget else {'INFO'}, msg)
+        return {'FINISHED'}
+
+# Operator to find the objects, materials and collections that weigh most on an export
+class SCAN_OT_asset_cost_report(bpy.types.Operator):
+    bl_idname = "object.asset_cost_report"
+    bl_label = "Asset Cost Report"
+    bl_description = (
+        "List the heaviest objects, materials and collections by triangles, texture memory, "
+        "missing UV maps and normal map coverage"
+    )
+
+    @profiled
+    def execute(self, context):
+        profiler.phase("traverse")
+        index = get_material_index()
+
+        profiler.phase("collect")
+        tables, totals = scene_asset_costs(context.scene, index)
+        profiler.count("objects costed", totals['objects'])
+
+        profiler.phase("report")
+        limit = context.scene.scan_settings.asset_report_rows
+        fill_asset_costs(context.window_manager, tables, limit)
+        for kind, name, description in ASSET_COST_KINDS:
+            table = tables[kind]
+            columns = table.columns
+            print(f"\n--- {name} (top {limit} by triangles) ---")
+            for row in sorted(table.top(limit), key=lambda r: -columns['TRIANGLES'][r])[:limit]:
+                missing = " [no UVs]" if kind == 'OBJECT' and columns['MISSING_UVS'][row] else ""
+                print(
+                    f"  - {table.names[row]}: {int(columns['TRIANGLES'][row]):,} tris, "
+                    f"{format_bytes(columns['TEXTURE_MEMORY'][row])}, "
+                    f"{columns['NORMAL_COVERAGE'][row]:.0%} normal mapped{missing}"
+                )
+
+        msg = (
+            f"{totals['objects']} object(s): {totals['triangles']:,} triangles, "
+            f"{format_bytes(totals['texture_bytes'])} of textures, "
+            f"{totals['normal_coverage']:.0%} normal mapped"
+        )
+        if totals['missing_uvs']:
+            msg += f", {totals['missing_uvs']} without UVs"
+        print(msg)
+        self.report({'WARNING'} if totals['missing_uvs'] else {'INFO'}, msg)
+
+        def show_popup():
+            bpy.ops.scan.asset_cost_popup('INVOKE_DEFAULT')
+            return None
+
+        bpy.app.timers.register(show_popup, first_interval=0.01)
+        return {'FINISHED'}
+
+# Operator to downscale textures until the scene fits the texture budget
+class SCAN_OT_fit_texture_budget(bpy.types.Operator):
+    bl_idname = "object.fit_texture_budget"
+    bl_label = "Fit Texture Budget"
+    bl_description = "Downscale the scene's textures, normal maps first, until they fit the texture budget"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    min_size: bpy.props.IntProperty(
+        name="Minimum Size",
+        description="Never shrink a texture's shorter side below this many pixels",
+        default=256,
+        min=1
+    )
+    resample_filter: bpy.props.EnumProperty(
+        name="Filter",
+        description="Resampling filter used to resize the images",
+        items=RESAMPLE_FILTERS,
+        default='LANCZOS'
+    )
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only list the planned resizes, without changing any image",
+        default=False
+    )
+
+    @profiled
+    def execute(self, context):
+        settings = context.scene.scan_settings
+        target = settings.texture_budget_mb * 1024 * 1024
+
+        profiler.phase("traverse")
+        index = get_material_index()
+        material_images, object_images = scene_texture_usage(context.scene, index)
+        images = [
+            img for img in (bpy.data.images.get(name) for name in set().union(*material_images.values()))
+            if img and img.size[0] and img.size[1] and img.name not in ["Render Result", "Viewer Node"]
+        ]
+
+        profiler.phase("collect")
+        before = sum(gpu_texture_bytes(img) for img in images)
+        sizes, after = plan_texture_budget(images, index.normal_maps()[0], target, self.min_size)
+        # Only textures that had to shrink; snapping to a power of 2 alone is left to Fix Image Dimensions
+        planned = [
+            (img, img.size[0], img.size[1]) + sizes[img.name]
+            for img in images if sizes[img.name] != power_of_2_size(img.size[0], img.size[1])
+        ]
+        planned.sort(key=lambda x: x[0].name)
+
+        if self.dry_run:
+            print(f"\n--- Planned Texture Budget Resizes (dry run) ---")
+            for img, width, height, new_width, new_height in planned:
+                print(f"  - {img.name}: {width}x{height} -> {new_width}x{new_height}")
+        else:
+            profiler.phase("mutate")
+            normal_maps = detected_normal_maps(
+                index, settings.detect_by_content, settings.content_threshold, settings.pixel_budget_mb
+            )
+            images_fixed = resize_images(planned, self.resample_filter, settings.pixel_budget_mb, normal_maps)
+            profiler.count("images resized", len(images_fixed))
+            print(f"\n--- Fit Texture Budget ---")
+            for info in images_fixed:
+                print(f"  - {info}")
+
+        profiler.phase("report")
+        verb = "Would resize" if self.dry_run else "Resized"
+        msg = (f"{verb} {len(planned)} image(s): {format_bytes(before)} -> {format_bytes(after)}"
+               f" (budget {format_bytes(target)})")
+        print(msg)
+        if after > target:
+            self.report({'WARNING'}, msg + "; still over budget at the minimum size")
+        else:
+            self.report({'INFO'}, msg)
+        return {'FINISHED'}
+
+class OrphanSweepOperator(ChunkedOperator):
+    """ChunkedOperator removing orphans a batch at a time.
+
+    Subclasses define sweep_collections(), returning the names of the
+    bpy.data collections to sweep (values of ORPHAN_COLLECTIONS).
+    """
+
+    chunk_size = 256
+
+    def chunk_items(self, context):
+        self.removed = []
+        return [(ORPHAN_COLLECTIONS[id_data.id_type], id_data.name) for id_data in find_orphans(self.sweep_collections())]
+
+    def process_chunk(self, context, items):
+        if not getattr(self, "dry_run", False):
+            remove_datablocks(items)
+        self.removed.extend(items)
+
+
+# Operator to remove orphaned materials, node groups and images in one sweep
+class SCAN_OT_remove_orphan_data(OrphanSweepOperator, bpy.types.Operator):
+    bl_idname = "object.remove_orphan_data"
+    bl_label = "Remove Orphan Data"
+    bl_description = "Remove materials, node groups and images that nothing in the file uses, including the ones only used by other orphans"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    materials: bpy.props.BoolProperty(name="Materials", default=True)
+    node_groups: bpy.props.BoolProperty(name="Node Groups", default=True)
+    images: bpy.props.BoolProperty(name="Images", default=True)
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only list what would be removed, without removing anything",
+        default=False
+    )
+
+    def sweep_collections(self):
+        return [name for name in ORPHAN_COLLECTIONS.values() if getattr(self, name)]
+
+    def finish_chunks(self, context):
+        # Report results
+        removed = self.removed
+        if not removed:
+            self.report({'INFO'}, "No orphan data found")
+            print("No orphan data found")
+            return {'FINISHED'}
+
+        counts = {}
+        for name, _ in removed:
+            counts[name] = counts.get(name, 0) + 1
+        summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+        verb = "Would remove" if self.dry_run else "Removed"
+        self.report({'INFO'}, f"{verb} {summary}")
+        print(f"\n--- {'Orphan Data (dry run)' if self.dry_run else 'Removed Orphan Data'} ---")
+        for name, datablock_name in removed:
+            print(f"  - {name.replace('_', ' ')}: {datablock_name}")
+        return {'FINISHED'}
+
+# Operator to remove unused textures/images
+class SCAN_OT_remove_unused_textures(OrphanSweepOperator, bpy.types.Operator):
+    bl_idname = "object.remove_unused_textures"
+    bl_label = "Remove Unused Textures"
+    bl_description = "Remove all textures/images that are not used in any material"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def sweep_collections(self):
+        return ["images"]
+
+    def finish_chunks(self, context):
+        removed_images = [name for _, name in self.removed]
+        removed_count = len(removed_images)
+        
+        # Report results
+        if removed_count > 0:
+            self.report({'INFO'}, f"Removed {removed_count} unused texture(s)")
+            print(f"\n--- Removed Unused Textures ---")
+            print(f"Removed {removed_count} unused texture(s):")
+            for name in removed_images:
+                print(f"  - {name}")
+        else:
+            self.report({'INFO'}, "No unused textures found")
+            print("No unused textures found")
+        
+        return {'FINISHED'}
+
+# Operator to remove unused materials
+class SCAN_OT_remove_unused_materials(OrphanSweepOperator, bpy.types.Operator):
+    bl_idname = "object.remove_unused_materials"
+    bl_label = "Remove Unused Materials"
+    bl_description = "Remove all materials that are not used by any object in the scene"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def sweep_collections(self):
+        return ["materials"]
+
+    def finish_chunks(self, context):
+        removed_materials = [name for _, name in self.removed]
+        removed_count = len(removed_materials)
+        
+        # Report results
+        if removed_count > 0:
+            self.report({'INFO'}, f"Removed {removed_count} unused material(s)")
+            print(f"\n--- Removed Unused Materials ---")
+            print(f"Removed {removed_count} unused material(s):")
+            for name in removed_materials:
+                print(f"  - {name}")
+        else:
+            self.report({'INFO'}, "No unused materials found")
+            print("No unused materials found")
+        
+        return {'FINISHED'}
+
+# Operator to merge images with identical content into one datablock
+class SCAN_OT_merge_duplicate_images(ChunkedOperator, bpy.types.Operator):
+    bl_idname = "object.merge_duplicate_images"
+    bl_label = "Merge Duplicate Images"
+    bl_description = "Point every user of an image copy (like Normal.001) at the image with the same content and remove the copies"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    # Items are groups of images with the same size and format; each can need full hashes
+    chunk_size = 1
+
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only list the duplicates, without merging them",
+        default=False
+    )
+
+    def chunk_items(self, context):
+        self.merged = []
+        self.budget = PixelBudget(context.scene.scan_settings.pixel_budget_mb, 1)
+        return duplicate_candidates(bpy.data.images)
+
+    def process_chunk(self, context, items):
+        for names in items:
+            images = [bpy.data.images.get(name) for name in names]
+            for group in duplicate_groups([img for img in images if img is not None], self.budget):
+                if not self.dry_run:
+                    canonical = bpy.data.images[group[0]]
+                    for name in group[1:]:
+                        bpy.data.images[name].user_remap(canonical)
+                    remove_datablocks([("images", name) for name in group[1:]])
+                profiler.count("duplicate images", len(group) - 1)
+                self.merged.append(group)
+
+    def finish_chunks(self, context):
+        # Report results
+        if not self.merged:
+            self.report({'INFO'}, "No duplicate images found")
+            print("No duplicate images found")
+            return {'FINISHED'}
+
+        copies = sum(len(group) - 1 for group in self.merged)
+        verb = "Would merge" if self.dry_run else "Merged"
+        self.report({'INFO'}, f"{verb} {copies} duplicate image(s) into {len(self.merged)} image(s)")
+        print(f"\n--- {'Duplicate Images (dry run)' if self.dry_run else 'Merged Duplicate Images'} ---")
+        for group in sorted(self.merged):
+            print(f"{group[0]} <- {', '.join(group[1:])}")
+        return {'FINISHED'}
+
+# FBX export with the textures written to a folder next to it
+
+# Written next to the textures when normal maps are exported with two channels
+NORMAL_ENCODING_SIDECAR = "normal_encoding.json"
+
+
+def write_normal_encoding_sidecar(textures_dir, two_channel_files):
+    """Record which texture files hold only X and Y of their normals; removes a stale record if there are none"""
+    import json
+    import os
+
+    sidecar_path = os.path.join(textures_dir, NORMAL_ENCODING_SIDECAR)
+    if not two_channel_files:
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        return
+    record = {
+        "version": 1,
+        "textures": {
+            file_name: {
+                "image": image_name,
+                "encoding": "RG",
+                # Stored as a grey + alpha PNG
+                "channels": {"x": "L", "y": "A"},
+                "decode": "n.xy = c * 2 - 1",
+                "reconstruct_z": "n.z = sqrt(max(0, 1 - dot(n.xy, n.xy)))",
+            }
+            for file_name, image_name in sorted(two_channel_files.items())
+        },
+    }
+    with open(sidecar_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+
+# Written next to the textures when normal maps are packed into atlases
+NORMAL_ATLAS_SIDECAR = "normal_atlas.json"
+
+
+def write_normal_atlas_sidecar(textures_dir, atlas_regions):
+    """Record the atlas, UV map and region each material samples its normal map from.
+
+    atlas_regions maps material names to (atlas file name, original image
+    name, u, v, u scale, v scale). Removes a stale record if there are none.
+    """
+    import json
+    import os
+
+    sidecar_path = os.path.join(textures_dir, NORMAL_ATLAS_SIDECAR)
+    if not atlas_regions:
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        return
+    record = {
+        "version": 1,
+        # The FBX file doesn't bind the atlas to this UV map; its textures name "default"
+        "uv_set": NormalMapAtlas.UV_NAME,
+        "materials": {
+            mat_name: {
+                "texture": file_name,
+                "image": image_name,
+                # Region of the atlas the original normal map was copied into
+                "offset": [u, v],
+                "scale": [u_scale, v_scale],
+                "remap": "atlas_uv = uv * scale + offset",
+            }
+            for mat_name, (file_name, image_name, u, v, u_scale, v_scale) in sorted(atlas_regions.items())
+        },
+    }
+    with open(sidecar_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+
+def export_fbx_with_textures(filepath, pixel_budget_mb, report, atlas_size=0, atlas_padding=8,
+                             normal_encoding='RGB', normal_mips='NONE', progress=None,
+                             detect_by_content=False, content_threshold=0.8):
+    """Write the used images next to `filepath` and export the scene there as FBX.
+
+    report takes (level set, message) like Operator.report. With atlas_size
+    set, the normal maps are packed into atlases of at most that size for the
+    length of the export (see NORMAL_ATLAS_SIDECAR). normal_encoding 'RG' writes the normal maps with
+    two channels (see NORMAL_ENCODING_SIDECAR). normal_mips 'MIPS' also
+    writes a mip chain of every normal map next to it, 'TOKSVIG' one with
+    the Toksvig factor in alpha (see normal_mip_chain()); with
+    detect_by_content, images whose pixels score at least content_threshold
+    as a normal map get one as well (see detected_normal_maps()). progress, if
+    given, is called with (fraction done, message). Returns {'FINISHED'} or
+    {'CANCELLED'}.
+    """
+    if not atlas_size:
+        return _export_fbx_with_textures(filepath, pixel_budget_mb, report, normal_encoding, normal_mips, progress,
+                                         None, detect_by_content, content_threshold)
+
+    profiler.phase("atlas")
+    index = get_material_index()
+    atlas = NormalMapAtlas(atlas_size, atlas_padding)
+    try:
+        atlas.apply(index)
+        print(f"\n=== Normal Map Atlas ===")
+        print(f"Packed {atlas.packed} normal map(s) into {len(atlas.atlas_images)} atlas(es)")
+        for name, reason in atlas.skipped:
+            print(f"Not packed: {name} ({reason})")
+        profiler.count("normal maps packed", atlas.packed)
+        return _export_fbx_with_textures(filepath, pixel_budget_mb, report, normal_encoding, normal_mips, progress,
+                                         atlas, detect_by_content, content_threshold)
+    finally:
+        profiler.phase("restore")
+        atlas.revert(index)
+
+
+def _export_fbx_with_textures(filepath, pixel_budget_mb, report, normal_encoding='RGB', normal_mips='NONE',
+                              progress=None, atlas=None, detect_by_content=False, content_threshold=0.8):
+    import os
+    
+    # Get directory and base name for FBX file
+    fbx_dir = os.path.dirname(filepath)
+    fbx_basename = os.path.splitext(os.path.basename(filepath))[0]
+    
+    # Create textures folder next to FBX file
+    textures_dir = os.path.join(fbx_dir, fbx_basename + "_textures")
+    os.makedirs(textures_dir, exist_ok=True)
+    
+    saved_count = 0
+    saved_images = []
+    
+    # Get all images used in materials
+    profiler.phase("traverse")
+    used_images = set()
+    for image_name in get_material_index().used_images():
+        img = bpy.data.images.get(image_name)
+        if img:
+            used_images.add(img)
+    two_channel = get_material_index().normal_maps()[0] if normal_encoding == 'RG' else set()
+    two_channel_files = {}  # file name -> image name
+    if normal_mips != 'NONE':
+        mip_images = detected_normal_maps(get_material_index(), detect_by_content, content_threshold, pixel_budget_mb)
+    else:
+        mip_images = set()
+    toksvig = normal_mips == 'TOKSVIG'
+    mip_jobs = []  # (image, [(path, digest)], params, future)
+    # Two-channel files only stand in for the images during the FBX export
+    restore_paths = []  # (image, filepath_raw, file_format)
+    
+    # Save all used images to disk. Images whose content matches a file
+    # from an earlier export are reused; clean packed files are copied byte
+    # for byte; PNGs are snapshotted here and encoded by a worker pool;
+    # other formats are saved by Blender on this thread while the pool is busy.
+    print("\n=== Saving Images to Disk ===")
+    profiler.phase("save")
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    manifest = TextureManifest(textures_dir)
+    workers = os.cpu_count() or 1
+    budget = PixelBudget(pixel_budget_mb, workers)
+    reserved_paths = set()
+    encode_jobs = []
+    in_flight = {}  # future -> reserved bytes
+    reused_count = 0
+    
+    def make_room(cost):
+        """Wait for running encodes until a snapshot of this size fits the budget"""
+        while in_flight and (len(in_flight) >= workers or not budget.fits(cost)):
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                budget.release(in_flight.pop(future))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, img in enumerate(used_images):
+            if progress:
+                progress(0.4 * i / len(used_images), f"Saving {img.name}")
+            if img.name in ["Render Result", "Viewer Node"]:
+                continue
+            
+            try:
+                # Create safe filename
+                safe_name = "".join(c for c in img.name if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+                
+                # Determine file extension based on original format or default to PNG
+                rg = img.name in two_channel
+                # Clean packed files in a format we can write are copied as they are
+                packed_data = img.packed_file.data if img.packed_file and not img.is_dirty else None
+                passthrough = packed_file_format(packed_data) if packed_data and not rg else None
+                if rg:
+                    file_ext = '.png'
+                elif passthrough:
+                    file_ext = passthrough[0]
+                elif img.filepath:
+                    ext = os.path.splitext(img.filepath)[1].lower()
+                    if ext in ['.jpg', '.jpeg', '.png', '.tga', '.bmp']:
+                        file_ext = ext
+                    else:
+                        file_ext = '.png'
+                else:
+                    # Default to PNG if no filepath
+                    file_ext = '.png'
+                
+                channels = png_channels(img) if file_ext == '.png' else None
+                cost = PixelBudget.snapshot_bytes(img)
+                # Over the budget, Blender saves from its own buffer and nothing is snapshotted
+                in_budget = budget.fits_alone(cost)
+                rg = rg and in_budget
+                if rg:
+                    channels = 2
+                    restore_paths.append((img, img.filepath_raw, img.file_format))
+                if passthrough:
+                    params = f"{file_ext}:packed"
+                    channels = None
+                else:
+                    params = f"{file_ext}:{'rg' if rg else channels}:{PNG_COMPRESS_LEVEL}:{img.size[0]}x{img.size[1]}"
+                if not in_budget:
+                    channels = None
+                pixels = None
+                if img.has_data and channels and (img.is_dirty or (not img.packed_file and img.source != 'FILE')):
+                    # Needed for the hash and, if it changed, for encoding
+                    make_room(cost)
+                    pixels = image_pixels(img)
+                    profiler.count("pixels touched", img.size[0] * img.size[1])
+                # Images that aren't loaded can still be matched by their source file
+                digest = image_content_hash(
+                    img, params, manifest, pixels, load_pixels=img.has_data and in_budget, packed_data=packed_data
+                )
+                # Can't hash it within the budget: written again, never matched against cached files
+                if digest is None and not img.has_data:
+                    continue
+                
+                # Mip chain of a normal map, unless the files from an earlier export still match
+                if img.name in mip_images and img.has_data and in_budget and img.channels >= 3:
+                    mip_params = f"mip:{normal_mips}:{PNG_COMPRESS_LEVEL}"
+                    mip_files = [
+                        (os.path.join(textures_dir, f"{safe_name}_mip{level}.png"),
+                         content_hash(digest, mip_params, str(level)) if digest else None)
+                        for level in range(1, len(mip_sizes(img.size[0], img.size[1])) + 1)
+                    ]
+                    if digest and all(manifest.reusable(img.name, mip_digest) == path for path, mip_digest in mip_files):
+                        for path, mip_digest in mip_files:
+                            manifest.keep(path)
+                    else:
+                        mip_cost = cost + cost // 2
+                        make_room(mip_cost)
+                        if pixels is None:
+                            pixels = image_pixels(img)
+                            profiler.count("pixels touched", img.size[0] * img.size[1])
+                        future = pool.submit(
+                            write_normal_mip_chain, [path for path, mip_digest in mip_files], pixels,
+                            img.size[0], img.size[1], img.channels, 4 if toksvig else (png_channels(img) or 3), toksvig
+                        )
+                        budget.reserve(mip_cost)
+                        in_flight[future] = mip_cost
+                        mip_jobs.append((img, mip_files, mip_params, future))
+                
+                # Unchanged since the last export: keep the file as it is
+                cached_path = digest and manifest.reusable(img.name, digest)
+                if cached_path and cached_path not in reserved_paths:
+                    reserved_paths.add(cached_path)
+                    manifest.keep(cached_path)
+                    if os.path.abspath(bpy.path.abspath(img.filepath)) != cached_path:
+                        point_image_at_file(img, cached_path, img.file_format, holds_pixels=not rg)
+                    reused_count += 1
+                    saved_images.append(os.path.basename(cached_path))
+                    if rg:
+                        two_channel_files[os.path.basename(cached_path)] = img.name
+                    print(f"Unchanged: {os.path.basename(cached_path)}")
+                    continue
+                
+                # Packed files don't need their pixels loaded to be copied
+                if not img.has_data and not passthrough:
+                    continue
+                
+                # Save image to textures folder
+                texture_path = os.path.join(textures_dir, safe_name + file_ext)
+                
+                # Ensure unique filename, also against files still being written.
+                # Files an earlier export wrote for this same image are overwritten.
+                counter = 1
+                original_path = texture_path
+                while texture_path in reserved_paths or (
+                    os.path.exists(texture_path) and manifest.owner(texture_path) != img.name
+                ):
+                    name_part = os.path.splitext(original_path)[0]
+                    texture_path = f"{name_part}_{counter}{file_ext}"
+                    counter += 1
+                reserved_paths.add(texture_path)
+                
+                if channels and pixels is None:
+                    make_room(cost)
+                    pixels = image_pixels(img)
+                    profiler.count("pixels touched", img.size[0] * img.size[1])
+                if os.path.exists(texture_path):
+                    # Never write through a hardlink shared with another texture
+                    os.remove(texture_path)
+                
+                # Same content as another exported file: link it instead of encoding
+                same_path = digest and manifest.find(digest)
+                if same_path:
+                    try:
+                        os.link(same_path, texture_path)
+                    except OSError:
+                        import shutil
+                        shutil.copy2(same_path, texture_path)
+                    point_image_at_file(img, texture_path, img.file_format, holds_pixels=not rg)
+                    manifest.record(img.name, texture_path, digest, params)
+                    reused_count += 1
+                    saved_images.append(os.path.basename(texture_path))
+                    if rg:
+                        two_channel_files[os.path.basename(texture_path)] = img.name
+                    print(f"Linked: {os.path.basename(texture_path)} -> {os.path.basename(same_path)}")
+                    continue
+                
+                if passthrough:
+                    # No decoding or encoding: the file is the packed bytes. The
+                    # image stays packed and is pointed at the file like the others.
+                    with open(texture_path, "wb") as f:
+                        f.write(packed_data)
+                    point_image_at_file(img, texture_path, passthrough[1])
+                    manifest.record(img.name, texture_path, digest, params, content_hash(packed_data))
+                    profiler.count("bytes written", len(packed_data))
+                    profiler.count("packed files copied")
+                    saved_count += 1
+                    saved_images.append(os.path.basename(texture_path))
+                    print(f"Saved: {os.path.basename(texture_path)} (packed file)")
+                    continue
+                
+                if channels:
+                    band_rows = budget.band_rows(img.size[0] * (img.channels * 4 + channels * 2 + 1))
+                    future = pool.submit(
+                        write_png, texture_path, pixels,
+                        img.size[0], img.size[1], img.channels, channels, band_rows,
+                        normal_rg_bytes if rg else band_to_bytes
+                    )
+                    pixels = None
+                    budget.reserve(cost)
+                    in_flight[future] = cost
+                    encode_jobs.append((img, texture_path, digest, params, future))
+                    continue
+                
+                # Blender only saves packed images that need converting once they are unpacked
+                if img.packed_file:
+                    img.unpack(method='USE_ORIGINAL')
+                
+                # Set image filepath and format (filepath_raw keeps the loaded pixels)
+                img.filepath_raw = texture_path
+                if file_ext in ['.jpg', '.jpeg']:
+                    img.file_format = 'JPEG'
+                elif file_ext == '.png':
+                    img.file_format = 'PNG'
+                elif file_ext == '.tga':
+                    img.file_format = 'TARGA'
+                
+                # Save the image
+                img.save()
+                manifest.record(img.name, texture_path, digest, params)
+                profiler.count("bytes written", os.path.getsize(texture_path))
+                
+                saved_count += 1
+                saved_images.append(os.path.basename(texture_path))
+                print(f"Saved: {os.path.basename(texture_path)}")
+                
+            except Exception as e:
+                print(f"Failed to save {img.name}: {e}")
+
+        # Point the images at their written files once the pool is done
+        for i, (img, texture_path, digest, params, future) in enumerate(encode_jobs):
+            if progress:
+                progress(0.4 + 0.4 * i / len(encode_jobs), f"Encoding {os.path.basename(texture_path)}")
+            try:
+                written_hash = future.result()
+                point_image_at_file(img, texture_path, 'PNG', holds_pixels=img.name not in two_channel)
+                manifest.record(img.name, texture_path, digest, params, written_hash)
+                profiler.count("bytes written", os.path.getsize(texture_path))
+                saved_count += 1
+                saved_images.append(os.path.basename(texture_path))
+                if img.name in two_channel:
+                    two_channel_files[os.path.basename(texture_path)] = img.name
+                print(f"Saved: {os.path.basename(texture_path)}")
+            except Exception as e:
+                print(f"Failed to save {img.name}: {e}")
+
+        for img, mip_files, mip_params, future in mip_jobs:
+            try:
+                for (path, mip_digest), written_hash in zip(mip_files, future.result()):
+                    manifest.record(img.name, path, mip_digest, mip_params, written_hash)
+                    profiler.count("bytes written", os.path.getsize(path))
+                profiler.count("mip levels written", len(mip_files))
+                print(f"Mip chain: {img.name} ({len(mip_files)} level(s))")
+            except Exception as e:
+                print(f"Failed to write the mip chain of {img.name}: {e}")
 
-    def execute(self, context):
-        return {'FINISHED'}
+    for name in manifest.prune({img.name for img in used_images}):
+        print(f"Removed stale texture: {name}")
+    manifest.save()
+    write_normal_encoding_sidecar(textures_dir, two_channel_files)
+    atlas_regions = {}
+    for mat_name, (atlas_name, image_name, *region) in (atlas.regions.items() if atlas else ()):
+        atlas_image = bpy.data.images.get(atlas_name)
+        file_name = os.path.basename(atlas_image.filepath_raw) if atlas_image else ""
+        if file_name in saved_images:
+            atlas_regions[mat_name] = (file_name, image_name, *region)
+    write_normal_atlas_sidecar(textures_dir, atlas_regions)
+    profiler.count("textures written", saved_count)
+    profiler.count("textures reused", reused_count)
+    if reused_count:
+        print(f"Reused {reused_count} unchanged texture(s)")
+    
+    if saved_count > 0:
+        report({'INFO'}, f"Saved {saved_count} texture(s) to disk")
+        print(f"Saved {saved_count} texture(s) to: {textures_dir}")
+    
+    # Export as FBX
+    profiler.phase("export")
+    if progress:
+        progress(0.8, "Exporting FBX")
+    print(f"\n=== Exporting FBX ===")
+    print(f"Exporting to: {filepath}")
+    
+    try:
+        # Export FBX with textures
+        bpy.ops.export_scene.fbx(
+            filepath=filepath,
+            check_existing=True,
+            filter_glob="*.fbx",
+            use_selection=False,
+            use_active_collection=False,
+            global_scale=1.0,
+            apply_unit_scale=True,
+            apply_scale_options='FBX_SCALE_NONE',
+            use_space_transform=True,
+            bake_space_transform=False,
+            object_types={'MESH', 'ARMATURE', 'EMPTY', 'OTHER'},
+            use_mesh_modifiers=True,
+            use_mesh_modifiers_render=True,
+            mesh_smooth_type='OFF',
+            use_subsurf=False,
+            use_mesh_edges=False,
+            use_tspace=False,
+            use_custom_props=False,
+            add_leaf_bones=True,
+            primary_bone_axis='Y',
+            secondary_bone_axis='X',
+            use_armature_deform_only=False,
+            armature_nodetype='NULL',
+            bake_anim=True,
+            bake_anim_use_all_bones=True,
+            bake_anim_use_nla_strips=True,
+            bake_anim_use_all_actions=True,
+            bake_anim_force_startend_keying=True,
+            bake_anim_step=1.0,
+            bake_anim_simplify_factor=1.0,
+            path_mode='COPY',  # Copy textures relative to FBX
+            embed_textures=False,  # Don't embed, use external files
+            batch_mode='OFF',
+            use_batch_own_dir=True,
+            use_metadata=True
+        )
+        
+        if os.path.exists(filepath):
+            profiler.count("bytes written", os.path.getsize(filepath))
+        report({'INFO'}, f"Exported FBX with {saved_count + reused_count} texture(s)")
+        print(f"✓ Successfully exported FBX!")
+        print(f"✓ Textures saved to: {textures_dir}")
+        print(f"  Keep the '{fbx_basename}_textures' folder with the FBX file!")
+        
+    except Exception as e:
+        report({'ERROR'}, f"Export failed: {str(e)}")
+        print(f"✗ Export failed: {e}")
+        return {'CANCELLED'}
+    finally:
+        for img, filepath_raw, file_format in restore_paths:
+            point_image_at_file(img, filepath_raw, file_format, holds_pixels=False)
+    
+    return {'FINISHED'}
 
-    def invoke(self, context, event):
-        return context.window_manager.invoke_props_dialog(self, width=500)
 
-    def draw(self, context):
-        layout = self.layout
-        col = layout.column(align=True)
-        
-        # Parse the data
+# The same export run by a worker Blender process on a snapshot of the file,
+# so the UI stays responsive. The worker reports on its stdout.
+EXPORT_PROGRESS_PREFIX = "NORMAL_SCANNER_PROGRESS "
+EXPORT_REPORT_PREFIX = "NORMAL_SCANNER_REPORT "
+
+
+def stage_unsaved_images(directory):
+    """Write image pixels that only live in memory to PNGs; returns {image name: PNG path}.
+
+    Generated or painted images that weren't saved lose their pixels when
+    the .blend is saved, and painted packed images keep their old packed
+    bytes, so workers load them from these files instead.
+    """
+    import os
+
+    staged = {}
+    for image_name in sorted(get_material_index().used_images()):
+        img = bpy.data.images.get(image_name)
+        if img is None or not img.has_data or (img.packed_file and not img.is_dirty):
+            continue
+        if img.source == 'FILE' and not img.is_dirty:
+            continue
+        channels = png_channels(img) or 4
+        path = os.path.join(directory, f"staged_{len(staged)}.png")
+        write_png(path, image_pixels(img), img.size[0], img.size[1], img.channels, channels)
+        staged[img.name] = path
+    return staged
+
+
+def save_export_snapshot():
+    """Save a copy of the open file for worker processes; returns (temporary folder, .blend path, staged images JSON)"""
+    import json
+    import os
+    import tempfile
+
+    directory = tempfile.mkdtemp(prefix="normal_scanner_export_")
+    staged_path = os.path.join(directory, "staged.json")
+    with open(staged_path, "w", encoding="utf-8") as f:
+        json.dump(stage_unsaved_images(directory), f)
+    snapshot = os.path.join(directory, "snapshot.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True, relative_remap=True)
+    return directory, snapshot, staged_path
+
+
+class BackgroundExport:
+    """An FBX export running in `blender -b` on a copy of the current file.
+
+    start() saves the snapshot and launches the worker; poll() collects its
+    progress and reports and returns False once it has exited. The open
+    file isn't changed: unlike the foreground export, its images keep
+    pointing where they did. With a collection name, the worker exports
+    only that collection's objects.
+    """
+
+    def __init__(self, filepath, pixel_budget_mb, atlas_size=0, atlas_padding=8, normal_encoding='RGB', blender="",
+                 collection="", normal_mips='NONE', detect_by_content=False, content_threshold=0.8):
+        self.filepath = filepath
+        self.pixel_budget_mb = pixel_budget_mb
+        self.atlas_size = atlas_size
+        self.atlas_padding = atlas_padding
+        self.normal_encoding = normal_encoding
+        self.normal_mips = normal_mips
+        self.detect_by_content = detect_by_content
+        self.content_threshold = content_threshold
+        self.blender = blender or bpy.app.binary_path
+        self.collection = collection
+        self.progress = 0.0
+        self.message = "Starting"
+        self.reports = []         # (level, message) from the worker
+        self.output = []          # last lines of other worker output, for errors
+        self.returncode = None
+        self.cancelled = False
+        self._dir = None
+        self._proc = None
+        self._lines = None
+        self._read_all = None
+
+    def start(self, snapshot=None, staged_path=None):
+        """Launch the worker, on a snapshot from save_export_snapshot() if given, else on a new one it owns"""
+        import os
+        import queue
+        import subprocess
+        import threading
+
+        if snapshot is None:
+            profiler.phase("snapshot")
+            self._dir, snapshot, staged_path = save_export_snapshot()
+
+        command = [
+            self.blender, "-b", "--factory-startup", "--python", os.path.abspath(__file__), "--",
+            "export-worker", snapshot, "--filepath", os.path.abspath(bpy.path.abspath(self.filepath)),
+            "--pixel-budget-mb", str(self.pixel_budget_mb), "--staged", staged_path,
+            "--atlas-size", str(self.atlas_size), "--atlas-padding", str(self.atlas_padding),
+            "--normal-encoding", self.normal_encoding, "--normal-mips", self.normal_mips,
+            "--content-threshold", repr(self.content_threshold),
+        ]
+        if self.detect_by_content:
+            command.append("--detect-by-content")
+        if self.collection:
+            command += ["--collection", self.collection]
+        profiler.phase("launch")
+        self._proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                      text=True, encoding="utf-8", errors="replace")
+        # Read on a thread so poll() never blocks the UI
+        self._lines = queue.Queue()
+
+        self._read_all = threading.Event()
+
+        def read():
+            for line in self._proc.stdout:
+                self._lines.put(line.rstrip("\n"))
+            self._read_all.set()
+
+        threading.Thread(target=read, daemon=True).start()
+
+    def poll(self):
+        """Take in what the worker printed; returns True while it is still running"""
         import json
-        try:
-            normal_maps = json.loads(self.normal_maps) if self.normal_maps else []
-            material_usage = json.loads(self.material_usage) if self.material_usage else []
-        except:
-            normal_maps = []
-            material_usage = []
-        
-        # Show normal maps list
-        col.label(text=f"Normal Maps Found ({len(normal_maps)}):", icon='TEXTURE')
-        box = col.box()
-        for nm in sorted(normal_maps):
-            box.label(text=f"  • {nm}")
-        
-        # Show materials using normal maps
-        if material_usage:
-            col.separator()
-            col.label(text=f"Materials Using Normal Maps ({len(material_usage)}):", icon='MATERIAL')
-            box = col.box()
-            for mat_name, textures in sorted(material_usage, key=lambda x: x[0]):
-                box.label(text=f"  {mat_name}:", icon='MATERIAL_DATA')
-                for tex in textures:
-                    box.label(text=f"    → {tex}")
+        import queue
 
-# Operator to scan normal maps
-class SCAN_OT_normal_maps(bpy.types.Operator):
-    bl_idname = "object.scan_normal_maps"
-    bl_label = "Scan Normal Maps"
-    bl_description = "List all textures used as normal maps in the scene"
+        # Checked first, so every line read before the worker's output ended is taken in below
+        finished = self._read_all.is_set() and self._proc.poll() is not None
+        while True:
+            try:
+                line = self._lines.get_nowait()
+            except queue.Empty:
+                break
+            if line.startswith(EXPORT_PROGRESS_PREFIX):
+                fraction, _, message = line[len(EXPORT_PROGRESS_PREFIX):].partition(" ")
+                self.progress = float(fraction)
+                self.message = message
+            elif line.startswith(EXPORT_REPORT_PREFIX):
+                level, message = json.loads(line[len(EXPORT_REPORT_PREFIX):])
+                self.reports.append((level, message))
+            else:
+                self.output = (self.output + [line])[-20:]
+        if finished:
+            self.returncode = self._proc.returncode
+        return not finished
 
-    def execute(self, context):
-        normal_maps = set()
-        material_usage = []  # (material name, set of texture names)
+    def wait(self):
+        import time
 
-        # Loop through all materials
-        for mat in bpy.data.materials:
-            if mat.node_tree:
-                mat_normals = set()
-                for node in mat.node_tree.nodes:
-                    if node.type == 'NORMAL_MAP':
-                        # Check connected texture nodes
-                        for input_name, input in node.inputs.items():
-                            if input.is_linked:
-                                from_node = input.links[0].from_node
-                                if from_node.type == 'TEX_IMAGE' and from_node.image:
-                                    tex_name = from_node.image.name
-                                    normal_maps.add(tex_name)
-                                    mat_normals.add(tex_name)
+        while self.poll():
+            time.sleep(0.05)
 
-                if mat_normals:
-                    material_usage.append((mat.name, sorted(mat_normals)))
+    def cancel(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except Exception:
+                self._proc.kill()
+        self.cancelled = True
 
-        # Report results
-        if normal_maps:
-            # Build report message with materials
-            message = f"Found {len(normal_maps)} normal map(s)"
-            if material_usage:
-                message += f" in {len(material_usage)} material(s)"
-            self.report({'INFO'}, message)
-            
-            print("\n--- Normal Maps in Scene ---")
-            for nm in sorted(normal_maps):
-                print(" -", nm)
+    def cleanup(self):
+        import shutil
 
-            if material_usage:
-                print("\n--- Materials Using Normal Maps ---")
-                for mat_name, textures in material_usage:
-                    print(f"{mat_name}:")
-                    for tex in textures:
-                        print(f"   - {tex}")
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
 
-            # Show a popup so results are visible without checking the console
-            import json
-            # Store data temporarily for the popup
-            normal_maps_list = sorted(list(normal_maps))
-            material_usage_list = material_usage
-            
-            # Use a timer to show popup after operator finishes
-            def show_popup():
-                bpy.ops.scan.normal_maps_popup(
-                    'INVOKE_DEFAULT',
-                    normal_maps=json.dumps(normal_maps_list),
-                    material_usage=json.dumps(material_usage_list)
-                )
-                return None  # Timer runs once
-            
-            bpy.app.timers.register(show_popup, first_interval=0.01)
-        else:
-            self.report({'INFO'}, "No normal maps found in the scene")
-            print("No normal maps found in the scene")
 
-        return {'FINISHED'}
+# Per-collection FBX export. Every top-level collection of the scene gets its
+# own file, and a manifest next to them records the fingerprint of what each
+# file was written from: the collection's objects, their data, modifiers and
+# animation, and their materials with node values and image content. Only
+# collections whose fingerprint changed, or whose file was touched, are
+# exported again.
 
+# Node properties that only change how a node tree is drawn
+NODE_UI_PROPERTIES = {
+    "rna_type", "select", "location", "width", "height", "dimensions", "hide", "show_options",
+    "show_preview", "show_texture", "label", "color", "use_custom_color", "parent",
+}
 
-# Operator to remove normal maps
-class SCAN_OT_remove_normal_maps(bpy.types.Operator):
-    bl_idname = "object.remove_normal_maps"
-    bl_label = "Remove Normal Maps"
-    bl_description = "Remove normal map textures from all materials in the scene"
 
-    def execute(self, context):
-        removed_maps = set()
-        removed_nodes = 0
-        removed_links = 0
+def rna_values(struct, skip=()):
+    """(identifier, value) of a struct's RNA properties, datablocks by name; for change detection"""
+    import numpy as np
 
-        for mat in bpy.data.materials:
-            if not mat.use_nodes or not mat.node_tree:
-                continue
+    values = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in skip or prop.identifier == "rna_type" or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER':
+            value = value.name if isinstance(value, bpy.types.ID) else None
+        elif getattr(prop, "is_array", False):
+            value = np.array(value).tolist()
+        elif isinstance(value, set):
+            value = sorted(value)
+        values.append((prop.identifier, value))
+    return values
 
-            node_tree = mat.node_tree
-            links_to_remove = []
-            nodes_to_remove = []
 
-            for node in list(node_tree.nodes):
-                if node.type != 'NORMAL_MAP':
-                    continue
+# Attribute data type -> foreach_get key, values per element and dtype name
+ATTRIBUTE_ARRAYS = {
+    'FLOAT': ("value", 1, "float32"), 'INT': ("value", 1, "int32"), 'INT8': ("value", 1, "int32"),
+    'BOOLEAN': ("value", 1, "bool"), 'FLOAT2': ("vector", 2, "float32"), 'INT32_2D': ("value", 2, "int32"),
+    'FLOAT_VECTOR': ("vector", 3, "float32"), 'FLOAT_COLOR': ("color", 4, "float32"),
+    'BYTE_COLOR': ("color", 4, "float32"), 'QUATERNION': ("value", 4, "float32"),
+}
 
-                # Collect incoming links from image textures feeding this normal map
-                color_input = node.inputs.get('Color')
-                if color_input:
-                    for link in list(color_input.links):
-                        links_to_remove.append(link)
-                        from_node = link.from_node
-                        if from_node and from_node.type == 'TEX_IMAGE' and from_node.image:
-                            removed_maps.add(from_node.image.name)
 
-                # Collect outgoing links from the normal output
-                normal_output = node.outputs.get('Normal')
-                if normal_output:
-                    for link in list(normal_output.links):
-                        links_to_remove.append(link)
+def mesh_fingerprint(mesh):
+    """Hash of a mesh's geometry and attributes (UV maps, normals, colors...), read with foreach_get"""
+    import numpy as np
 
-                nodes_to_remove.append(node)
+    parts = [repr((len(mesh.vertices), len(mesh.loops), len(mesh.polygons), [mat and mat.name for mat in mesh.materials]))]
+    for elements, attr, dtype, width in (
+        (mesh.vertices, "co", np.float32, 3),
+        (mesh.loops, "vertex_index", np.int32, 1),
+        (mesh.polygons, "loop_start", np.int32, 1),
+        (mesh.polygons, "material_index", np.int32, 1),
+    ):
+        values = np.empty(len(elements) * width, dtype=dtype)
+        elements.foreach_get(attr, values)
+        parts.append(values)
+    for layer in mesh.uv_layers:
+        values = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", values)
+        parts += [layer.name, values]
+    # Other attributes, without the ones read above and the internal ones (selection and such)
+    skip = {"position", "material_index"} | {layer.name for layer in mesh.uv_layers}
+    for attribute in getattr(mesh, "attributes", ()):
+        array = ATTRIBUTE_ARRAYS.get(attribute.data_type)
+        if array is None or attribute.name in skip or attribute.name.startswith("."):
+            continue
+        key, width, dtype = array
+        values = np.empty(len(attribute.data) * width, dtype=dtype)
+        attribute.data.foreach_get(key, values)
+        parts += [repr((attribute.name, attribute.domain, attribute.data_type)), values]
+    return content_hash(*parts)
 
-            for link in links_to_remove:
-                node_tree.links.remove(link)
-                removed_links += 1
 
-            for node in nodes_to_remove:
-                node_tree.nodes.remove(node)
-                removed_nodes += 1
+def export_image_fingerprint(img):
+    """image_fingerprint(), or a hash of the pixels for images that only live in memory"""
+    fingerprint = image_fingerprint(img)
+    if fingerprint is None and img.has_data:
+        fingerprint = content_hash(image_pixels(img))
+    return repr((fingerprint, img.colorspace_settings.name, img.alpha_mode))
 
-        if removed_nodes:
-            msg = f"Removed {removed_nodes} normal map node(s), {removed_links} link(s)"
-            if removed_maps:
-                msg += f"; textures: {', '.join(sorted(removed_maps))}"
-            self.report({'INFO'}, msg)
-            print("\n--- Removed Normal Maps ---")
-            print(msg)
-        else:
-            self.report({'INFO'}, "No normal maps to remove")
-            print("No normal maps to remove")
 
-        return {'FINISHED'}
+def node_values_fingerprint(tree, cache):
+    """Hash of the settings of a tree's nodes and the values of their unlinked inputs, nested groups included"""
+    parts = []
+    for node in tree.nodes:
+        parts.append((node.name, rna_values(node, NODE_UI_PROPERTIES)))
+        for socket in node.inputs:
+            value = getattr(socket, "default_value", None)
+            if value is not None and not socket.is_linked:
+                parts.append((socket.identifier, value if isinstance(value, (int, float, str)) else tuple(value)))
+        image = getattr(node, "image", None)
+        if image is not None:
+            if ("IMAGE", image.name) not in cache:
+                cache["IMAGE", image.name] = export_image_fingerprint(image)
+            parts.append(cache["IMAGE", image.name])
+        group = node.node_tree if node.type == 'GROUP' else None
+        if group is not None:
+            if ("GROUP", group.name) not in cache:
+                cache["GROUP", group.name] = node_values_fingerprint(group, cache)
+            parts.append(cache["GROUP", group.name])
+    return content_hash(repr(parts))
 
-# Operator to fix UV coordinates for glTF export
-class SCAN_OT_fix_uv_coordinates(bpy.types.Operator):
-    bl_idname = "object.fix_uv_coordinates"
-    bl_label = "Fix UV Coordinates for glTF"
-    bl_description = "Add UV coordinates to meshes that have textured materials but no UV mapping"
-    bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
-        import bmesh
-        from mathutils import Vector
-        
-        fixed_count = 0
-        meshes_fixed = []
-        
-        def has_texture_in_material(material):
-            """Check if a material uses any texture nodes"""
-            if not material or not material.use_nodes or not material.node_tree:
-                return False
-            
-            for node in material.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    return True
+def action_fingerprint(action):
+    """Hash of an action's F-curves: paths, keyframes and handles (read with foreach_get), and modifiers"""
+    import numpy as np
+
+    parts = [repr((action.name, tuple(action.frame_range)))]
+    for fcurve in action.fcurves:
+        points = fcurve.keyframe_points
+        parts.append(repr((fcurve.data_path, fcurve.array_index, fcurve.extrapolation, fcurve.mute,
+                           [rna_values(modifier) for modifier in fcurve.modifiers])))
+        for attr, dtype, width in (
+            ("co", np.float32, 2), ("handle_left", np.float32, 2), ("handle_right", np.float32, 2),
+            ("interpolation", np.int32, 1), ("easing", np.int32, 1),
+        ):
+            values = np.empty(len(points) * width, dtype=dtype)
+            points.foreach_get(attr, values)
+            parts.append(values)
+    return content_hash(*parts)
+
+
+def animation_fingerprint(anim, cache):
+    """Hash of what the FBX export bakes from an ID's animation data: its action, NLA tracks and drivers"""
+    if anim is None:
+        return None
+    actions = [anim.action]
+    parts = [rna_values(anim, {"action_tweak_storage"})]
+    for track in anim.nla_tracks:
+        parts.append((track.name, track.mute, track.is_solo, [rna_values(strip) for strip in track.strips]))
+        actions += [strip.action for strip in track.strips]
+    for fcurve in anim.drivers:
+        driver = fcurve.driver
+        parts.append((fcurve.data_path, fcurve.array_index, driver.type, driver.expression, [
+            (variable.name, variable.type, [rna_values(target) for target in variable.targets])
+            for variable in driver.variables
+        ]))
+    for action in actions:
+        if action is not None:
+            if ("ACTION", action.name) not in cache:
+                cache["ACTION", action.name] = action_fingerprint(action)
+            parts.append(cache["ACTION", action.name])
+    return content_hash(repr(parts))
+
+
+def collection_fingerprint(collection, cache):
+    """Hash of everything an FBX export of the collection's objects writes; cache is shared across collections"""
+    parts = []
+    for obj in sorted(collection.all_objects, key=lambda obj: obj.name):
+        data = obj.data
+        if data is not None and ("DATA", data.name) not in cache:
+            if obj.type == 'MESH':
+                cache["DATA", data.name] = mesh_fingerprint(data)
+            else:
+                cache["DATA", data.name] = content_hash(repr(rna_values(data)))
+        parts.append((
+            obj.name, obj.type, obj.parent.name if obj.parent else None,
+            [list(row) for row in obj.matrix_world], obj.hide_render,
+            cache["DATA", data.name] if data is not None else None,
+            [rna_values(modifier) for modifier in obj.modifiers],
+            animation_fingerprint(obj.animation_data, cache),
+            animation_fingerprint(getattr(data, "animation_data", None), cache),
+        ))
+        if obj.animation_data is not None:
+            # Animated objects get every action in the file tried on them
+            # (bake_anim_use_all_actions), baked over the scene's frame range
+            if "ANIMATION" not in cache:
+                scene = bpy.context.scene
+                actions = sorted(bpy.data.actions, key=lambda action: action.name)
+                for action in actions:
+                    if ("ACTION", action.name) not in cache:
+                        cache["ACTION", action.name] = action_fingerprint(action)
+                cache["ANIMATION"] = content_hash(
+                    repr((scene.frame_start, scene.frame_end, scene.render.fps, scene.render.fps_base)),
+                    *(cache["ACTION", action.name] for action in actions),
+                )
+            parts.append(cache["ANIMATION"])
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat is None:
+                parts.append((slot.link, None))
+                continue
+            if ("MATERIAL", mat.name) not in cache:
+                group_fingerprints = {}
+                cache["MATERIAL", mat.name] = content_hash(
+                    material_fingerprint(mat, group_fingerprints),
+                    node_values_fingerprint(mat.node_tree, cache) if mat.node_tree else "",
+                )
+            parts.append((slot.link, mat.name, cache["MATERIAL", mat.name]))
+    return content_hash(repr(parts))
+
+
+class SplitExport:
+    """One FBX file per top-level collection, exported again only when the collection changed.
+
+    For filepath level.fbx, collection Props goes to level_Props.fbx with
+    its textures in level_Props_textures, and level_collections.json records
+    the fingerprint and file each collection was exported from. Changed
+    collections are exported by up to `jobs` BackgroundExport workers at
+    once, all from one snapshot. Has the same start/poll/wait/cancel/cleanup
+    interface as BackgroundExport.
+    """
+
+    def __init__(self, filepath, pixel_budget_mb, jobs=4, atlas_size=0, atlas_padding=8, normal_encoding='RGB',
+                 blender="", force=False, normal_mips='NONE', detect_by_content=False, content_threshold=0.8):
+        import os
+
+        self.filepath = os.path.abspath(bpy.path.abspath(filepath))
+        self.pixel_budget_mb = pixel_budget_mb
+        self.jobs = max(1, jobs)
+        self.atlas_size = atlas_size
+        self.atlas_padding = atlas_padding
+        self.normal_encoding = normal_encoding
+        self.normal_mips = normal_mips
+        self.detect_by_content = detect_by_content
+        self.content_threshold = content_threshold
+        self.blender = blender
+        self.force = force
+        base = os.path.splitext(self.filepath)[0]
+        self.manifest_path = base + "_collections.json"
+        self.progress = 0.0
+        self.message = "Starting"
+        self.reports = []
+        self.output = []
+        self.returncode = None
+        self.cancelled = False
+        self.entries = {}     # collection name -> {"fingerprint", "file", "size", "mtime_ns"}
+        self.pending = []     # (collection name, fingerprint, FBX path)
+        self.running = {}     # BackgroundExport -> (collection name, fingerprint)
+        self.total = 0
+        self.unchanged = 0
+        self.exported = []
+        self.failed = []
+        self._dir = None
+        self._snapshot = None
+
+    def file_path(self, collection_name):
+        import os
+
+        safe_name = "".join(c for c in collection_name if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+        return f"{os.path.splitext(self.filepath)[0]}_{safe_name}.fbx"
+
+    def _intact(self, entry):
+        import os
+
+        try:
+            stat = os.stat(os.path.join(os.path.dirname(self.filepath), entry["file"]))
+        except OSError:
             return False
-        
-        def add_box_uv(mesh):
-            """Add simple box projection UV coordinates to a mesh"""
-            # Skip empty meshes
-            if len(mesh.polygons) == 0 or len(mesh.vertices) == 0:
-                return False
-            
-            # Create UV layer if it doesn't exist
-            if not mesh.uv_layers:
-                mesh.uv_layers.new(name="UVMap")
-            
-            uv_layer = mesh.uv_layers.active.data
-            
-            # Simple box projection based on face normals
-            for poly in mesh.polygons:
-                normal = poly.normal
-                
-                # Determine dominant axis for projection
-                abs_normal = [abs(normal.x), abs(normal.y), abs(normal.z)]
-                max_axis = abs_normal.index(max(abs_normal))
-                
-                for loop_idx in poly.loop_indices:
-                    loop = mesh.loops[loop_idx]
-                    vert = mesh.vertices[loop.vertex_index]
-                    co = vert.co
-                    
-                    # Project based on dominant axis
-                    if max_axis == 0:  # X dominant - project on YZ
-                        uv = (co.y, co.z)
-                    elif max_axis == 1:  # Y dominant - project on XZ
-                        uv = (co.x, co.z)
-                    else:  # Z dominant - project on XY
-                        uv = (co.x, co.y)
-                    
-                    uv_layer[loop_idx].uv = uv
-            return True
-        
-        # Check all mesh objects
-        for obj in bpy.data.objects:
-            if obj.type != 'MESH':
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def _load_manifest(self):
+        import json
+
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get("collections", {}) if data.get("version") == 1 else {}
+
+    def _save_manifest(self):
+        import json
+        import os
+
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "collections": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _record(self, collection_name, fingerprint, path):
+        import os
+
+        stat = os.stat(path)
+        self.entries[collection_name] = {
+            "fingerprint": fingerprint, "file": os.path.basename(path),
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+        }
+        self._save_manifest()
+
+    def _prune(self, collection_names):
+        """Delete the files of collections that are gone, if nothing else touched them"""
+        import os
+        import shutil
+
+        for name, entry in list(self.entries.items()):
+            if name in collection_names:
                 continue
-            
-            mesh = obj.data
-            needs_uv = False
-            
-            # Check if mesh has UV coordinates
-            has_uv = len(mesh.uv_layers) > 0
-            
-            # Check if any material uses textures
-            if obj.data.materials:
-                for mat in obj.data.materials:
-                    if has_texture_in_material(mat):
-                        needs_uv = True
-                        break
-            
-            # If material has textures but mesh has no UV, add UV coordinates
-            if needs_uv and not has_uv:
-                try:
-                    if add_box_uv(mesh):
-                        fixed_count += 1
-                        meshes_fixed.append(obj.name)
-                except Exception as e:
-                    print(f"Failed to add UV to {obj.name}: {e}")
-        
-        # Report results
-        if fixed_count > 0:
-            self.report({'INFO'}, f"Fixed UV coordinates for {fixed_count} mesh(es)")
-            print(f"\n--- Fixed UV Coordinates ---")
-            print(f"Successfully added UV coordinates to {fixed_count} mesh(es):")
-            for name in meshes_fixed:
-                print(f"  - {name}")
-        else:
-            self.report({'INFO'}, "All meshes already have UV coordinates")
-            print("All meshes already have UV coordinates or don't need them")
-        
-        return {'FINISHED'}
+            path = os.path.join(os.path.dirname(self.filepath), entry["file"])
+            if self._intact(entry):
+                os.remove(path)
+                # The textures folder and the one the FBX exporter copies them to
+                shutil.rmtree(os.path.splitext(path)[0] + "_textures", ignore_errors=True)
+                shutil.rmtree(os.path.splitext(path)[0] + ".fbm", ignore_errors=True)
+                print(f"Removed export of deleted collection: {entry['file']}")
+            del self.entries[name]
 
-# Operator to fix image dimensions for glTF export
-class SCAN_OT_fix_image_dimensions(bpy.types.Operator):
-    bl_idname = "object.fix_image_dimensions"
-    bl_label = "Fix Image Dimensions for glTF"
-    bl_description = "Resize images to power-of-2 dimensions for glTF compatibility"
-    bl_options = {'REGISTER', 'UNDO'}
+    def start(self):
+        import os
 
-    def execute(self, context):
-        fixed_count = 0
-        images_fixed = []
-        
-        def nearest_power_of_2(n):
-            """Find the nearest power of 2 to n"""
-            if n <= 0:
-                return 1
-            # Find lower and upper power of 2
-            lower = 1
-            while lower * 2 <= n:
-                lower *= 2
-            upper = lower * 2
-            # Return the closer one
-            if n - lower < upper - n:
-                return lower
-            return upper
-        
-        def is_power_of_2(n):
-            """Check if n is a power of 2"""
-            return n > 0 and (n & (n - 1)) == 0
-        
-        # Check all images
-        for img in bpy.data.images:
-            # Skip internal images
-            if img.name in ["Render Result", "Viewer Node"]:
+        profiler.phase("fingerprint")
+        # The fingerprints take the options in, so changing them exports everything again
+        options = repr((self.atlas_size, self.atlas_padding, self.normal_encoding, self.normal_mips,
+                        self.detect_by_content, self.content_threshold))
+        cache = {}
+        # Collections excluded from the view layer aren't exported by the FBX exporter either
+        excluded = {layer.name for layer in bpy.context.view_layer.layer_collection.children if layer.exclude}
+        collections = [c for c in bpy.context.scene.collection.children if c.all_objects and c.name not in excluded]
+        self.entries = self._load_manifest()
+        self._prune({c.name for c in collections})
+        for collection in collections:
+            fingerprint = content_hash(options, collection_fingerprint(collection, cache))
+            entry = self.entries.get(collection.name)
+            path = self.file_path(collection.name)
+            if (not self.force and entry and entry["fingerprint"] == fingerprint
+                    and entry["file"] == os.path.basename(path) and self._intact(entry)):
                 continue
-            
-            width, height = img.size[0], img.size[1]
-            
-            # Skip if already valid (power of 2 or square)
-            if width == 0 or height == 0:
+            self.pending.append((collection.name, fingerprint, path))
+        profiler.count("collections", len(collections))
+        profiler.count("collections changed", len(self.pending))
+        self._save_manifest()
+
+        loose = len(bpy.context.scene.collection.objects)
+        if loose:
+            self.reports.append(('WARNING', f"{loose} object(s) directly in the scene collection are not exported"))
+        self.unchanged = len(collections) - len(self.pending)
+        self.total = len(self.pending)
+        if self.pending:
+            profiler.phase("snapshot")
+            self._dir, snapshot, staged_path = save_export_snapshot()
+            self._snapshot = (snapshot, staged_path)
+        self._launch()
+
+    def _launch(self):
+        while self.pending and len(self.running) < self.jobs:
+            collection_name, fingerprint, path = self.pending.pop(0)
+            export = BackgroundExport(
+                path, self.pixel_budget_mb, self.atlas_size, self.atlas_padding, self.normal_encoding,
+                self.blender, collection=collection_name, normal_mips=self.normal_mips,
+                detect_by_content=self.detect_by_content, content_threshold=self.content_threshold,
+            )
+            self.running[export] = (collection_name, fingerprint)
+            try:
+                export.start(*self._snapshot)
+            except OSError as e:
+                del self.running[export]
+                self.failed.append(collection_name)
+                self.reports.append(('ERROR', f"{collection_name}: could not start a worker: {e}"))
+
+    def poll(self):
+        """Take in the workers' output and start the next ones; returns True while any is running"""
+        import os
+
+        for export, (collection_name, fingerprint) in list(self.running.items()):
+            if export.poll():
                 continue
-            
-            needs_fix = False
-            new_width = width
-            new_height = height
-            
-            # Check if dimensions need fixing
-            if not is_power_of_2(width):
-                new_width = nearest_power_of_2(width)
-                needs_fix = True
-            
-            if not is_power_of_2(height):
-                new_height = nearest_power_of_2(height)
-                needs_fix = True
-            
-            if needs_fix:
-                try:
-                    # Scale the image
-                    img.scale(new_width, new_height)
-                    fixed_count += 1
-                    images_fixed.append(f"{img.name}: {width}x{height} -> {new_width}x{new_height}")
-                except Exception as e:
-                    print(f"Failed to resize {img.name}: {e}")
-        
-        # Report results
-        if fixed_count > 0:
-            self.report({'INFO'}, f"Fixed {fixed_count} image(s) dimensions")
-            print(f"\n--- Fixed Image Dimensions ---")
-            print(f"Resized {fixed_count} image(s) to power-of-2 dimensions:")
-            for info in images_fixed:
-                print(f"  - {info}")
-        else:
-            self.report({'INFO'}, "All images already have valid dimensions")
-            print("All images already have power-of-2 dimensions")
-        
-        return {'FINISHED'}
+            del self.running[export]
+            for level, message in export.reports:
+                if level != 'INFO':
+                    self.reports.append((level, f"{collection_name}: {message}"))
+            if export.returncode == 0 and os.path.exists(export.filepath):
+                self._record(collection_name, fingerprint, export.filepath)
+                self.exported.append(collection_name)
+            else:
+                self.failed.append(collection_name)
+                self.output = export.output
+                if not any(level == 'ERROR' for level, message in export.reports):
+                    self.reports.append(('ERROR', f"{collection_name}: export failed (exit code {export.returncode})"))
+        self._launch()
+
+        done = len(self.exported) + len(self.failed)
+        running = sum(export.progress for export in self.running)
+        self.progress = (done + running) / self.total if self.total else 1.0
+        self.message = ", ".join(name for name, fingerprint in self.running.values())
+        if self.running:
+            return True
+        if self.returncode is None:
+            self.finish()
+        return False
+
+    def finish(self):
+        self.returncode = 1 if self.failed else 0
+        msg = f"Exported {len(self.exported)} collection(s), {self.unchanged} unchanged"
+        if self.failed:
+            msg += f", {len(self.failed)} failed"
+        self.reports.append(('INFO', msg))
+        print(msg)
+
+    def wait(self):
+        import time
+
+        while self.poll():
+            time.sleep(0.05)
 
-# Operator to remove unused textures/images
-class SCAN_OT_remove_unused_textures(bpy.types.Operator):
-    bl_idname = "object.remove_unused_textures"
-    bl_label = "Remove Unused Textures"
-    bl_description = "Remove all textures/images that are not used in any material"
-    bl_options = {'REGISTER', 'UNDO'}
+    def cancel(self):
+        for export in self.running:
+            export.cancel()
+        self.running.clear()
+        self.pending.clear()
+        self.cancelled = True
 
-    def execute(self, context):
-        removed_count = 0
-        removed_images = []
-        
-        # Get all images used in materials
-        used_images = set()
-        
-        for mat in bpy.data.materials:
-            if mat.use_nodes and mat.node_tree:
-                for node in mat.node_tree.nodes:
-                    if node.type == 'TEX_IMAGE' and node.image:
-                        used_images.add(node.image.name)
-        
-        # Find and remove unused images
-        images_to_remove = []
-        for img in bpy.data.images:
-            # Skip internal images
-            if img.name in ["Render Result", "Viewer Node"]:
-                continue
-            
-            if img.name not in used_images:
-                images_to_remove.append(img)
-        
-        # Remove unused images
-        for img in images_to_remove:
-            removed_images.append(img.name)
-            bpy.data.images.remove(img)
-            removed_count += 1
-        
-        # Report results
-        if removed_count > 0:
-            self.report({'INFO'}, f"Removed {removed_count} unused texture(s)")
-            print(f"\n--- Removed Unused Textures ---")
-            print(f"Removed {removed_count} unused texture(s):")
-            for name in removed_images:
-                print(f"  - {name}")
-        else:
-            self.report({'INFO'}, "No unused textures found")
-            print("No unused textures found")
-        
-        return {'FINISHED'}
+    def cleanup(self):
+        import shutil
 
-# Operator to remove unused materials
-class SCAN_OT_remove_unused_materials(bpy.types.Operator):
-    bl_idname = "object.remove_unused_materials"
-    bl_label = "Remove Unused Materials"
-    bl_description = "Remove all materials that are not assigned to any mesh object"
-    bl_options = {'REGISTER', 'UNDO'}
+        for export in self.running:
+            export.cleanup()
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
 
-    def execute(self, context):
-        removed_count = 0
-        removed_materials = []
-        
-        # Get all materials used in mesh objects
-        used_materials = set()
-        
-        for obj in bpy.data.objects:
-            if obj.type == 'MESH' and obj.data.materials:
-                for mat in obj.data.materials:
-                    if mat:
-                        used_materials.add(mat.name)
-        
-        # Find and remove unused materials
-        materials_to_remove = []
-        for mat in bpy.data.materials:
-            if mat.name not in used_materials:
-                materials_to_remove.append(mat)
-        
-        # Remove unused materials
-        for mat in materials_to_remove:
-            removed_materials.append(mat.name)
-            bpy.data.materials.remove(mat)
-            removed_count += 1
-        
-        # Report results
-        if removed_count > 0:
-            self.report({'INFO'}, f"Removed {removed_count} unused material(s)")
-            print(f"\n--- Removed Unused Materials ---")
-            print(f"Removed {removed_count} unused material(s):")
-            for name in removed_materials:
-                print(f"  - {name}")
-        else:
-            self.report({'INFO'}, "No unused materials found")
-            print("No unused materials found")
-        
-        return {'FINISHED'}
 
-# Operator to pack images and export as FBX
-class SCAN_OT_export_fbx_with_textures(bpy.types.Operator):
-    bl_idname = "object.export_fbx_with_textures"
-    bl_label = "Export FBX with Textures"
-    bl_description = "Pack all images and export as FBX with textures"
-    bl_options = {'REGISTER', 'UNDO'}
-    
+def isolate_collection(collection_name):
+    """Remove every object outside the collection and its children, then what only they used"""
+    collection = bpy.data.collections[collection_name]
+    keep = set(collection.all_objects)
+    bpy.data.batch_remove([obj for obj in bpy.data.objects if obj not in keep])
+    invalidate_material_index()
+    remove_orphans(list(ORPHAN_COLLECTIONS.values()))
+
+
+# Settings shared by the FBX export operators
+class FBXExportOptions:
+    """File path, atlas options and file browser shared by the FBX export operators"""
+
     filepath: bpy.props.StringProperty(
         name="File Path",
         description="Filepath used for exporting the FBX file",
@@ -470,6 +4567,56 @@ class SCAN_OT_export_fbx_with_textures(bpy.types.Operator):
         subtype='FILE_PATH'
     )
     
+    atlas_normal_maps: bpy.props.BoolProperty(
+        name="Atlas Normal Maps",
+        description="Pack the normal maps into shared atlases for the export, with an extra UV map "
+                    "pointing into them (listed in " + NORMAL_ATLAS_SIDECAR + ", since FBX can't bind a "
+                    "texture to it). The scene is left as it was afterwards",
+        default=False
+    )
+    
+    atlas_size: bpy.props.EnumProperty(
+        name="Atlas Size",
+        description="Largest atlas; smaller ones are used when the maps fit",
+        items=[
+            ('1024', "1024", "Atlases up to 1024x1024"),
+            ('2048', "2048", "Atlases up to 2048x2048"),
+            ('4096', "4096", "Atlases up to 4096x4096"),
+        ],
+        default='2048'
+    )
+    
+    atlas_padding: bpy.props.IntProperty(
+        name="Padding",
+        description="Pixels of repeated edge around each map, so filtering and mipmaps don't bleed",
+        default=8,
+        min=0,
+        max=64
+    )
+    
+    normal_encoding: bpy.props.EnumProperty(
+        name="Normal Maps",
+        description="How the textures used as normal maps are written",
+        items=[
+            ('RGB', "RGB", "Write normal maps like any other texture"),
+            ('RG', "Two Channels", "Renormalize and write only X and Y; Z is rebuilt by the reader "
+                                   "(listed in " + NORMAL_ENCODING_SIDECAR + ")"),
+        ],
+        default='RGB'
+    )
+    
+    normal_mips: bpy.props.EnumProperty(
+        name="Normal Mips",
+        description="Also write a mip chain of every normal map next to it, as <texture>_mip1.png down to 1x1",
+        items=[
+            ('NONE', "None", "Only write the textures"),
+            ('MIPS', "Mip Chain", "Average and renormalize the normals for every level"),
+            ('TOKSVIG', "Mip Chain + Toksvig", "Like Mip Chain, with the length of the averaged normals in alpha, "
+                                               "for widening the roughness of the lower levels"),
+        ],
+        default='NONE'
+    )
+    
     def invoke(self, context, event):
         # Set default filename
         if not self.filepath:
@@ -484,147 +4631,204 @@ class SCAN_OT_export_fbx_with_textures(bpy.types.Operator):
         # Open file browser
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
+
+
+# Operator to pack images and export as FBX
+class SCAN_OT_export_fbx_with_textures(FBXExportOptions, bpy.types.Operator):
+    bl_idname = "object.export_fbx_with_textures"
+    bl_label = "Export FBX with Textures"
+    bl_description = "Pack all images and export as FBX with textures"
+    bl_options = {'REGISTER', 'UNDO'}
     
+    @profiled
     def execute(self, context):
-        import os
-        
-        # Get directory and base name for FBX file
-        fbx_dir = os.path.dirname(self.filepath)
-        fbx_basename = os.path.splitext(os.path.basename(self.filepath))[0]
-        
-        # Create textures folder next to FBX file
-        textures_dir = os.path.join(fbx_dir, fbx_basename + "_textures")
-        os.makedirs(textures_dir, exist_ok=True)
-        
-        saved_count = 0
-        saved_images = []
-        
-        # Get all images used in materials
-        used_images = set()
-        for mat in bpy.data.materials:
-            if mat.use_nodes and mat.node_tree:
-                for node in mat.node_tree.nodes:
-                    if node.type == 'TEX_IMAGE' and node.image:
-                        used_images.add(node.image)
-        
-        # Save all used images to disk
-        print("\n=== Saving Images to Disk ===")
-        for img in used_images:
-            if img.name in ["Render Result", "Viewer Node"]:
-                continue
-            
-            if not img.has_data:
-                continue
-            
-            try:
-                # Create safe filename
-                safe_name = "".join(c for c in img.name if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
-                
-                # Determine file extension based on original format or default to PNG
-                if img.filepath:
-                    ext = os.path.splitext(img.filepath)[1].lower()
-                    if ext in ['.jpg', '.jpeg', '.png', '.tga', '.bmp']:
-                        file_ext = ext
-                    else:
-                        file_ext = '.png'
-                else:
-                    # Default to PNG if no filepath
-                    file_ext = '.png'
-                
-                # If image is packed, unpack it first
-                if img.packed_file:
-                    img.unpack(method='USE_ORIGINAL')
-                
-                # Save image to textures folder
-                texture_path = os.path.join(textures_dir, safe_name + file_ext)
-                
-                # Ensure unique filename
-                counter = 1
-                original_path = texture_path
-                while os.path.exists(texture_path):
-                    name_part = os.path.splitext(original_path)[0]
-                    texture_path = f"{name_part}_{counter}{file_ext}"
-                    counter += 1
-                
-                # Set image filepath and format
-                img.filepath = texture_path
-                if file_ext in ['.jpg', '.jpeg']:
-                    img.file_format = 'JPEG'
-                elif file_ext == '.png':
-                    img.file_format = 'PNG'
-                elif file_ext == '.tga':
-                    img.file_format = 'TARGA'
-                
-                # Save the image
-                img.save()
-                
-                saved_count += 1
-                saved_images.append(os.path.basename(texture_path))
-                print(f"Saved: {os.path.basename(texture_path)}")
-                
-            except Exception as e:
-                print(f"Failed to save {img.name}: {e}")
-        
-        if saved_count > 0:
-            self.report({'INFO'}, f"Saved {saved_count} texture(s) to disk")
-            print(f"Saved {saved_count} texture(s) to: {textures_dir}")
-        
-        # Export as FBX
-        print(f"\n=== Exporting FBX ===")
-        print(f"Exporting to: {self.filepath}")
-        
+        settings = context.scene.scan_settings
+        return export_fbx_with_textures(
+            self.filepath, settings.pixel_budget_mb, self.report,
+            atlas_size=int(self.atlas_size) if self.atlas_normal_maps else 0,
+            atlas_padding=self.atlas_padding,
+            normal_encoding=self.normal_encoding,
+            normal_mips=self.normal_mips,
+            detect_by_content=settings.detect_by_content,
+            content_threshold=settings.content_threshold,
+        )
+
+
+# Waiting on worker processes, shared by the background export operators
+class BackgroundExportModal:
+    """Runs a BackgroundExport or SplitExport, modal with a timer while it works; Esc cancels"""
+
+    def run_export(self, context, export):
+        self._export = export
         try:
-            # Export FBX with textures
-            bpy.ops.export_scene.fbx(
-                filepath=self.filepath,
-                check_existing=True,
-                filter_glob="*.fbx",
-                use_selection=False,
-                use_active_collection=False,
-                global_scale=1.0,
-                apply_unit_scale=True,
-                apply_scale_options='FBX_SCALE_NONE',
-                use_space_transform=True,
-                bake_space_transform=False,
-                object_types={'MESH', 'ARMATURE', 'EMPTY', 'OTHER'},
-                use_mesh_modifiers=True,
-                use_mesh_modifiers_render=True,
-                mesh_smooth_type='OFF',
-                use_subsurf=False,
-                use_mesh_edges=False,
-                use_tspace=False,
-                use_custom_props=False,
-                add_leaf_bones=True,
-                primary_bone_axis='Y',
-                secondary_bone_axis='X',
-                use_armature_deform_only=False,
-                armature_nodetype='NULL',
-                bake_anim=True,
-                bake_anim_use_all_bones=True,
-                bake_anim_use_nla_strips=True,
-                bake_anim_use_all_actions=True,
-                bake_anim_force_startend_keying=True,
-                bake_anim_step=1.0,
-                bake_anim_simplify_factor=1.0,
-                path_mode='COPY',  # Copy textures relative to FBX
-                embed_textures=False,  # Don't embed, use external files
-                batch_mode='OFF',
-                use_batch_own_dir=True,
-                use_metadata=True
-            )
-            
-            self.report({'INFO'}, f"Exported FBX with {saved_count} texture(s)")
-            print(f"✓ Successfully exported FBX!")
-            print(f"✓ Textures saved to: {textures_dir}")
-            print(f"  Keep the '{fbx_basename}_textures' folder with the FBX file!")
-            
+            export.start()
         except Exception as e:
-            self.report({'ERROR'}, f"Export failed: {str(e)}")
-            print(f"✗ Export failed: {e}")
+            export.cleanup()
+            self.report({'ERROR'}, f"Could not start the background export: {e}")
             return {'CANCELLED'}
-        
+
+        if bpy.app.background or context.window is None:
+            # Nothing to keep responsive; wait for the workers
+            export.wait()
+            return self.finish()
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.25, window=context.window)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, "Exporting FBX in the background (Esc to cancel)")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._export.cancel()
+            self.stop(context)
+            self._export.cleanup()
+            self.report({'WARNING'}, "Background FBX export cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER' or event.timer != self._timer:
+            return {'PASS_THROUGH'}
+
+        if self._export.poll():
+            context.workspace.status_text_set(
+                f"Exporting FBX: {self._export.progress:.0%} {self._export.message} (Esc to cancel)"
+            )
+            return {'PASS_THROUGH'}
+        self.stop(context)
+        return self.finish()
+
+    def stop(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+
+    def finish(self):
+        export = self._export
+        export.cleanup()
+        for level, message in export.reports:
+            self.report({level}, message)
+        if export.returncode != 0:
+            print("\n".join(export.output))
+            if not any(level == 'ERROR' for level, message in export.reports):
+                self.report({'ERROR'}, f"Background export failed (exit code {export.returncode})")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+
+# Operator to run the FBX export in a background Blender process
+class SCAN_OT_export_fbx_background(FBXExportOptions, BackgroundExportModal, bpy.types.Operator):
+    bl_idname = "object.export_fbx_background"
+    bl_label = "Export FBX in Background"
+    bl_description = "Export as FBX with textures from a worker Blender process, so you can keep working (Esc to cancel)"
+    bl_options = {'REGISTER'}
+
+    @profiled
+    def execute(self, context):
+        settings = context.scene.scan_settings
+        return self.run_export(context, BackgroundExport(
+            self.filepath, settings.pixel_budget_mb,
+            atlas_size=int(self.atlas_size) if self.atlas_normal_maps else 0,
+            atlas_padding=self.atlas_padding,
+            normal_encoding=self.normal_encoding,
+            normal_mips=self.normal_mips,
+            detect_by_content=settings.detect_by_content,
+            content_threshold=settings.content_threshold,
+        ))
+
+
+# Operator to export each top-level collection to its own FBX file from worker processes
+class SCAN_OT_export_fbx_collections(FBXExportOptions, BackgroundExportModal, bpy.types.Operator):
+    bl_idname = "object.export_fbx_collections"
+    bl_label = "Export Collections as FBX"
+    bl_description = (
+        "Export each top-level collection to its own FBX file named after the chosen one, "
+        "skipping collections that didn't change since the last export (Esc to cancel)"
+    )
+    bl_options = {'REGISTER'}
+
+    jobs: bpy.props.IntProperty(
+        name="Parallel Exports",
+        description="Worker Blender processes exporting collections at the same time",
+        default=4,
+        min=1,
+        soft_max=16
+    )
+    force: bpy.props.BoolProperty(
+        name="Export All",
+        description="Export every collection again, including the unchanged ones",
+        default=False
+    )
+
+    @profiled
+    def execute(self, context):
+        settings = context.scene.scan_settings
+        return self.run_export(context, SplitExport(
+            self.filepath, settings.pixel_budget_mb, jobs=self.jobs,
+            atlas_size=int(self.atlas_size) if self.atlas_normal_maps else 0,
+            atlas_padding=self.atlas_padding,
+            normal_encoding=self.normal_encoding,
+            normal_mips=self.normal_mips,
+            detect_by_content=settings.detect_by_content,
+            content_threshold=settings.content_threshold,
+            force=self.force,
+        ))
+
+# Operators to save or clear the recorded profile runs
+class SCAN_OT_export_profile(bpy.types.Operator):
+    bl_idname = "scan.export_profile"
+    bl_label = "Export Profile"
+    bl_description = "Save the timings and counters of the recorded operator runs"
+
+    filepath: bpy.props.StringProperty(
+        name="File Path",
+        description="File to write the profile to",
+        maxlen=1024,
+        default="",
+        subtype='FILE_PATH'
+    )
+    format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('CHROME', "Chrome Trace", "Trace Event Format, opens in chrome://tracing or ui.perfetto.dev"),
+            ('JSON', "JSON", "Plain list of runs with their spans and counters"),
+        ],
+        default='CHROME'
+    )
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            import os
+            base = os.path.splitext(bpy.data.filepath)[0] if bpy.data.filepath else "untitled"
+            self.filepath = base + "_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        import json
+
+        if not profiler.runs:
+            self.report({'WARNING'}, "No operator runs recorded yet")
+            return {'CANCELLED'}
+        data = profiler.to_chrome_trace() if self.format == 'CHROME' else profiler.to_json()
+        try:
+            with open(bpy.path.abspath(self.filepath), "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Saved {len(profiler.runs)} run(s) to {self.filepath}")
+        return {'FINISHED'}
+
+
+class SCAN_OT_clear_profile(bpy.types.Operator):
+    bl_idname = "scan.clear_profile"
+    bl_label = "Clear Profile"
+    bl_description = "Forget the recorded operator runs"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        profiler.clear()
         return {'FINISHED'}
 
+
 # UI Panel
 class SCAN_PT_panel(bpy.types.Panel):
     bl_label = "Normal Map Scanner"
@@ -635,33 +4839,414 @@ class SCAN_PT_panel(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
+        settings = context.scene.scan_settings
         layout.operator("object.scan_normal_maps")
+        layout.prop(settings, "live_mode")
+        row = layout.row(align=True)
+        row.prop(settings, "detect_by_content")
+        sub = row.row(align=True)
+        sub.active = settings.detect_by_content
+        sub.prop(settings, "content_threshold", text="")
+        layout.prop(settings, "find_duplicates")
+        layout.prop(settings, "save_scan_index")
+        if settings.live_mode:
+            index = cached_material_index()
+            box = layout.box()
+            if index is None:
+                box.label(text="Waiting for first scan...", icon='TIME')
+            else:
+                normal_maps, material_usage = index.normal_maps()
+                box.label(text=f"{len(normal_maps)} normal map(s) in {len(material_usage)} material(s)", icon='TEXTURE')
         layout.operator("object.remove_normal_maps")
         
         layout.separator()
         layout.label(text="Cleanup Tools:", icon='BRUSH_DATA')
         layout.operator("object.remove_unused_textures", icon='TRASH')
         layout.operator("object.remove_unused_materials", icon='MATERIAL_DATA')
+        layout.operator("object.remove_orphan_data", icon='ORPHAN_DATA')
+        layout.operator("object.merge_duplicate_images", icon='DUPLICATE')
         
         layout.separator()
         layout.label(text="Export Tools:", icon='EXPORT')
         layout.operator("object.export_fbx_with_textures", icon='EXPORT')
+        layout.operator("object.export_fbx_background", icon='SORTTIME')
+        layout.operator("object.export_fbx_collections", icon='OUTLINER_COLLECTION')
+        row = layout.row(align=True)
+        row.operator("object.asset_cost_report", icon='SPREADSHEET')
+        row.prop(settings, "asset_report_rows", text="")
         
         layout.separator()
         layout.label(text="glTF Export Tools:", icon='EXPORT')
         layout.operator("object.fix_uv_coordinates", icon='UV_DATA')
         layout.operator("object.fix_image_dimensions", icon='IMAGE_DATA')
 
+        layout.separator()
+        layout.label(text="Texture Budget:", icon='MEMORY')
+        layout.prop(settings, "texture_budget_mb")
+        layout.operator("object.texture_memory_report", icon='INFO')
+        layout.operator("object.fit_texture_budget", icon='FULLSCREEN_EXIT')
+
+        layout.separator()
+        layout.prop(settings, "show_profile")
+        if settings.show_profile:
+            self.draw_profile(layout)
+
+    def draw_profile(self, layout):
+        box = layout.box()
+        if not profiler.runs:
+            box.label(text="No operator runs recorded yet", icon='TIME')
+            return
+        # Most recent runs first
+        for run in list(profiler.runs)[:-6:-1]:
+            col = box.column(align=True)
+            col.label(text=f"{run.label}: {run.seconds * 1000:.1f} ms", icon='TIME')
+            for name, start, seconds, depth in run.spans:
+                if depth == 1:
+                    col.label(text=f"    {name}: {seconds * 1000:.1f} ms")
+            for name, total in sorted(run.counters.items()):
+                col.label(text=f"    {name}: {total:,}")
+        row = box.row(align=True)
+        row.operator("scan.export_profile", icon='EXPORT')
+        row.operator("scan.clear_profile", icon='X', text="")
+
 # Register classes
-classes = [SCAN_OT_normal_maps_popup, SCAN_OT_normal_maps, SCAN_OT_remove_normal_maps, SCAN_OT_fix_uv_coordinates, SCAN_OT_fix_image_dimensions, SCAN_OT_remove_unused_textures, SCAN_OT_remove_unused_materials, SCAN_OT_export_fbx_with_textures, SCAN_PT_panel]
+classes = [SCAN_PG_settings, SCAN_PG_result, SCAN_UL_results, SCAN_PG_asset_cost, SCAN_UL_asset_costs, SCAN_OT_normal_maps_popup, SCAN_OT_asset_cost_popup, SCAN_OT_normal_maps, SCAN_OT_remove_normal_maps, SCAN_OT_fix_uv_coordinates, SCAN_OT_fix_image_dimensions, SCAN_OT_texture_memory_report, SCAN_OT_asset_cost_report, SCAN_OT_fit_texture_budget, SCAN_OT_remove_orphan_data, SCAN_OT_remove_unused_textures, SCAN_OT_remove_unused_materials, SCAN_OT_merge_duplicate_images, SCAN_OT_export_fbx_with_textures, SCAN_OT_export_fbx_background, SCAN_OT_export_fbx_collections, SCAN_OT_export_profile, SCAN_OT_clear_profile, SCAN_PT_panel]
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    bpy.types.Scene.scan_settings = bpy.props.PointerProperty(type=SCAN_PG_settings)
+    bpy.types.WindowManager.scan_normal_maps = bpy.props.CollectionProperty(type=SCAN_PG_result)
+    bpy.types.WindowManager.scan_normal_maps_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.scan_material_usage = bpy.props.CollectionProperty(type=SCAN_PG_result)
+    bpy.types.WindowManager.scan_material_usage_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.scan_likely_normal_maps = bpy.props.CollectionProperty(type=SCAN_PG_result)
+    bpy.types.WindowManager.scan_likely_normal_maps_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.scan_duplicate_images = bpy.props.CollectionProperty(type=SCAN_PG_result)
+    bpy.types.WindowManager.scan_duplicate_images_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.scan_asset_costs = bpy.props.CollectionProperty(type=SCAN_PG_asset_cost)
+    bpy.types.WindowManager.scan_asset_costs_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.scan_asset_cost_sort = bpy.props.EnumProperty(
+        name="Sort By", items=ASSET_COST_COLUMNS, default='TRIANGLES'
+    )
+    for handlers, handler in _index_handlers:
+        if handler not in handlers:
+            handlers.append(handler)
 
 def unregister():
-    for cls in classes:
+    for handlers, handler in _index_handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+    if bpy.app.timers.is_registered(_refresh_live_results):
+        bpy.app.timers.unregister(_refresh_live_results)
+    invalidate_material_index()
+    del bpy.types.Scene.scan_settings
+    del bpy.types.WindowManager.scan_normal_maps
+    del bpy.types.WindowManager.scan_normal_maps_index
+    del bpy.types.WindowManager.scan_material_usage
+    del bpy.types.WindowManager.scan_material_usage_index
+    del bpy.types.WindowManager.scan_likely_normal_maps
+    del bpy.types.WindowManager.scan_likely_normal_maps_index
+    del bpy.types.WindowManager.scan_duplicate_images
+    del bpy.types.WindowManager.scan_duplicate_images_index
+    del bpy.types.WindowManager.scan_asset_costs
+    del bpy.types.WindowManager.scan_asset_costs_index
+    del bpy.types.WindowManager.scan_asset_cost_sort
+    for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
+# Headless batch scanning
+#
+#   blender -b --factory-startup --python normal_scanner.py -- batch-scan \
+#       --jobs 8 --output audit.ndjson [--resume] <.blend files or folders>
+#
+# The coordinator splits the files across worker Blender processes. Each
+# worker links only the materials (plus the images and node groups they use)
+# with bpy.data.libraries.load and prints one record per file, which the
+# coordinator appends to the NDJSON output as soon as it arrives.
+
+BATCH_RECORD_PREFIX = "NORMAL_SCANNER_RECORD "
+
+
+def scan_blend_file(filepath, full_load=False):
+    """Scan the materials of one .blend file and return its NDJSON record"""
+    import time
+
+    start = time.perf_counter()
+    record = {"file": filepath}
+    index = MaterialIndex()
+    library = None
+    try:
+        if full_load:
+            raise RuntimeError("full load requested")
+        with bpy.data.libraries.load(filepath, link=True) as (data_from, data_to):
+            data_to.materials = list(data_from.materials)
+        for mat in data_to.materials:
+            if mat:
+                index.add_material(mat)
+                library = library or mat.library
+        record["mode"] = "library"
+    except Exception as e:
+        if not full_load:
+            print(f"Library load failed for {filepath}: {e}, opening the whole file")
+        bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+        index.build()
+        record["mode"] = "open"
+
+    normal_maps, material_usage = index.normal_maps()
+    record["materials"] = len(index.materials)
+    record["normal_maps"] = sorted(normal_maps)
+    record["material_usage"] = [[mat_name, textures] for mat_name, textures in sorted(material_usage)]
+    record["seconds"] = round(time.perf_counter() - start, 4)
+
+    # Drop the linked data again so the next file starts clean
+    if library is not None:
+        bpy.data.libraries.remove(library)
+    return record
+
+
+def _batch_worker(args):
+    """Scan the listed files one after another, printing a record per file"""
+    import json
+
+    with open(args.files_from, encoding="utf-8") as f:
+        filepaths = [line.rstrip("\n") for line in f if line.strip()]
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    for filepath in filepaths:
+        try:
+            record = scan_blend_file(filepath, full_load=args.full_load)
+        except Exception as e:
+            record = {"file": filepath, "error": str(e)}
+        print(BATCH_RECORD_PREFIX + json.dumps(record), flush=True)
+        if bpy.data.filepath:
+            # The file was opened as a whole; don't scan the next one on top of it
+            bpy.ops.wm.read_factory_settings(use_empty=True)
+    return 0
+
+
+def _collect_blend_files(paths):
+    import os
+
+    filepaths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".blend"):
+                        filepaths.append(os.path.abspath(os.path.join(root, name)))
+        else:
+            filepaths.append(os.path.abspath(path))
+    return filepaths
+
+
+def _finished_files(output_path):
+    """Files that already have a successful record in an earlier (interrupted) run"""
+    import json
+    import os
+
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    # Cut off a partly written last line so new records start on a fresh line
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in record:
+                done.add(record.get("file"))
+    return done
+
+
+def _batch_scan(args):
+    """Spread the files across worker processes and stream their records to the output"""
+    import json
+    import os
+    import subprocess
+    import tempfile
+    import threading
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    filepaths = _collect_blend_files(args.paths)
+    if args.resume:
+        done = _finished_files(args.output)
+        pending = [path for path in filepaths if path not in done]
+        print(f"Resuming: {len(filepaths) - len(pending)} file(s) already scanned")
+    else:
+        pending = filepaths
+
+    blender = args.blender or bpy.app.binary_path
+    script = os.path.abspath(__file__)
+    chunks = [pending[i:i + args.chunk_size] for i in range(0, len(pending), args.chunk_size)]
+    lock = threading.Lock()
+    progress = {"done": 0, "failed": 0}
+
+    out = open(args.output, "a" if args.resume else "w", encoding="utf-8")
+
+    def write_record(record):
+        with lock:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            progress["done"] += 1
+            if "error" in record:
+                progress["failed"] += 1
+            print(f"[{progress['done']}/{len(pending)}] {record['file']}")
+
+    def run_chunk(chunk):
+        remaining = list(chunk)
+        while remaining:
+            with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+                f.write("\n".join(remaining))
+                list_path = f.name
+            command = [blender, "-b", "--factory-startup", "--python", script, "--",
+                       "batch-worker", "--files-from", list_path]
+            if args.full_load:
+                command.append("--full-load")
+            output = deque(maxlen=20)  # last lines of other worker output, for errors
+            timed_out = threading.Event()
+            watchdog = None
+            try:
+                proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, encoding="utf-8", errors="replace")
+
+                def expire():
+                    timed_out.set()
+                    proc.kill()
+
+                # Every file gets `timeout` seconds; a hung worker is killed
+                watchdog = threading.Timer(args.timeout, expire)
+                watchdog.start()
+                for line in proc.stdout:
+                    if not line.startswith(BATCH_RECORD_PREFIX):
+                        output.append(line.rstrip("\n"))
+                        continue
+                    record = json.loads(line[len(BATCH_RECORD_PREFIX):])
+                    if record["file"] in remaining:
+                        remaining.remove(record["file"])
+                    write_record(record)
+                    watchdog.cancel()
+                    watchdog = threading.Timer(args.timeout, expire)
+                    watchdog.start()
+                returncode = proc.wait()
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+                os.remove(list_path)
+
+            if remaining:
+                # The worker died or hung on the first file it didn't report; skip it and carry on
+                if timed_out.is_set():
+                    error = f"timed out after {args.timeout:g} s"
+                else:
+                    error = f"worker exited with code {returncode}"
+                with lock:
+                    print(f"Worker failed on {remaining[0]} ({error}); last output:")
+                    for line in output:
+                        print(f"  {line}")
+                write_record({"file": remaining.pop(0), "error": error, "output": list(output)})
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            for _ in pool.map(run_chunk, chunks):
+                pass
+    finally:
+        out.close()
+
+    print(f"Scanned {progress['done']} file(s), {progress['failed']} failed -> {args.output}")
+    return 1 if progress["failed"] else 0
+
+
+def _export_worker(args):
+    """Open the snapshot and run the FBX export, printing progress and reports for BackgroundExport"""
+    import json
+
+    bpy.ops.wm.open_mainfile(filepath=args.blend, load_ui=False)
+    with open(args.staged, encoding="utf-8") as f:
+        staged = json.load(f)
+    for image_name, path in staged.items():
+        img = bpy.data.images.get(image_name)
+        if img is not None:
+            if img.packed_file:
+                # Drop the stale packed bytes without writing them anywhere
+                img.unpack(method='REMOVE')
+            img.source = 'FILE'
+            img.filepath_raw = path
+            img.reload()
+
+    def report(level, message):
+        print(EXPORT_REPORT_PREFIX + json.dumps([next(iter(level)), message]), flush=True)
+
+    if args.collection:
+        if args.collection not in bpy.data.collections:
+            report({'ERROR'}, f"No collection named {args.collection!r}")
+            return 1
+        isolate_collection(args.collection)
+
+    def progress(fraction, message):
+        print(f"{EXPORT_PROGRESS_PREFIX}{fraction:.3f} {message}", flush=True)
+
+    result = export_fbx_with_textures(
+        args.filepath, args.pixel_budget_mb, report,
+        atlas_size=args.atlas_size, atlas_padding=args.atlas_padding,
+        normal_encoding=args.normal_encoding, normal_mips=args.normal_mips, progress=progress,
+        detect_by_content=args.detect_by_content, content_threshold=args.content_threshold,
+    )
+    progress(1.0, "Done")
+    return 0 if 'FINISHED' in result else 1
+
+
+def main(argv):
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(prog="normal_scanner.py", description="Normal Map Scanner command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("batch-scan", help="Scan many .blend files across worker processes")
+    scan.add_argument("paths", nargs="+", help=".blend files or folders to search for them")
+    scan.add_argument("-o", "--output", required=True, help="NDJSON file to write one record per file to")
+    scan.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    scan.add_argument("--chunk-size", type=int, default=25, help="Files handed to a worker process at a time")
+    scan.add_argument("--resume", action="store_true", help="Skip files already recorded in the output")
+    scan.add_argument("--blender", default="", help="Blender executable for the workers")
+    scan.add_argument("--full-load", action="store_true", help="Open every file completely instead of linking materials")
+    scan.add_argument("--timeout", type=float, default=300.0, help="Seconds a worker may spend on one file")
+    scan.set_defaults(func=_batch_scan)
+
+    worker = commands.add_parser("batch-worker", help=argparse.SUPPRESS)
+    worker.add_argument("--files-from", required=True)
+    worker.add_argument("--full-load", action="store_true")
+    worker.set_defaults(func=_batch_worker)
+
+    export = commands.add_parser("export-worker", help=argparse.SUPPRESS)
+    export.add_argument("blend")
+    export.add_argument("--filepath", required=True)
+    export.add_argument("--pixel-budget-mb", type=int, default=2048)
+    export.add_argument("--staged", required=True)
+    export.add_argument("--atlas-size", type=int, default=0)
+    export.add_argument("--atlas-padding", type=int, default=8)
+    export.add_argument("--normal-encoding", choices=["RGB", "RG"], default="RGB")
+    export.add_argument("--normal-mips", choices=["NONE", "MIPS", "TOKSVIG"], default="NONE")
+    export.add_argument("--detect-by-content", action="store_true", help="Also find normal maps by pixel content")
+    export.add_argument("--content-threshold", type=float, default=0.8)
+    export.add_argument("--collection", default="", help="Export only this collection's objects")
+    export.set_defaults(func=_export_worker)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
 if __name__ == "__main__":
+    import sys
+    if "--" in sys.argv:
+        sys.exit(main(sys.argv[sys.argv.index("--") + 1:]))
     register()
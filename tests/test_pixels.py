@@ -0,0 +1,154 @@
+"""Numeric checks of the pixel code: resampling, PNG encoding and normal map mips.
+
+These functions only use numpy, so they run against the bpy stand-in in
+benchmarks/fake_bpy:
+
+    python -m pytest tests
+"""
+
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import fake_bpy  # noqa: E402
+
+fake_bpy.install()
+
+import normal_scanner  # noqa: E402
+
+
+def random_pixels(width, height, channels, seed=0):
+    return np.random.default_rng(seed).random(width * height * channels, dtype=np.float32)
+
+
+def random_normals(width, height, channels, seed=0):
+    """Encoded unit vectors in the front hemisphere, plus random extra channels"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(height, width, 3))
+    vectors[..., 2] = np.abs(vectors[..., 2]) + 0.5
+    vectors /= np.linalg.norm(vectors, axis=-1, keepdims=True)
+    image = rng.random((height, width, channels))
+    image[..., :3] = vectors * 0.5 + 0.5
+    return image.astype(np.float32).ravel()
+
+
+def decode_png(data):
+    """(width, height, channels, top-down uint8 rows) of an 8-bit PNG using the None and Up filters"""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position = 8
+    idat = b""
+    while position < len(data):
+        length, tag = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        if tag == b"IHDR":
+            width, height, depth, color_type = struct.unpack(">IIBB", body[:10])
+            assert depth == 8
+            channels = {0: 1, 4: 2, 2: 3, 6: 4}[color_type]
+        elif tag == b"IDAT":
+            idat += body
+        position += 12 + length
+    assert tag == b"IEND"
+
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, width * channels + 1)
+    rows = np.empty((height, width * channels), dtype=np.uint8)
+    previous = np.zeros(width * channels, dtype=np.uint8)
+    for y in range(height):
+        assert raw[y, 0] in (0, 2)
+        rows[y] = raw[y, 1:] + previous if raw[y, 0] == 2 else raw[y, 1:]
+        previous = rows[y]
+    return width, height, channels, rows.reshape(height, width, channels)
+
+
+@pytest.mark.parametrize("channels", [1, 3, 4])
+def test_box_halving_is_the_mean_of_each_2x2_block(channels):
+    width, height = 16, 12
+    pixels = random_pixels(width, height, channels)
+    out = normal_scanner.resize_pixels(pixels, width, height, channels, width // 2, height // 2, 'BOX')
+    expected = pixels.reshape(height // 2, 2, width // 2, 2, channels).mean(axis=(1, 3))
+    np.testing.assert_allclose(out.reshape(expected.shape), expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("filter_name", [name for name, label, description in normal_scanner.RESAMPLE_FILTERS])
+@pytest.mark.parametrize("new_size", [(7, 5), (40, 33)])
+def test_banded_resize_matches_one_band(filter_name, new_size):
+    width, height, channels = 19, 23, 4
+    pixels = random_pixels(width, height, channels)
+    new_width, new_height = new_size
+    whole = normal_scanner.resize_pixels(pixels, width, height, channels, new_width, new_height, filter_name, band_rows=10000)
+    banded = normal_scanner.resize_pixels(pixels, width, height, channels, new_width, new_height, filter_name, band_rows=3)
+    np.testing.assert_array_equal(banded, whole)
+
+
+@pytest.mark.parametrize("src_channels,channels", [(4, 4), (4, 3), (4, 1), (3, 3)])
+@pytest.mark.parametrize("band_rows", [1, 4, 256])
+def test_png_round_trip(tmp_path, src_channels, channels, band_rows):
+    width, height = 13, 9
+    pixels = random_pixels(width, height, src_channels)
+    path = str(tmp_path / "out.png")
+    digest = normal_scanner.write_png(path, pixels, width, height, src_channels, channels, band_rows)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    assert digest == normal_scanner.content_hash(data)
+    assert decode_png(data)[:3] == (width, height, channels)
+    # Snapshots are bottom-up, PNG rows top-down
+    expected = normal_scanner.band_to_bytes(pixels.reshape(height, width, src_channels)[::-1], channels)
+    np.testing.assert_array_equal(decode_png(data)[3], expected)
+
+
+def test_png_round_trip_two_channel_normals(tmp_path):
+    width, height = 8, 6
+    pixels = random_normals(width, height, 4)
+    path = str(tmp_path / "normal.png")
+    normal_scanner.write_png(path, pixels, width, height, 4, 2, 4, normal_scanner.normal_rg_bytes)
+
+    with open(path, "rb") as f:
+        rows = decode_png(f.read())[3]
+    xy = rows.astype(np.float64) / 127.5 - 128.0 / 127.5
+    expected = pixels.reshape(height, width, 4)[::-1, :, :2] * 2.0 - 1.0
+    np.testing.assert_allclose(xy, expected, atol=1.0 / 127.5)
+
+
+@pytest.mark.parametrize("size", [(16, 16), (8, 4), (7, 5)])
+def test_mip_levels_are_the_mean_of_their_footprint(size):
+    width, height = size
+    channels = 4
+    pixels = random_normals(width, height, channels)
+    image = pixels.reshape(height, width, channels).astype(np.float64)
+    vectors = image[..., :3] * 2.0 - 1.0
+
+    chain = normal_scanner.normal_mip_chain(pixels, width, height, channels, toksvig=False)
+    toksvig_chain = normal_scanner.normal_mip_chain(pixels, width, height, channels, toksvig=True)
+    assert [level[:2] for level in chain] == normal_scanner.mip_sizes(width, height)
+
+    # Each level halves the sides that are still longer than one texel, and an
+    # odd side repeats its last row or column: the same as padding the full
+    # image by repeating its last texels up to a multiple of the footprint.
+    span_x = span_y = 1
+    previous_width, previous_height = width, height
+    for (level_width, level_height, out), (_, _, toksvig) in zip(chain, toksvig_chain):
+        span_x *= 2 if previous_width > 1 else 1
+        span_y *= 2 if previous_height > 1 else 1
+        previous_width, previous_height = level_width, level_height
+        out = out.reshape(level_height, level_width, channels)
+        toksvig = toksvig.reshape(level_height, level_width, 4)
+        rows = np.minimum(np.arange(level_height * span_y), height - 1).reshape(level_height, span_y)
+        columns = np.minimum(np.arange(level_width * span_x), width - 1).reshape(level_width, span_x)
+        for y in range(level_height):
+            for x in range(level_width):
+                footprint = np.ix_(rows[y], columns[x])
+                mean = vectors[footprint].mean(axis=(0, 1))
+                length = np.linalg.norm(mean)
+                np.testing.assert_allclose(out[y, x, :3], mean / length * 0.5 + 0.5, atol=1e-5)
+                np.testing.assert_allclose(toksvig[y, x, 3], min(length, 1.0), atol=1e-5)
+                np.testing.assert_allclose(out[y, x, 3], image[footprint][..., 3].mean(), atol=1e-5)